@@ -3,22 +3,160 @@
 # Educational implementation with step-by-step visualization support
 # ============================================================================
 
-from collections import namedtuple
-from typing import Generator, List, Tuple
+from collections import defaultdict, deque, namedtuple
+from functools import wraps
+from numbers import Integral
+from typing import Callable, Generator, List, Optional, Sequence, Tuple
+
+from parallel_sort import parallel_merge_phases
 
 # Step tracking for visualization
 Step = namedtuple("Step", ["type", "i", "j", "value", "description"])
-# type: 'compare', 'swap', 'overwrite'
+# type: 'compare', 'swap', 'overwrite' ('block' from step_trace.coalesce_writes)
+
+
+def make_step(type: str, i, j, value, template: str, arg=None) -> Step:
+    """
+    Build a Step, rendering its description from a template.
+
+    Templates may reference {i}, {j}, {value} and {arg}. Algorithms pass the
+    template instead of a formatted string so a trace recorder (see
+    step_trace.StepTrace) can store it and render the text only on demand.
+    """
+    return Step(type, i, j, value, template.format(i=i, j=j, value=value, arg=arg))
+
+
+# ============================================================================
+# Sort Keys
+# Records and non-integer values are sorted through a parallel array of
+# integer keys computed once per element (decorate-sort-undecorate)
+# ============================================================================
+
+class SortKey(int):
+    """An integer sort key that remembers the index of its input record."""
+
+    def __new__(cls, value: int, index: int):
+        self = super().__new__(cls, value)
+        self.index = index
+        return self
+
+
+# Step traces and Parallel Merge Sort's shared buffers hold int64 values
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def needs_keys(arr: Sequence, key: Optional[Callable], reverse: bool) -> bool:
+    """True unless ``arr`` is a plain list of int64 ints sorted ascending by value."""
+    if key is not None or reverse or not all(type(value) is int for value in arr):
+        return True
+    return bool(arr) and (min(arr) < INT64_MIN or max(arr) > INT64_MAX)
+
+
+def _dense_ranks(keys: list) -> List[int]:
+    """Rank of each key among the distinct keys, comparing with ``<`` only."""
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    ranks = [0] * len(keys)
+    rank = 0
+    for previous, current in zip(order, order[1:]):
+        if keys[previous] < keys[current]:
+            rank += 1
+        ranks[current] = rank
+    return ranks
+
+
+def sort_keys(records: Sequence, key: Optional[Callable] = None, reverse: bool = False) -> List[SortKey]:
+    """
+    Decorate ``records`` with integer sort keys, calling ``key`` once each.
+
+    Integer keys are used as they are if they fit in int64. Other keys
+    (wider integers, floats, strings, tuples, ...) are replaced by their
+    dense rank, which orders them the same way using only ``<``. With ``reverse``
+    the keys are mirrored within their range, so an ascending sort gives
+    descending order while equal keys keep their input order, as with
+    ``sorted(reverse=True)``.
+    """
+    keys = list(records) if key is None else [key(record) for record in records]
+    if keys and all(isinstance(k, Integral) for k in keys):
+        if min(keys) < INT64_MIN or max(keys) > INT64_MAX:
+            keys = _dense_ranks(keys)
+    else:
+        keys = _dense_ranks(keys)
+    if reverse and keys:
+        mirror = min(keys) + max(keys)
+        keys = [mirror - k for k in keys]
+    return [SortKey(k, index) for index, k in enumerate(keys)]
+
+
+def restore_records(result: List[int], records: Sequence, keys: List[SortKey]) -> list:
+    """Undecorate: ``records`` in the order of the sorted keys ``result``."""
+    if not result or isinstance(result[0], SortKey):
+        return [records[k.index] for k in result]
+    # Plain ints (Parallel Merge Sort sorts int64 buffers). That sort is
+    # stable, so equal keys are matched to records in input order.
+    pending = defaultdict(deque)
+    for k in keys:
+        pending[k].append(k.index)
+    return [records[pending[k].popleft()] for k in result]
+
+
+def accepts_keys(func: Callable) -> Callable:
+    """
+    Give an algorithm ``sorted()``'s ``key`` and ``reverse`` arguments.
+
+    Plain int lists sorted ascending go straight to ``func``. Anything else
+    is sorted as its sort_keys array: steps still refer to indices, their
+    values are the integer keys, and the generator returns the sorted
+    records instead of the sorted ints.
+    """
+    @wraps(func)
+    def sort(arr: Sequence, trace=None, *, key: Optional[Callable] = None, reverse: bool = False, **options):
+        if not needs_keys(arr, key, reverse):
+            return func(arr, trace, **options)
+        return _sort_records(func, list(arr), trace, key, reverse, options)
+
+    return sort
+
+
+def _sort_records(func: Callable, records: list, trace, key, reverse: bool, options: dict):
+    keys = sort_keys(records, key, reverse)
+    result = yield from func(keys, trace, **options)
+    return restore_records(result, records, keys)
 
 
 class SortingAlgorithm:
-    """Base class for sorting algorithms with metrics tracking."""
+    """
+    Base class for sorting algorithms with metrics tracking.
+
+    Subclasses call ``profiler.enter(phase)`` / ``profiler.exit(phase, ...)``
+    around their phases when ``profiler`` is set (see phase_profiler); the
+    default ``None`` costs one skipped branch per phase.
+    """
+
+    profiler = None
 
-    def __init__(self, arr: List[int]):
+    def __init__(self, arr: Sequence, key: Optional[Callable] = None, reverse: bool = False):
+        # With key/reverse or non-int values the sort runs on sort_keys
+        # and run() maps the result back to the records
+        self.records = self.keys = None
+        if needs_keys(arr, key, reverse):
+            self.records = list(arr)
+            arr = self.keys = sort_keys(self.records, key, reverse)
         self.arr = arr[:]
         self.comparisons = 0
         self.swaps = 0
         self.writes = 0
+        self.aux_space = 0  # peak auxiliary elements (buffers, counts, buckets)
+
+    def sort(self) -> List[int]:
+        """Sort self.arr in place, counting operations, and return it."""
+        raise NotImplementedError
+
+    def run(self) -> Tuple[list, dict]:
+        """Sort and return the sorted array (or records) with its metrics."""
+        result = self.sort()
+        if self.records is not None:
+            result = restore_records(result, self.records, self.keys)
+        return result, self.get_metrics()
 
     def get_metrics(self) -> dict:
         """Return algorithm performance metrics."""
@@ -26,11 +164,13 @@ class SortingAlgorithm:
             "comparisons": self.comparisons,
             "swaps": self.swaps,
             "writes": self.writes,
-            "total_operations": self.comparisons + self.swaps + self.writes
+            "total_operations": self.comparisons + self.swaps + self.writes,
+            "aux_space": self.aux_space
         }
 
 
-def bubble_sort(arr: List[int]) -> Generator[Step, None, None]:
+@accepts_keys
+def bubble_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
     """
     Bubble Sort - O(n²) time complexity
     Compares adjacent elements and swaps them if in wrong order.
@@ -38,27 +178,30 @@ def bubble_sort(arr: List[int]) -> Generator[Step, None, None]:
     arr = arr[:]
     n = len(arr)
     comparisons = swaps = 0
+    emit = trace.append if trace is not None else make_step
 
     for i in range(n):
         swapped = False
         for j in range(0, n - i - 1):
             comparisons += 1
-            yield Step("compare", j, j + 1, None, f"Comparing arr[{j}] with arr[{j+1}]")
+            yield emit("compare", j, j + 1, None, "Comparing arr[{i}] with arr[{j}]")
             
             if arr[j] > arr[j + 1]:
                 arr[j], arr[j + 1] = arr[j + 1], arr[j]
                 swaps += 1
-                yield Step("swap", j, j + 1, None, f"Swapped arr[{j}] and arr[{j+1}]")
+                yield emit("swap", j, j + 1, None, "Swapped arr[{i}] and arr[{j}]")
                 swapped = True
         
         if not swapped:
-            yield Step("complete", -1, -1, None, "Array is sorted - early exit")
+            yield emit("complete", -1, -1, None, "Array is sorted - early exit")
             break
 
-    yield Step("done", -1, -1, None, f"Bubble Sort Complete | Comparisons: {comparisons} | Swaps: {swaps}")
+    yield emit("done", -1, -1, None, f"Bubble Sort Complete | Comparisons: {comparisons} | Swaps: {swaps}")
+    return arr
 
 
-def selection_sort(arr: List[int]) -> Generator[Step, None, None]:
+@accepts_keys
+def selection_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
     """
     Selection Sort - O(n²) time complexity
     Finds minimum element and places it at the beginning.
@@ -66,12 +209,13 @@ def selection_sort(arr: List[int]) -> Generator[Step, None, None]:
     arr = arr[:]
     n = len(arr)
     comparisons = swaps = 0
+    emit = trace.append if trace is not None else make_step
 
     for i in range(n):
         min_idx = i
         for j in range(i + 1, n):
             comparisons += 1
-            yield Step("compare", min_idx, j, None, f"Comparing arr[{min_idx}] with arr[{j}]")
+            yield emit("compare", min_idx, j, None, "Comparing arr[{i}] with arr[{j}]")
             
             if arr[j] < arr[min_idx]:
                 min_idx = j
@@ -79,12 +223,14 @@ def selection_sort(arr: List[int]) -> Generator[Step, None, None]:
         if min_idx != i:
             arr[i], arr[min_idx] = arr[min_idx], arr[i]
             swaps += 1
-            yield Step("swap", i, min_idx, None, f"Swapped arr[{i}] and arr[{min_idx}]")
+            yield emit("swap", i, min_idx, None, "Swapped arr[{i}] and arr[{j}]")
 
-    yield Step("done", -1, -1, None, f"Selection Sort Complete | Comparisons: {comparisons} | Swaps: {swaps}")
+    yield emit("done", -1, -1, None, f"Selection Sort Complete | Comparisons: {comparisons} | Swaps: {swaps}")
+    return arr
 
 
-def insertion_sort(arr: List[int]) -> Generator[Step, None, None]:
+@accepts_keys
+def insertion_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
     """
     Insertion Sort - O(n²) worst case, O(n) best case
     Builds sorted array one item at a time by inserting elements into position.
@@ -92,6 +238,7 @@ def insertion_sort(arr: List[int]) -> Generator[Step, None, None]:
     arr = arr[:]
     n = len(arr)
     comparisons = writes = 0
+    emit = trace.append if trace is not None else make_step
 
     for i in range(1, n):
         key = arr[i]
@@ -99,24 +246,26 @@ def insertion_sort(arr: List[int]) -> Generator[Step, None, None]:
         
         while j >= 0:
             comparisons += 1
-            yield Step("compare", j, i, None, f"Comparing arr[{j}] with arr[{i}]")
+            yield emit("compare", j, i, None, "Comparing arr[{i}] with arr[{j}]")
             
             if arr[j] > key:
                 arr[j + 1] = arr[j]
                 writes += 1
-                yield Step("overwrite", j + 1, None, arr[j], f"Shifted arr[{j}] to arr[{j+1}]")
+                yield emit("overwrite", j + 1, None, arr[j], "Shifted arr[{arg}] to arr[{i}]", j)
                 j -= 1
             else:
                 break
 
         arr[j + 1] = key
         writes += 1
-        yield Step("overwrite", j + 1, None, key, f"Inserted {key} at position {j+1}")
+        yield emit("overwrite", j + 1, None, key, "Inserted {value} at position {i}")
 
-    yield Step("done", -1, -1, None, f"Insertion Sort Complete | Comparisons: {comparisons} | Writes: {writes}")
+    yield emit("done", -1, -1, None, f"Insertion Sort Complete | Comparisons: {comparisons} | Writes: {writes}")
+    return arr
 
 
-def merge_sort(arr: List[int]) -> Generator[Step, None, None]:
+@accepts_keys
+def merge_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
     """
     Merge Sort - O(n log n) time complexity
     Divide and conquer algorithm that divides array and merges sorted subarrays.
@@ -125,6 +274,7 @@ def merge_sort(arr: List[int]) -> Generator[Step, None, None]:
     n = len(arr)
     aux = arr[:]
     comparisons = writes = 0
+    emit = trace.append if trace is not None else make_step
 
     def merge(l: int, m: int, r: int):
         nonlocal comparisons, writes
@@ -132,31 +282,31 @@ def merge_sort(arr: List[int]) -> Generator[Step, None, None]:
 
         while i <= m and j <= r:
             comparisons += 1
-            yield Step("compare", i, j, None, f"Comparing arr[{i}] with arr[{j}]")
+            yield emit("compare", i, j, None, "Comparing arr[{i}] with arr[{j}]")
             
             if aux[i] <= aux[j]:
                 arr[k] = aux[i]
                 writes += 1
-                yield Step("overwrite", k, None, arr[k], f"Merged arr[{i}] to position {k}")
+                yield emit("overwrite", k, None, arr[k], "Merged arr[{arg}] to position {i}", i)
                 i += 1
             else:
                 arr[k] = aux[j]
                 writes += 1
-                yield Step("overwrite", k, None, arr[k], f"Merged arr[{j}] to position {k}")
+                yield emit("overwrite", k, None, arr[k], "Merged arr[{arg}] to position {i}", j)
                 j += 1
             k += 1
 
         while i <= m:
             arr[k] = aux[i]
             writes += 1
-            yield Step("overwrite", k, None, arr[k], f"Merged remaining arr[{i}] to position {k}")
+            yield emit("overwrite", k, None, arr[k], "Merged remaining arr[{arg}] to position {i}", i)
             i += 1
             k += 1
 
         while j <= r:
             arr[k] = aux[j]
             writes += 1
-            yield Step("overwrite", k, None, arr[k], f"Merged remaining arr[{j}] to position {k}")
+            yield emit("overwrite", k, None, arr[k], "Merged remaining arr[{arg}] to position {i}", j)
             j += 1
             k += 1
 
@@ -175,48 +325,1505 @@ def merge_sort(arr: List[int]) -> Generator[Step, None, None]:
     if n > 0:
         yield from msort(0, n - 1)
     
-    yield Step("done", -1, -1, None, f"Merge Sort Complete | Comparisons: {comparisons} | Writes: {writes}")
+    yield emit("done", -1, -1, None, f"Merge Sort Complete | Comparisons: {comparisons} | Writes: {writes}")
+    return arr
 
 
-def quick_sort(arr: List[int]) -> Generator[Step, None, None]:
+@accepts_keys
+def bottom_up_merge_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
+    """
+    Bottom-Up Merge Sort - O(n log n) time complexity, O(n) best case
+    Iterative merge sort: merges runs of width 1, 2, 4, ... from one buffer
+    into the other, swapping the buffers' roles after every pass instead of
+    copying back. Adjacent runs that are already in order are not merged.
+    """
+    src = arr[:]
+    n = len(src)
+    dst = src[:]
+    comparisons = writes = 0
+    emit = trace.append if trace is not None else make_step
+
+    # Invariant: at the start of each pass the displayed array equals src,
+    # so positions that keep their value need no overwrite step
+    width = 1
+    while width < n:
+        for l in range(0, n, 2 * width):
+            m = min(l + width, n)
+            r = min(l + 2 * width, n)
+            if m >= r:
+                dst[l:r] = src[l:r]
+                continue
+
+            comparisons += 1
+            yield emit("compare", m - 1, m, None, "Comparing arr[{i}] with arr[{j}] (run boundary)")
+            if src[m - 1] <= src[m]:
+                dst[l:r] = src[l:r]
+                continue
+
+            i, j, k = l, m, l
+            while i < m and j < r:
+                comparisons += 1
+                yield emit("compare", i, j, None, "Comparing arr[{i}] with arr[{j}]")
+
+                if src[i] <= src[j]:
+                    dst[k] = src[i]
+                    writes += 1
+                    yield emit("overwrite", k, None, dst[k], "Merged arr[{arg}] to position {i}", i)
+                    i += 1
+                else:
+                    dst[k] = src[j]
+                    writes += 1
+                    yield emit("overwrite", k, None, dst[k], "Merged arr[{arg}] to position {i}", j)
+                    j += 1
+                k += 1
+
+            while i < m:
+                dst[k] = src[i]
+                writes += 1
+                yield emit("overwrite", k, None, dst[k], "Merged remaining arr[{arg}] to position {i}", i)
+                i += 1
+                k += 1
+
+            # A right-run remainder is already in place (k == j)
+            dst[k:r] = src[k:r]
+
+        src, dst = dst, src
+        width *= 2
+
+    yield emit("done", -1, -1, None, f"Bottom-Up Merge Sort Complete | Comparisons: {comparisons} | Writes: {writes}")
+    return src
+
+
+@accepts_keys
+def quick_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
     """
     Quick Sort - O(n log n) average, O(n²) worst case
-    Divide and conquer using pivot partitioning.
+    Divide and conquer using pivot partitioning (last element as pivot).
+    Ranges wait on an explicit stack, so sorted input is slow but does not
+    hit the recursion limit.
     """
     arr = arr[:]
     n = len(arr)
     comparisons = swaps = 0
+    emit = trace.append if trace is not None else make_step
 
-    def partition(l: int, r: int):
-        nonlocal comparisons, swaps
+    # Right range pushed first: left ranges are processed first, as when recursing
+    stack = [(0, n - 1)]
+    while stack:
+        l, r = stack.pop()
+        if l >= r:
+            continue
         pivot = arr[r]
         i = l - 1
 
         for j in range(l, r):
             comparisons += 1
-            yield Step("compare", j, r, None, f"Comparing arr[{j}] with pivot {pivot}")
-            
+            yield emit("compare", j, r, None, "Comparing arr[{i}] with pivot {arg}", pivot)
+
             if arr[j] < pivot:
                 i += 1
                 arr[i], arr[j] = arr[j], arr[i]
                 swaps += 1
-                yield Step("swap", i, j, None, f"Swapped arr[{i}] and arr[{j}]")
+                yield emit("swap", i, j, None, "Swapped arr[{i}] and arr[{j}]")
 
         arr[i + 1], arr[r] = arr[r], arr[i + 1]
         swaps += 1
-        yield Step("swap", i + 1, r, None, f"Placed pivot {pivot} at position {i+1}")
-        return i + 1
+        yield emit("swap", i + 1, r, None, "Placed pivot {arg} at position {i}", pivot)
+        stack.append((i + 2, r))
+        stack.append((l, i))
 
-    def qsort(l: int, r: int):
-        if l < r:
-            pi = yield from partition(l, r)
-            yield from qsort(l, pi - 1)
-            yield from qsort(pi + 1, r)
+    yield emit("done", -1, -1, None, f"Quick Sort Complete | Comparisons: {comparisons} | Swaps: {swaps}")
+    return arr
 
-    if n > 0:
-        yield from qsort(0, n - 1)
-    
-    yield Step("done", -1, -1, None, f"Quick Sort Complete | Comparisons: {comparisons} | Swaps: {swaps}")
+
+# Introsort tuning: ranges up to INSERTION_CUTOFF elements are insertion
+# sorted, ranges above NINTHER_CUTOFF pick the pivot as a median of medians
+INSERTION_CUTOFF = 16
+NINTHER_CUTOFF = 40
+
+
+@accepts_keys
+def introsort(arr: List[int], trace=None, depth_limit: Optional[int] = None) -> Generator[Step, None, List[int]]:
+    """
+    Introsort - O(n log n) worst case
+    Quick sort with median-of-three (ninther for large ranges) pivots and
+    three-way partitioning, so duplicates cost nothing extra. Falls back to
+    heap sort on ranges nested deeper than ``depth_limit`` (default
+    2·log2 n) and insertion sorts small ranges.
+    """
+    arr = arr[:]
+    n = len(arr)
+    comparisons = swaps = 0
+    emit = trace.append if trace is not None else make_step
+    if depth_limit is None:
+        depth_limit = 2 * (n.bit_length() - 1)
+
+    def median_of_three(a: int, b: int, c: int):
+        nonlocal comparisons
+        comparisons += 1
+        yield emit("compare", a, b, None, "Pivot candidates arr[{i}] and arr[{j}]")
+        if arr[b] < arr[a]:
+            a, b = b, a
+        comparisons += 1
+        yield emit("compare", b, c, None, "Pivot candidates arr[{i}] and arr[{j}]")
+        if arr[c] < arr[b]:
+            comparisons += 1
+            yield emit("compare", a, c, None, "Pivot candidates arr[{i}] and arr[{j}]")
+            return a if arr[c] < arr[a] else c
+        return b
+
+    # Smaller side pushed last (processed first): stack depth stays O(log n)
+    stack = [(0, n - 1, 0)]
+    while stack:
+        l, r, depth = stack.pop()
+        size = r - l + 1
+        if size <= 1:
+            continue
+
+        if size <= INSERTION_CUTOFF:
+            for i in range(l + 1, r + 1):
+                j = i
+                while j > l:
+                    comparisons += 1
+                    yield emit("compare", j - 1, j, None, "Comparing arr[{i}] with arr[{j}]")
+                    if arr[j - 1] <= arr[j]:
+                        break
+                    arr[j - 1], arr[j] = arr[j], arr[j - 1]
+                    swaps += 1
+                    yield emit("swap", j - 1, j, None, "Swapped arr[{i}] and arr[{j}]")
+                    j -= 1
+            continue
+
+        if depth >= depth_limit:
+            # Heap sort arr[l..r]: heapify from the last parent, then extract
+            root_start, end = size // 2 - 1, size
+            while True:
+                if root_start >= 0:
+                    root = root_start
+                    root_start -= 1
+                else:
+                    end -= 1
+                    if end <= 0:
+                        break
+                    arr[l], arr[l + end] = arr[l + end], arr[l]
+                    swaps += 1
+                    yield emit("swap", l, l + end, None, "Moved heap maximum to position {j}")
+                    root = 0
+                while 2 * root + 1 < end:
+                    child = 2 * root + 1
+                    if child + 1 < end:
+                        comparisons += 1
+                        yield emit("compare", l + child, l + child + 1, None, "Comparing children arr[{i}] and arr[{j}]")
+                        if arr[l + child] < arr[l + child + 1]:
+                            child += 1
+                    comparisons += 1
+                    yield emit("compare", l + root, l + child, None, "Comparing arr[{i}] with child arr[{j}]")
+                    if arr[l + root] >= arr[l + child]:
+                        break
+                    arr[l + root], arr[l + child] = arr[l + child], arr[l + root]
+                    swaps += 1
+                    yield emit("swap", l + root, l + child, None, "Sifted arr[{i}] down to {j}")
+                    root = child
+            continue
+
+        m = (l + r) // 2
+        if size > NINTHER_CUTOFF:
+            step = size // 8
+            a = yield from median_of_three(l, l + step, l + 2 * step)
+            b = yield from median_of_three(m - step, m, m + step)
+            c = yield from median_of_three(r - 2 * step, r - step, r)
+            p = yield from median_of_three(a, b, c)
+        else:
+            p = yield from median_of_three(l, m, r)
+        if p != l:
+            arr[l], arr[p] = arr[p], arr[l]
+            swaps += 1
+            yield emit("swap", l, p, None, "Moved pivot {arg} to position {i}", arr[l])
+
+        # Dutch-flag partition: arr[l:lt] < pivot, arr[lt:i] == pivot, arr[gt+1:r+1] > pivot
+        pivot = arr[l]
+        lt, i, gt = l, l + 1, r
+        while i <= gt:
+            comparisons += 1
+            yield emit("compare", i, lt, None, "Comparing arr[{i}] with pivot {arg}", pivot)
+            if arr[i] < pivot:
+                arr[lt], arr[i] = arr[i], arr[lt]
+                swaps += 1
+                yield emit("swap", lt, i, None, "Swapped arr[{i}] and arr[{j}]")
+                lt += 1
+                i += 1
+            elif arr[i] > pivot:
+                arr[i], arr[gt] = arr[gt], arr[i]
+                swaps += 1
+                yield emit("swap", i, gt, None, "Swapped arr[{i}] and arr[{j}]")
+                gt -= 1
+            else:
+                i += 1
+
+        if lt - l < r - gt:
+            stack.append((gt + 1, r, depth + 1))
+            stack.append((l, lt - 1, depth + 1))
+        else:
+            stack.append((l, lt - 1, depth + 1))
+            stack.append((gt + 1, r, depth + 1))
+
+    yield emit("done", -1, -1, None, f"Introsort Complete | Comparisons: {comparisons} | Swaps: {swaps}")
+    return arr
+
+
+@accepts_keys
+def heap_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
+    """
+    Heap Sort - O(n log n) time complexity, in place
+    Builds a max-heap, then repeatedly moves the maximum to the end. Sifting
+    is bottom-up: follow the larger child down to a leaf (one comparison per
+    level), climb back to where the sifted value belongs and rotate the
+    path, which needs about half the comparisons of the textbook sift.
+    """
+    arr = arr[:]
+    n = len(arr)
+    comparisons = writes = swaps = 0
+    emit = trace.append if trace is not None else make_step
+
+    root_start, end = n // 2 - 1, n
+    while True:
+        if root_start >= 0:
+            root = root_start
+            root_start -= 1
+        else:
+            end -= 1
+            if end <= 0:
+                break
+            arr[0], arr[end] = arr[end], arr[0]
+            swaps += 1
+            yield emit("swap", 0, end, None, "Moved heap maximum to position {j}")
+            root = 0
+
+        # Leaf search along the larger children
+        leaf = root
+        while 2 * leaf + 2 < end:
+            child = 2 * leaf + 1
+            comparisons += 1
+            yield emit("compare", child, child + 1, None, "Comparing children arr[{i}] and arr[{j}]")
+            leaf = child + 1 if arr[child] < arr[child + 1] else child
+        if 2 * leaf + 1 < end:
+            leaf = 2 * leaf + 1
+
+        # Climb back up to the first value not smaller than the sifted one
+        value = arr[root]
+        while leaf != root:
+            comparisons += 1
+            yield emit("compare", leaf, root, None, "Comparing arr[{i}] with sifted value {arg}", value)
+            if arr[leaf] >= value:
+                break
+            leaf = (leaf - 1) // 2
+
+        # Rotate the path: ancestors move up one level, the value drops in
+        path = []
+        while leaf != root:
+            path.append(leaf)
+            leaf = (leaf - 1) // 2
+        position = root
+        for target in reversed(path):
+            arr[position] = arr[target]
+            writes += 1
+            yield emit("overwrite", position, None, arr[position], "Moved arr[{arg}] up to position {i}", target)
+            position = target
+        if path:
+            arr[position] = value
+            writes += 1
+            yield emit("overwrite", position, None, value, "Sifted {value} down to position {i}")
+
+    yield emit("done", -1, -1, None, f"Heap Sort Complete | Comparisons: {comparisons} | Writes: {writes} | Swaps: {swaps}")
+    return arr
+
+
+# Ciura's empirically best gap sequence, continued geometrically (x2.25)
+CIURA_GAPS = (1, 4, 10, 23, 57, 132, 301, 701)
+
+
+def shell_gaps(n: int) -> List[int]:
+    """Gaps for an n-element Shell sort, largest first."""
+    gaps = list(CIURA_GAPS)
+    while gaps[-1] * 9 // 4 < n:
+        gaps.append(gaps[-1] * 9 // 4)
+    return [gap for gap in reversed(gaps) if gap < n] or [1]
+
+
+@accepts_keys
+def shell_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
+    """
+    Shell Sort - about O(n^1.3) in practice with Ciura gaps
+    Insertion sort over elements ``gap`` apart for shrinking gaps, ending
+    with a plain insertion sort on an almost sorted array.
+    """
+    arr = arr[:]
+    n = len(arr)
+    comparisons = writes = 0
+    emit = trace.append if trace is not None else make_step
+
+    for gap in shell_gaps(n):
+        for i in range(gap, n):
+            key = arr[i]
+            j = i - gap
+
+            while j >= 0:
+                comparisons += 1
+                yield emit("compare", j, i, None, "Comparing arr[{i}] with arr[{j}]")
+
+                if arr[j] > key:
+                    arr[j + gap] = arr[j]
+                    writes += 1
+                    yield emit("overwrite", j + gap, None, arr[j], "Shifted arr[{arg}] to arr[{i}]", j)
+                    j -= gap
+                else:
+                    break
+
+            if j + gap != i:
+                arr[j + gap] = key
+                writes += 1
+                yield emit("overwrite", j + gap, None, key, "Inserted {value} at position {i}")
+
+    yield emit("done", -1, -1, None, f"Shell Sort Complete | Comparisons: {comparisons} | Writes: {writes}")
+    return arr
+
+
+# Natural merge sort tuning: consecutive wins before a merge starts galloping
+MIN_GALLOP = 7
+
+
+def min_run_length(n: int) -> int:
+    """Timsort's minimum run length: n / 2^k in [32, 64], rounded up."""
+    extra = 0
+    while n >= 64:
+        extra |= n & 1
+        n >>= 1
+    return n + extra
+
+
+@accepts_keys
+def natural_merge_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
+    """
+    Natural Merge Sort - O(n log n) worst case, O(n) on presorted data
+    Timsort-style: detects existing ascending/descending runs, extends short
+    runs to a minimum length with insertion sort and merges them under the
+    Timsort stack invariants. Merges switch to galloping (exponential
+    search plus block moves) when one run keeps winning.
+    """
+    arr = arr[:]
+    n = len(arr)
+    comparisons = writes = swaps = 0
+    emit = trace.append if trace is not None else make_step
+    min_run = min_run_length(n)
+
+    def gallop(seq, start: int, length: int, key, strict: bool, position, key_position: int):
+        """Count leading seq[start:start+length] items < key (<= if not strict)."""
+        nonlocal comparisons
+        lo, hi = 0, 1
+        while hi <= length:
+            comparisons += 1
+            yield emit("compare", position(start + hi - 1), key_position, None, "Galloping: comparing arr[{i}] with arr[{j}]")
+            item = seq[start + hi - 1]
+            if not (item < key if strict else item <= key):
+                break
+            lo, hi = hi, 2 * hi + 1
+        hi = min(hi - 1, length)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            comparisons += 1
+            yield emit("compare", position(start + mid), key_position, None, "Binary search: comparing arr[{i}] with arr[{j}]")
+            item = seq[start + mid]
+            if item < key if strict else item <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    runs = []  # (start, length) of pending runs, left to right
+    lo = 0
+    while True:
+        # Pick the next merge: Timsort invariants, or collapse once all runs exist
+        at = None
+        if len(runs) > 1:
+            x = len(runs) - 2
+            if lo >= n or (x > 0 and runs[x - 1][1] <= runs[x][1] + runs[x + 1][1]) \
+                    or (x > 1 and runs[x - 2][1] <= runs[x - 1][1] + runs[x][1]):
+                at = x - 1 if x > 0 and runs[x - 1][1] < runs[x + 1][1] else x
+            elif runs[x][1] <= runs[x + 1][1]:
+                at = x
+
+        if at is None:
+            if lo >= n:
+                break
+
+            # Detect the next run, reversing strictly descending ones
+            hi = lo + 1
+            if hi < n:
+                comparisons += 1
+                yield emit("compare", lo, hi, None, "Comparing arr[{i}] with arr[{j}] (run start)")
+                descending = arr[hi] < arr[lo]
+                hi += 1
+                while hi < n:
+                    comparisons += 1
+                    yield emit("compare", hi - 1, hi, None, "Comparing arr[{i}] with arr[{j}] (run)")
+                    if (arr[hi] < arr[hi - 1]) != descending:
+                        break
+                    hi += 1
+                if descending:
+                    i, j = lo, hi - 1
+                    while i < j:
+                        arr[i], arr[j] = arr[j], arr[i]
+                        swaps += 1
+                        yield emit("swap", i, j, None, "Reversing descending run: arr[{i}] and arr[{j}]")
+                        i += 1
+                        j -= 1
+
+            # Extend a short run with insertion sort
+            run_end = min(max(hi, lo + min_run), n)
+            for i in range(hi, run_end):
+                key = arr[i]
+                j = i - 1
+                while j >= lo:
+                    comparisons += 1
+                    yield emit("compare", j, i, None, "Comparing arr[{i}] with arr[{j}]")
+                    if arr[j] > key:
+                        arr[j + 1] = arr[j]
+                        writes += 1
+                        yield emit("overwrite", j + 1, None, arr[j], "Shifted arr[{arg}] to arr[{i}]", j)
+                        j -= 1
+                    else:
+                        break
+                if j + 1 != i:
+                    arr[j + 1] = key
+                    writes += 1
+                    yield emit("overwrite", j + 1, None, key, "Inserted {value} at position {i}")
+
+            runs.append((lo, run_end - lo))
+            lo = run_end
+            continue
+
+        # Merge runs[at] and runs[at + 1]
+        l, len_a = runs[at]
+        m = l + len_a
+        r = m + runs[at + 1][1]
+        runs[at:at + 2] = [(l, r - l)]
+
+        comparisons += 1
+        yield emit("compare", m - 1, m, None, "Comparing arr[{i}] with arr[{j}] (run boundary)")
+        if arr[m - 1] <= arr[m]:
+            continue
+
+        # The left run is buffered; writes land at k <= j, so the right
+        # run can be read in place
+        tmp = arr[l:m]
+        i, j, k = 0, m, l
+        while i < len_a and j < r:
+            wins_a = wins_b = 0
+            while i < len_a and j < r and wins_a < MIN_GALLOP and wins_b < MIN_GALLOP:
+                comparisons += 1
+                yield emit("compare", l + i, j, None, "Comparing arr[{i}] with arr[{j}]")
+                if arr[j] < tmp[i]:
+                    arr[k] = arr[j]
+                    writes += 1
+                    yield emit("overwrite", k, None, arr[k], "Merged arr[{arg}] to position {i}", j)
+                    j += 1
+                    wins_a, wins_b = 0, wins_b + 1
+                else:
+                    arr[k] = tmp[i]
+                    writes += 1
+                    yield emit("overwrite", k, None, arr[k], "Merged arr[{arg}] to position {i}", l + i)
+                    i += 1
+                    wins_a, wins_b = wins_a + 1, 0
+                k += 1
+
+            # Galloping: move whole blocks while either side keeps winning
+            while i < len_a and j < r:
+                count_a = yield from gallop(tmp, i, len_a - i, arr[j], False, lambda x: l + x, j)
+                for _ in range(count_a):
+                    arr[k] = tmp[i]
+                    writes += 1
+                    yield emit("overwrite", k, None, arr[k], "Galloped arr[{arg}] to position {i}", l + i)
+                    i += 1
+                    k += 1
+                if i >= len_a:
+                    break
+                count_b = yield from gallop(arr, j, r - j, tmp[i], True, lambda x: x, l + i)
+                for _ in range(count_b):
+                    arr[k] = arr[j]
+                    writes += 1
+                    yield emit("overwrite", k, None, arr[k], "Galloped arr[{arg}] to position {i}", j)
+                    j += 1
+                    k += 1
+                if count_a < MIN_GALLOP and count_b < MIN_GALLOP:
+                    break
+
+        while i < len_a:
+            arr[k] = tmp[i]
+            writes += 1
+            yield emit("overwrite", k, None, arr[k], "Merged remaining arr[{arg}] to position {i}", l + i)
+            i += 1
+            k += 1
+        # A right-run remainder is already in place (k == j)
+
+    yield emit("done", -1, -1, None, f"Natural Merge Sort Complete | Comparisons: {comparisons} | Writes: {writes} | Swaps: {swaps}")
+    return arr
+
+
+# Counting sort allocates one count per value in min..max: allowed up to
+# COUNTING_RANGE_FACTOR counts per element, or COUNTING_MIN_RANGE for any n
+COUNTING_RANGE_FACTOR = 4
+COUNTING_MIN_RANGE = 1 << 16
+
+
+def counting_range_fits(lo: int, hi: int, n: int) -> bool:
+    """True if a count array for values lo..hi is affordable for n elements."""
+    return hi - lo < max(COUNTING_RANGE_FACTOR * n, COUNTING_MIN_RANGE)
+
+
+@accepts_keys
+def counting_sort(arr: List[int], trace=None) -> Generator[Step, None, List[int]]:
+    """
+    Counting Sort - O(n + k) time, k = max - min + 1
+    Counts each value, turns the counts into start positions and places
+    every element (stably) straight into its final slot. No comparisons.
+    If the range is too wide for a count array (see counting_range_fits),
+    sorts by base-n digits with radix_sort instead: O(n · log_n k).
+    """
+    arr = arr[:]
+    n = len(arr)
+    writes = aux = 0
+    emit = trace.append if trace is not None else make_step
+
+    if n:
+        lo, hi = min(arr), max(arr)
+        if not counting_range_fits(lo, hi, n):
+            return (yield from radix_sort.__wrapped__(arr, trace, radix=max(2, n)))
+        counts = [0] * (hi - lo + 1)
+        for value in arr:
+            counts[value - lo] += 1
+        total = 0
+        for k, count in enumerate(counts):
+            counts[k], total = total, total + count
+
+        # Read from a copy while the array is overwritten in place
+        source = arr[:]
+        aux = len(counts) + n
+        for index, value in enumerate(source):
+            position = counts[value - lo]
+            counts[value - lo] += 1
+            arr[position] = value
+            writes += 1
+            yield emit("overwrite", position, None, value, "Placed arr[{arg}] = {value} at position {i}", index)
+
+    yield emit("done", -1, -1, None, f"Counting Sort Complete | Writes: {writes} | Aux memory: {aux} slots")
+    return arr
+
+
+@accepts_keys
+def radix_sort(arr: List[int], trace=None, radix: int = 256) -> Generator[Step, None, List[int]]:
+    """
+    LSD Radix Sort - O(d · (n + radix)) time, d = digits of (max - min)
+    One stable counting-sort pass per base-``radix`` digit, least significant
+    first, alternating between two buffers. Passes in which every element
+    has the same digit are skipped.
+    """
+    arr = arr[:]
+    n = len(arr)
+    writes = passes = aux = 0
+    emit = trace.append if trace is not None else make_step
+
+    if n:
+        lo = min(arr)
+        span = max(arr) - lo
+        src, dst = arr, [0] * n
+        aux = n + radix
+        place = 1
+        # Each pass rewrites every position, so the displayed array is dst
+        while place <= span:
+            counts = [0] * radix
+            for value in src:
+                counts[(value - lo) // place % radix] += 1
+            if max(counts) == n:
+                place *= radix
+                continue
+            total = 0
+            for k, count in enumerate(counts):
+                counts[k], total = total, total + count
+
+            for value in src:
+                digit = (value - lo) // place % radix
+                position = counts[digit]
+                counts[digit] += 1
+                dst[position] = value
+                writes += 1
+                yield emit("overwrite", position, None, value, "Digit {arg}: placed {value} at position {i}", digit)
+            src, dst = dst, src
+            passes += 1
+            place *= radix
+        arr = src
+
+    yield emit("done", -1, -1, None,
+               f"Radix Sort Complete | Passes: {passes} | Writes: {writes} | Aux memory: {aux} slots")
+    return arr
+
+
+@accepts_keys
+def bucket_sort(arr: List[int], trace=None, buckets: Optional[int] = None) -> Generator[Step, None, List[int]]:
+    """
+    Bucket Sort - O(n) average for evenly spread values, O(n²) worst case
+    Distributes values over ``buckets`` equal-width ranges (default: n),
+    writes the buckets back in order and insertion sorts each bucket's
+    range of the array.
+    """
+    arr = arr[:]
+    n = len(arr)
+    comparisons = writes = aux = 0
+    emit = trace.append if trace is not None else make_step
+
+    if n:
+        count = max(1, buckets or n)
+        lo = min(arr)
+        width = (max(arr) - lo) // count + 1
+        bins = [[] for _ in range(count)]
+        for value in arr:
+            bins[(value - lo) // width].append(value)
+        aux = n + count
+
+        end = 0
+        for b, contents in enumerate(bins):
+            start = end
+            for value in contents:
+                arr[end] = value
+                writes += 1
+                yield emit("overwrite", end, None, value, "Bucket {arg}: wrote {value} to position {i}", b)
+                end += 1
+
+            for i in range(start + 1, end):
+                key = arr[i]
+                j = i - 1
+                while j >= start:
+                    comparisons += 1
+                    yield emit("compare", j, i, None, "Comparing arr[{i}] with arr[{j}]")
+                    if arr[j] > key:
+                        arr[j + 1] = arr[j]
+                        writes += 1
+                        yield emit("overwrite", j + 1, None, arr[j], "Shifted arr[{arg}] to arr[{i}]", j)
+                        j -= 1
+                    else:
+                        break
+                if j + 1 != i:
+                    arr[j + 1] = key
+                    writes += 1
+                    yield emit("overwrite", j + 1, None, key, "Inserted {value} at position {i}")
+
+    yield emit("done", -1, -1, None,
+               f"Bucket Sort Complete | Comparisons: {comparisons} | Writes: {writes} | Aux memory: {aux} slots")
+    return arr
+
+
+@accepts_keys
+def parallel_merge_sort(arr: List[int], trace=None, workers: Optional[int] = None) -> Generator[Step, None, List[int]]:
+    """
+    Parallel Merge Sort - O(n log n) work spread over ``workers`` processes
+    Merge sorts one chunk per worker, then k-way merges the chunks with one
+    output range per worker (see parallel_sort). Large arrays run in a
+    process pool over shared memory. The trace is coarse: every element is
+    written once when its chunk is sorted and once when the merge places it.
+    """
+    arr = arr[:]
+    emit = trace.append if trace is not None else make_step
+
+    phases = parallel_merge_phases(arr, workers)
+    while True:
+        try:
+            phase, lo, hi, view = next(phases)
+        except StopIteration as stop:
+            stats = stop.value
+            break
+        template = "Chunk sorted: {value} at position {i}" if phase == "chunk" else "Merged {value} into position {i}"
+        for k, value in enumerate(view[lo:hi].tolist(), lo):
+            arr[k] = value
+            yield emit("overwrite", k, None, value, template)
+
+    yield emit("done", -1, -1, None,
+               f"Parallel Merge Sort Complete | Chunks: {stats['chunks']} | Workers: {stats['workers']}"
+               f" | Comparisons: {stats['comparisons']} | Writes: {stats['writes']}")
+    return arr
+
+
+# ============================================================================
+# Counting Variants
+# Plain (non-generator) implementations that only count operations. Each one
+# performs exactly the comparisons, swaps and writes its traced counterpart
+# reports, without the cost of yielding a Step per operation.
+# ============================================================================
+
+class BubbleSort(SortingAlgorithm):
+    """Counting variant of bubble_sort."""
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        comparisons = swaps = 0
+        profiler = self.profiler
+
+        for i in range(n):
+            if profiler is not None:
+                profiler.enter("pass")
+                swaps_before = swaps
+            swapped = False
+            for j in range(0, n - i - 1):
+                comparisons += 1
+                if arr[j] > arr[j + 1]:
+                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                    swaps += 1
+                    swapped = True
+            if profiler is not None:
+                profiler.exit("pass", comparisons=n - i - 1, swaps=swaps - swaps_before)
+            if not swapped:
+                break
+
+        self.comparisons += comparisons
+        self.swaps += swaps
+        return arr
+
+
+class SelectionSort(SortingAlgorithm):
+    """Counting variant of selection_sort."""
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        swaps = 0
+
+        for i in range(n):
+            min_idx = i
+            for j in range(i + 1, n):
+                if arr[j] < arr[min_idx]:
+                    min_idx = j
+            if min_idx != i:
+                arr[i], arr[min_idx] = arr[min_idx], arr[i]
+                swaps += 1
+
+        # Every pair (i, j) with i < j is compared exactly once
+        self.comparisons += n * (n - 1) // 2
+        self.swaps += swaps
+        return arr
+
+
+class InsertionSort(SortingAlgorithm):
+    """Counting variant of insertion_sort."""
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        comparisons = writes = 0
+
+        for i in range(1, n):
+            key = arr[i]
+            j = i - 1
+            while j >= 0:
+                comparisons += 1
+                if arr[j] > key:
+                    arr[j + 1] = arr[j]
+                    writes += 1
+                    j -= 1
+                else:
+                    break
+            arr[j + 1] = key
+            writes += 1
+
+        self.comparisons += comparisons
+        self.writes += writes
+        return arr
+
+
+class MergeSort(SortingAlgorithm):
+    """Counting variant of merge_sort."""
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        aux = arr[:]
+        self.aux_space = len(aux)
+        profiler = self.profiler
+
+        def msort(l: int, r: int):
+            if l >= r:
+                return
+            m = (l + r) // 2
+            msort(l, m)
+            msort(m + 1, r)
+            if profiler is not None:
+                profiler.enter("copy")
+            aux[l:r + 1] = arr[l:r + 1]
+            if profiler is not None:
+                profiler.exit("copy")
+                profiler.enter("merge")
+
+            i, j, k = l, m + 1, l
+            comparisons = 0
+            while i <= m and j <= r:
+                comparisons += 1
+                if aux[i] <= aux[j]:
+                    arr[k] = aux[i]
+                    i += 1
+                else:
+                    arr[k] = aux[j]
+                    j += 1
+                k += 1
+            # Remaining tail of either half is copied one write per element
+            if i <= m:
+                arr[k:r + 1] = aux[i:m + 1]
+            else:
+                arr[k:r + 1] = aux[j:r + 1]
+            self.comparisons += comparisons
+            self.writes += r - l + 1
+            if profiler is not None:
+                profiler.exit("merge", comparisons=comparisons, writes=r - l + 1)
+
+        if arr:
+            msort(0, len(arr) - 1)
+        return arr
+
+
+class BottomUpMergeSort(SortingAlgorithm):
+    """Counting variant of bottom_up_merge_sort."""
+
+    def sort(self) -> List[int]:
+        src = self.arr
+        n = len(src)
+        dst = src[:]
+        self.aux_space = n
+        comparisons = writes = 0
+        profiler = self.profiler
+
+        width = 1
+        while width < n:
+            if profiler is not None:
+                profiler.enter("pass")
+                before = comparisons, writes
+            for l in range(0, n, 2 * width):
+                m = min(l + width, n)
+                r = min(l + 2 * width, n)
+                if m >= r:
+                    dst[l:r] = src[l:r]
+                    continue
+                comparisons += 1
+                if src[m - 1] <= src[m]:
+                    dst[l:r] = src[l:r]
+                    continue
+
+                i, j, k = l, m, l
+                while i < m and j < r:
+                    if src[i] <= src[j]:
+                        dst[k] = src[i]
+                        i += 1
+                    else:
+                        dst[k] = src[j]
+                        j += 1
+                    k += 1
+                comparisons += k - l
+                # Left remainder is written, right remainder is already in place
+                dst[k:k + m - i] = src[i:m]
+                writes += k - l + m - i
+                dst[k + m - i:r] = src[j:r]
+
+            if profiler is not None:
+                profiler.exit("pass", comparisons=comparisons - before[0], writes=writes - before[1])
+            src, dst = dst, src
+            width *= 2
+
+        self.comparisons += comparisons
+        self.writes += writes
+        return src
+
+
+class QuickSort(SortingAlgorithm):
+    """Counting variant of quick_sort (explicit stack, same partitions)."""
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        comparisons = swaps = 0
+        profiler = self.profiler
+        stack = [(0, len(arr) - 1)]
+
+        while stack:
+            l, r = stack.pop()
+            if l >= r:
+                continue
+            if profiler is not None:
+                profiler.enter("partition")
+                swaps_before = swaps
+            pivot = arr[r]
+            i = l - 1
+            for j in range(l, r):
+                if arr[j] < pivot:
+                    i += 1
+                    arr[i], arr[j] = arr[j], arr[i]
+                    swaps += 1
+            comparisons += r - l
+            arr[i + 1], arr[r] = arr[r], arr[i + 1]
+            swaps += 1
+            if profiler is not None:
+                profiler.exit("partition", comparisons=r - l, swaps=swaps - swaps_before)
+            stack.append((i + 2, r))
+            stack.append((l, i))
+
+        self.comparisons += comparisons
+        self.swaps += swaps
+        return arr
+
+
+class IntroSort(SortingAlgorithm):
+    """Counting variant of introsort."""
+
+    depth_limit: Optional[int] = None
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        comparisons = swaps = 0
+        depth_limit = self.depth_limit
+        if depth_limit is None:
+            depth_limit = 2 * (n.bit_length() - 1)
+        profiler = self.profiler
+
+        def median_of_three(a: int, b: int, c: int) -> int:
+            nonlocal comparisons
+            comparisons += 2
+            if arr[b] < arr[a]:
+                a, b = b, a
+            if arr[c] < arr[b]:
+                comparisons += 1
+                return a if arr[c] < arr[a] else c
+            return b
+
+        stack = [(0, n - 1, 0)]
+        while stack:
+            l, r, depth = stack.pop()
+            size = r - l + 1
+            if size <= 1:
+                continue
+            if profiler is not None:
+                before = comparisons, swaps
+
+            if size <= INSERTION_CUTOFF:
+                if profiler is not None:
+                    profiler.enter("insertion sort")
+                for i in range(l + 1, r + 1):
+                    j = i
+                    while j > l:
+                        comparisons += 1
+                        if arr[j - 1] <= arr[j]:
+                            break
+                        arr[j - 1], arr[j] = arr[j], arr[j - 1]
+                        swaps += 1
+                        j -= 1
+                if profiler is not None:
+                    profiler.exit("insertion sort", comparisons - before[0], swaps - before[1])
+                continue
+
+            if depth >= depth_limit:
+                if profiler is not None:
+                    profiler.enter("heap sort")
+                root_start, end = size // 2 - 1, size
+                while True:
+                    if root_start >= 0:
+                        root = root_start
+                        root_start -= 1
+                    else:
+                        end -= 1
+                        if end <= 0:
+                            break
+                        arr[l], arr[l + end] = arr[l + end], arr[l]
+                        swaps += 1
+                        root = 0
+                    while 2 * root + 1 < end:
+                        child = 2 * root + 1
+                        if child + 1 < end:
+                            comparisons += 1
+                            if arr[l + child] < arr[l + child + 1]:
+                                child += 1
+                        comparisons += 1
+                        if arr[l + root] >= arr[l + child]:
+                            break
+                        arr[l + root], arr[l + child] = arr[l + child], arr[l + root]
+                        swaps += 1
+                        root = child
+                if profiler is not None:
+                    profiler.exit("heap sort", comparisons - before[0], swaps - before[1])
+                continue
+
+            if profiler is not None:
+                profiler.enter("pivot")
+            m = (l + r) // 2
+            if size > NINTHER_CUTOFF:
+                step = size // 8
+                p = median_of_three(
+                    median_of_three(l, l + step, l + 2 * step),
+                    median_of_three(m - step, m, m + step),
+                    median_of_three(r - 2 * step, r - step, r),
+                )
+            else:
+                p = median_of_three(l, m, r)
+            if p != l:
+                arr[l], arr[p] = arr[p], arr[l]
+                swaps += 1
+            if profiler is not None:
+                profiler.exit("pivot", comparisons - before[0], swaps - before[1])
+                profiler.enter("partition")
+                before = comparisons, swaps
+
+            pivot = arr[l]
+            lt, i, gt = l, l + 1, r
+            while i <= gt:
+                value = arr[i]
+                if value < pivot:
+                    arr[lt], arr[i] = value, arr[lt]
+                    swaps += 1
+                    lt += 1
+                    i += 1
+                elif value > pivot:
+                    arr[i], arr[gt] = arr[gt], value
+                    swaps += 1
+                    gt -= 1
+                else:
+                    i += 1
+            comparisons += i - l - 1 + r - gt
+            if profiler is not None:
+                profiler.exit("partition", comparisons - before[0], swaps - before[1])
+
+            if lt - l < r - gt:
+                stack.append((gt + 1, r, depth + 1))
+                stack.append((l, lt - 1, depth + 1))
+            else:
+                stack.append((l, lt - 1, depth + 1))
+                stack.append((gt + 1, r, depth + 1))
+
+        self.comparisons += comparisons
+        self.swaps += swaps
+        return arr
+
+
+class HeapSort(SortingAlgorithm):
+    """Counting variant of heap_sort."""
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        comparisons = writes = swaps = 0
+        profiler = self.profiler
+        if profiler is not None:
+            phase = "heapify"
+            profiler.enter(phase)
+            before = comparisons, swaps, writes
+
+        root_start, end = n // 2 - 1, n
+        while True:
+            if root_start >= 0:
+                root = root_start
+                root_start -= 1
+            else:
+                end -= 1
+                if profiler is not None and phase == "heapify":
+                    profiler.exit(phase, comparisons - before[0], swaps - before[1], writes - before[2])
+                    phase = "extract"
+                    profiler.enter(phase)
+                    before = comparisons, swaps, writes
+                if end <= 0:
+                    break
+                arr[0], arr[end] = arr[end], arr[0]
+                swaps += 1
+                root = 0
+
+            leaf = root
+            while 2 * leaf + 2 < end:
+                child = 2 * leaf + 1
+                comparisons += 1
+                leaf = child + 1 if arr[child] < arr[child + 1] else child
+            if 2 * leaf + 1 < end:
+                leaf = 2 * leaf + 1
+
+            value = arr[root]
+            while leaf != root:
+                comparisons += 1
+                if arr[leaf] >= value:
+                    break
+                leaf = (leaf - 1) // 2
+
+            path = []
+            while leaf != root:
+                path.append(leaf)
+                leaf = (leaf - 1) // 2
+            position = root
+            for target in reversed(path):
+                arr[position] = arr[target]
+                position = target
+            if path:
+                arr[position] = value
+                writes += len(path) + 1
+
+        if profiler is not None:
+            profiler.exit(phase, comparisons - before[0], swaps - before[1], writes - before[2])
+        self.comparisons += comparisons
+        self.writes += writes
+        self.swaps += swaps
+        return arr
+
+
+class ShellSort(SortingAlgorithm):
+    """Counting variant of shell_sort."""
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        comparisons = writes = 0
+        profiler = self.profiler
+
+        for gap in shell_gaps(n):
+            if profiler is not None:
+                profiler.enter("gap pass")
+                before = comparisons, writes
+            for i in range(gap, n):
+                key = arr[i]
+                j = i - gap
+                while j >= 0:
+                    comparisons += 1
+                    if arr[j] > key:
+                        arr[j + gap] = arr[j]
+                        writes += 1
+                        j -= gap
+                    else:
+                        break
+                if j + gap != i:
+                    arr[j + gap] = key
+                    writes += 1
+            if profiler is not None:
+                profiler.exit("gap pass", comparisons=comparisons - before[0], writes=writes - before[1])
+
+        self.comparisons += comparisons
+        self.writes += writes
+        return arr
+
+
+class NaturalMergeSort(SortingAlgorithm):
+    """Counting variant of natural_merge_sort."""
+
+    def _gallop(self, seq, start: int, length: int, key, strict: bool) -> int:
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter("gallop")
+            comparisons_before = self.comparisons
+        lo, hi = 0, 1
+        while hi <= length:
+            self.comparisons += 1
+            item = seq[start + hi - 1]
+            if not (item < key if strict else item <= key):
+                break
+            lo, hi = hi, 2 * hi + 1
+        hi = min(hi - 1, length)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            self.comparisons += 1
+            item = seq[start + mid]
+            if item < key if strict else item <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if profiler is not None:
+            profiler.exit("gallop", comparisons=self.comparisons - comparisons_before)
+        return lo
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        min_run = min_run_length(n)
+        runs = []
+        lo = 0
+        profiler = self.profiler
+
+        while True:
+            at = None
+            if len(runs) > 1:
+                x = len(runs) - 2
+                if lo >= n or (x > 0 and runs[x - 1][1] <= runs[x][1] + runs[x + 1][1]) \
+                        or (x > 1 and runs[x - 2][1] <= runs[x - 1][1] + runs[x][1]):
+                    at = x - 1 if x > 0 and runs[x - 1][1] < runs[x + 1][1] else x
+                elif runs[x][1] <= runs[x + 1][1]:
+                    at = x
+
+            if profiler is not None:
+                before = self.comparisons, self.swaps, self.writes
+            if at is None:
+                if lo >= n:
+                    break
+                if profiler is not None:
+                    profiler.enter("find run")
+                hi = lo + 1
+                if hi < n:
+                    self.comparisons += 1
+                    descending = arr[hi] < arr[lo]
+                    hi += 1
+                    while hi < n:
+                        self.comparisons += 1
+                        if (arr[hi] < arr[hi - 1]) != descending:
+                            break
+                        hi += 1
+                    if descending:
+                        arr[lo:hi] = arr[lo:hi][::-1]
+                        self.swaps += (hi - lo) // 2
+
+                run_end = min(max(hi, lo + min_run), n)
+                for i in range(hi, run_end):
+                    key = arr[i]
+                    j = i - 1
+                    while j >= lo:
+                        self.comparisons += 1
+                        if arr[j] > key:
+                            arr[j + 1] = arr[j]
+                            self.writes += 1
+                            j -= 1
+                        else:
+                            break
+                    if j + 1 != i:
+                        arr[j + 1] = key
+                        self.writes += 1
+
+                runs.append((lo, run_end - lo))
+                lo = run_end
+                if profiler is not None:
+                    profiler.exit("find run", self.comparisons - before[0],
+                                  self.swaps - before[1], self.writes - before[2])
+                continue
+
+            l, len_a = runs[at]
+            m = l + len_a
+            r = m + runs[at + 1][1]
+            runs[at:at + 2] = [(l, r - l)]
+            if profiler is not None:
+                profiler.enter("merge")
+
+            self.comparisons += 1
+            if arr[m - 1] <= arr[m]:
+                if profiler is not None:
+                    profiler.exit("merge", comparisons=1)
+                continue
+
+            tmp = arr[l:m]
+            self.aux_space = max(self.aux_space, len_a)
+            i, j, k = 0, m, l
+            while i < len_a and j < r:
+                wins_a = wins_b = 0
+                while i < len_a and j < r and wins_a < MIN_GALLOP and wins_b < MIN_GALLOP:
+                    self.comparisons += 1
+                    if arr[j] < tmp[i]:
+                        arr[k] = arr[j]
+                        j += 1
+                        wins_a, wins_b = 0, wins_b + 1
+                    else:
+                        arr[k] = tmp[i]
+                        i += 1
+                        wins_a, wins_b = wins_a + 1, 0
+                    k += 1
+
+                while i < len_a and j < r:
+                    count_a = self._gallop(tmp, i, len_a - i, arr[j], False)
+                    arr[k:k + count_a] = tmp[i:i + count_a]
+                    i += count_a
+                    k += count_a
+                    if i >= len_a:
+                        break
+                    count_b = self._gallop(arr, j, r - j, tmp[i], True)
+                    arr[k:k + count_b] = arr[j:j + count_b]
+                    j += count_b
+                    k += count_b
+                    if count_a < MIN_GALLOP and count_b < MIN_GALLOP:
+                        break
+
+            arr[k:k + len_a - i] = tmp[i:]
+            # Every element placed by the merge was one write; the right
+            # remainder stays in place
+            self.writes += k - l + len_a - i
+            if profiler is not None:
+                profiler.exit("merge", self.comparisons - before[0], writes=self.writes - before[2])
+
+        return arr
+
+
+def radix_passes(arr: List[int], radix: int, profiler=None) -> Tuple[List[int], int]:
+    """
+    LSD radix sort of ``arr`` in base ``radix`` (the work of RadixSort).
+
+    Reuses ``arr`` as one of its two buffers and returns the sorted buffer
+    with the number of writes. ``profiler`` gets "count" and "scatter"
+    phases as in the counting variants.
+    """
+    n = len(arr)
+    if not n:
+        return arr, 0
+    lo = min(arr)
+    span = max(arr) - lo
+    src, dst = arr, [0] * n
+    writes = 0
+
+    place = 1
+    while place <= span:
+        if profiler is not None:
+            profiler.enter("count")
+        counts = [0] * radix
+        for value in src:
+            counts[(value - lo) // place % radix] += 1
+        if max(counts) == n:
+            if profiler is not None:
+                profiler.exit("count")
+            place *= radix
+            continue
+        total = 0
+        for k, count in enumerate(counts):
+            counts[k], total = total, total + count
+        if profiler is not None:
+            profiler.exit("count")
+            profiler.enter("scatter")
+        for value in src:
+            digit = (value - lo) // place % radix
+            dst[counts[digit]] = value
+            counts[digit] += 1
+        writes += n
+        if profiler is not None:
+            profiler.exit("scatter", writes=n)
+        src, dst = dst, src
+        place *= radix
+    return src, writes
+
+
+class CountingSort(SortingAlgorithm):
+    """Counting variant of counting_sort."""
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        if not n:
+            return arr
+        profiler = self.profiler
+        lo, hi = min(arr), max(arr)
+        if not counting_range_fits(lo, hi, n):
+            radix = max(2, n)
+            arr, writes = radix_passes(arr, radix, profiler)
+            self.writes += writes
+            self.aux_space = max(self.aux_space, n + radix)
+            return arr
+        if profiler is not None:
+            profiler.enter("count")
+        counts = [0] * (hi - lo + 1)
+        for value in arr:
+            counts[value - lo] += 1
+        total = 0
+        for k, count in enumerate(counts):
+            counts[k], total = total, total + count
+        if profiler is not None:
+            profiler.exit("count")
+            profiler.enter("place")
+
+        source = arr[:]
+        for value in source:
+            arr[counts[value - lo]] = value
+            counts[value - lo] += 1
+        self.writes += n
+        if profiler is not None:
+            profiler.exit("place", writes=n)
+        self.aux_space = max(self.aux_space, len(counts) + n)
+        return arr
+
+
+class RadixSort(SortingAlgorithm):
+    """Counting variant of radix_sort."""
+
+    radix = 256
+
+    def sort(self) -> List[int]:
+        arr, writes = radix_passes(self.arr, self.radix, self.profiler)
+        self.writes += writes
+        if arr:
+            self.aux_space = max(self.aux_space, len(arr) + self.radix)
+        return arr
+
+
+class BucketSort(SortingAlgorithm):
+    """Counting variant of bucket_sort."""
+
+    buckets: Optional[int] = None
+
+    def sort(self) -> List[int]:
+        arr = self.arr
+        n = len(arr)
+        if not n:
+            return arr
+        count = max(1, self.buckets or n)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.enter("distribute")
+        lo = min(arr)
+        width = (max(arr) - lo) // count + 1
+        bins = [[] for _ in range(count)]
+        for value in arr:
+            bins[(value - lo) // width].append(value)
+        self.aux_space = max(self.aux_space, n + count)
+        if profiler is not None:
+            profiler.exit("distribute")
+            profiler.enter("insertion sort")
+
+        comparisons = writes = 0
+        end = 0
+        for contents in bins:
+            start = end
+            arr[start:start + len(contents)] = contents
+            end += len(contents)
+            writes += len(contents)
+            for i in range(start + 1, end):
+                key = arr[i]
+                j = i - 1
+                while j >= start:
+                    comparisons += 1
+                    if arr[j] > key:
+                        arr[j + 1] = arr[j]
+                        writes += 1
+                        j -= 1
+                    else:
+                        break
+                if j + 1 != i:
+                    arr[j + 1] = key
+                    writes += 1
+        if profiler is not None:
+            profiler.exit("insertion sort", comparisons=comparisons, writes=writes)
+
+        self.comparisons += comparisons
+        self.writes += writes
+        return arr
+
+
+class ParallelMergeSort(SortingAlgorithm):
+    """
+    Counting variant of parallel_merge_sort.
+
+    Reports the comparisons and writes done by the workers, not the coarse
+    trace's one write per element and phase.
+    """
+
+    workers: Optional[int] = None
+
+    def sort(self) -> List[int]:
+        phases = parallel_merge_phases(self.arr, self.workers)
+        while True:
+            try:
+                next(phases)
+            except StopIteration as stop:
+                stats = stop.value
+                break
+        self.comparisons += stats["comparisons"]
+        self.writes += stats["writes"]
+        self.aux_space = max(self.aux_space, stats["aux_space"])
+        self.arr = stats["result"]
+        return self.arr
 
 
 # Export all algorithms
@@ -225,5 +1832,44 @@ ALGORITHMS = {
     "Selection Sort": selection_sort,
     "Insertion Sort": insertion_sort,
     "Merge Sort": merge_sort,
+    "Bottom-Up Merge Sort": bottom_up_merge_sort,
     "Quick Sort": quick_sort,
+    "Introsort": introsort,
+    "Heap Sort": heap_sort,
+    "Shell Sort": shell_sort,
+    "Natural Merge Sort": natural_merge_sort,
+    "Counting Sort": counting_sort,
+    "Radix Sort": radix_sort,
+    "Bucket Sort": bucket_sort,
+    "Parallel Merge Sort": parallel_merge_sort,
+}
+
+# Metrics-only counterparts, keyed like ALGORITHMS
+COUNTING_ALGORITHMS = {
+    "Bubble Sort": BubbleSort,
+    "Selection Sort": SelectionSort,
+    "Insertion Sort": InsertionSort,
+    "Merge Sort": MergeSort,
+    "Bottom-Up Merge Sort": BottomUpMergeSort,
+    "Quick Sort": QuickSort,
+    "Introsort": IntroSort,
+    "Heap Sort": HeapSort,
+    "Shell Sort": ShellSort,
+    "Natural Merge Sort": NaturalMergeSort,
+    "Counting Sort": CountingSort,
+    "Radix Sort": RadixSort,
+    "Bucket Sort": BucketSort,
+    "Parallel Merge Sort": ParallelMergeSort,
+}
+
+# Algorithms whose traces show block results rather than every operation;
+# their counting variants report the real work, so counts differ
+COARSE_TRACES = {"Parallel Merge Sort"}
+
+# Algorithms that keep equal keys in input order (like sorted()), with and
+# without reverse=True; the others may reorder records with equal keys
+STABLE_ALGORITHMS = {
+    "Bubble Sort", "Insertion Sort", "Merge Sort", "Bottom-Up Merge Sort",
+    "Natural Merge Sort", "Counting Sort", "Radix Sort", "Bucket Sort",
+    "Parallel Merge Sort",
 }
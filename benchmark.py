@@ -3,62 +3,693 @@
 # Performance comparison of different sorting algorithms
 # ============================================================================
 
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import platform
+import signal
+import subprocess
+import sys
 import time
+import tracemalloc
 import random
-from algorithms import ALGORITHMS
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from algorithms import ALGORITHMS, COUNTING_ALGORITHMS
+from phase_profiler import PhaseProfiler
+from reference_sorts import REFERENCE_SORTS, VECTORIZED_SORTS
+
+
+def _nearly_sorted(n: int, rng=random) -> list:
+    """Sorted data with ~5% of elements swapped to random positions."""
+    data = list(range(n))
+    for _ in range(max(1, n // 20)):
+        i, j = rng.randrange(n), rng.randrange(n)
+        data[i], data[j] = data[j], data[i]
+    return data
+
+
+# Input distributions: name -> generator of an n-element list
+DISTRIBUTIONS = {
+    "random": lambda n, rng=random: [rng.randint(0, n) for _ in range(n)],
+    "sorted": lambda n, rng=random: list(range(n)),
+    "reversed": lambda n, rng=random: list(range(n, 0, -1)),
+    "nearly sorted": _nearly_sorted,
+    "few unique": lambda n, rng=random: [rng.randint(0, 4) for _ in range(n)],
+    "organ pipe": lambda n, rng=random: list(range(n // 2)) + list(range(n - n // 2, 0, -1)),
+    "sawtooth": lambda n, rng=random: [i % max(1, int(math.sqrt(n))) for i in range(n)],
+}
+
+
+def make_input(dist: str, size: int, run: int = 0, seed: int = 0) -> list:
+    """
+    Deterministic input for one benchmark run.
+
+    The same (seed, distribution, size, run) always yields the same data,
+    so operation counts are directly comparable between saved results.
+    """
+    return DISTRIBUTIONS[dist](size, random.Random(f"{seed}:{dist}:{size}:{run}"))
+
+
+# Complexity models for fitting: name -> f(n)
+COMPLEXITY_MODELS = {
+    "n": lambda n: n,
+    "n log n": lambda n: n * math.log2(n),
+    "n²": lambda n: n * n,
+}
+
+
+def fit_complexity(sizes, values) -> dict:
+    """
+    Fit measurements against input size.
+
+    Returns the empirical exponent (slope of log(value) over log(n)), the
+    coefficient c of each model c·f(n) (mean of value / f(n)), and the
+    model whose ratios value / f(n) stay closest to constant. Fewer than
+    two distinct sizes give no fit.
+    """
+    points = [(n, v) for n, v in zip(sizes, values) if n > 1 and v > 0]
+    if len({n for n, _ in points}) < 2:
+        return {"exponent": None, "coefficients": {}, "model": None}
+
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(v) for _, v in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    exponent = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+    coefficients, errors = {}, {}
+    for name, f in COMPLEXITY_MODELS.items():
+        ratios = [v / f(n) for n, v in points]
+        c = sum(ratios) / len(ratios)
+        coefficients[name] = c
+        errors[name] = sum((r / c - 1) ** 2 for r in ratios)
+
+    return {
+        "exponent": exponent,
+        "coefficients": coefficients,
+        "model": min(errors, key=errors.get),
+    }
+
+
+CSV_FIELDS = ["algorithm", "size", "distribution", "kind", "average", "min", "max",
+              "operations", "slowdown", "runs", "timeouts", "aux_space", "peak_bytes",
+              "peak_blocks", "max_depth", "times"]
+
+
+def environment_metadata() -> dict:
+    """Describe the machine and code version the results were measured on."""
+    metadata = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        metadata["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        metadata["git_commit"] = None
+    return metadata
+
+
+def _welch_t(sample, baseline):
+    """Welch's t statistic for sample mean > baseline mean, or None if undefined."""
+    if len(sample) < 2 or len(baseline) < 2:
+        return None
+    mean_a, mean_b = sum(sample) / len(sample), sum(baseline) / len(baseline)
+    var_a = sum((x - mean_a) ** 2 for x in sample) / (len(sample) - 1)
+    var_b = sum((x - mean_b) ** 2 for x in baseline) / (len(baseline) - 1)
+    error = math.sqrt(var_a / len(sample) + var_b / len(baseline))
+    if error == 0:
+        return math.inf if mean_a > mean_b else 0.0
+    return (mean_a - mean_b) / error
+
+
+def measure_memory(prepare) -> dict:
+    """
+    Memory profile of one sort run.
+
+    ``prepare`` returns a fresh zero-argument run; it is called once per
+    measurement pass and whatever it allocates (e.g. the input copy) is not
+    counted. Returns:
+        peak_bytes: peak traced memory above the starting level (tracemalloc)
+        peak_blocks: peak number of extra allocated blocks (objects),
+            sampled at every Python call and return
+        max_depth: deepest nesting of Python frames inside the run,
+            including resumed generator chains (sys.setprofile)
+    """
+    run = prepare()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        run()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+
+    run = prepare()
+    depth = max_depth = peak_blocks = 0
+    base_blocks = sys.getallocatedblocks()
+
+    def hook(frame, event, arg):
+        nonlocal depth, max_depth, peak_blocks
+        if event == "call":
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif event == "return":
+            depth -= 1
+        else:
+            return
+        peak_blocks = max(peak_blocks, sys.getallocatedblocks() - base_blocks)
+
+    sys.setprofile(hook)
+    try:
+        run()
+    finally:
+        sys.setprofile(None)
+    peak_blocks = max(peak_blocks, sys.getallocatedblocks() - base_blocks)
+    return {"peak_bytes": peak_bytes, "peak_blocks": peak_blocks, "max_depth": max_depth}
+
+
+class CellTimeout(Exception):
+    """Raised inside a worker when a benchmark cell exceeds its time limit."""
+
+
+def _on_alarm(signum, frame):
+    raise CellTimeout()
+
+
+def _init_worker(pin_cpus: bool, next_cpu):
+    """Process-pool initializer: optional CPU pinning, then warm up."""
+    if pin_cpus and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        with next_cpu.get_lock():
+            cpu = cpus[next_cpu.value % len(cpus)]
+            next_cpu.value += 1
+        os.sched_setaffinity(0, {cpu})
+
+    # Warm up imports, allocator and code paths before timing anything
+    warmup = [random.randint(0, 100) for _ in range(200)]
+    for algo_class in COUNTING_ALGORITHMS.values():
+        algo_class(warmup).sort()
+
+
+def run_cell(algo_name: str, size: int, dist: str, run: int, seed: int = 0,
+             timeout: float = None):
+    """
+    Time one benchmark run in a worker process.
+
+    Returns (milliseconds, total operations), or None when the run was cut
+    off after ``timeout`` seconds.
+    """
+    sorter = COUNTING_ALGORITHMS[algo_name](make_input(dist, size, run, seed))
+
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        start = time.perf_counter()
+        sorter.sort()
+        elapsed = (time.perf_counter() - start) * 1000
+    except CellTimeout:
+        return None
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return elapsed, sorter.get_metrics()["total_operations"]
 
 
 class SortingBenchmark:
     """Benchmark sorting algorithms and generate performance report."""
 
     def __init__(self):
-        self.results = {}
+        self.results = {}  # (algorithm, size, distribution) -> stats
 
-    def benchmark(self, array_size: int = 1000, runs: int = 5):
+    def benchmark(self, array_size: int = 1000, runs: int = 5,
+                  references: bool = True, traced: bool = False, seed: int = 0,
+                  algorithms=None):
         """
         Benchmark all sorting algorithms.
         
         Args:
             array_size: Size of array to sort
             runs: Number of runs for averaging
+            references: Also time sorted()/list.sort/numpy.sort and the
+                NumPy versions of each algorithm family
+            traced: Also time the step-tracing generators, to show the
+                cost of tracing
+            seed: Seed for the (reproducible) input data
+            algorithms: Names from ALGORITHMS to run (default: all), e.g.
+                to leave the O(n²) sorts out at large sizes
         """
-        print(f"\n{'='*70}")
+        print(f"\n{'='*90}")
         print(f"SORTING ALGORITHM BENCHMARK")
         print(f"Array Size: {array_size} | Runs: {runs}")
-        print(f"{'='*70}\n")
+        print(f"{'='*90}\n")
+
+        # Every entry sorts the same random inputs
+        datasets = [make_input("random", array_size, run, seed) for run in range(runs)]
 
-        for algo_name, algo_func in ALGORITHMS.items():
+        selected = [name for name in COUNTING_ALGORITHMS if algorithms is None or name in algorithms]
+        rows = {}
+        for algo_name in selected:
+            algo_class = COUNTING_ALGORITHMS[algo_name]
             times = []
+            operations = []
+            aux_space = 0
             
-            for run in range(runs):
-                # Generate random data
-                data = [random.randint(0, array_size) for _ in range(array_size)]
+            for data in datasets:
+                sorter = algo_class(data)
                 
                 # Measure time
                 start = time.perf_counter()
                 
-                # Run algorithm (consume all generator steps)
-                for _ in algo_func(data):
-                    pass
+                # Run metrics-only variant (no per-step generator overhead)
+                sorter.sort()
                 
                 end = time.perf_counter()
                 times.append((end - start) * 1000)  # Convert to milliseconds
+                operations.append(sorter.get_metrics()["total_operations"])
+                aux_space = max(aux_space, sorter.aux_space)
+
+            rows[algo_name] = self._stats(times, "algorithm", sum(operations) / len(operations))
+            rows[algo_name]["aux_space"] = aux_space
+
+        if traced:
+            for algo_name in selected:
+                algo_func = ALGORITHMS[algo_name]
+                times = [self._time(list, self._drain(algo_func), data) for data in datasets]
+                rows[f"{algo_name} (traced)"] = self._stats(times, "traced")
+
+        if references:
+            for kind, table in (("reference", REFERENCE_SORTS), ("vectorized", VECTORIZED_SORTS)):
+                for name, (prepare, sort) in table.items():
+                    # NumPy versions follow the algorithm selection ("X (NumPy)")
+                    if kind == "vectorized" and name.replace(" (NumPy)", "") not in selected:
+                        continue
+                    times = [self._time(prepare, sort, data) for data in datasets]
+                    rows[name] = self._stats(times, kind)
+            if not VECTORIZED_SORTS:
+                print("(NumPy not installed - skipping numpy.sort and vectorized rows)\n")
 
-            # Calculate statistics
-            avg_time = sum(times) / len(times)
-            min_time = min(times)
-            max_time = max(times)
+        # Slowdown relative to the native sorted() baseline
+        native = rows["sorted()"]["average"] if "sorted()" in rows else None
+        for name, result in rows.items():
+            result["slowdown"] = result["average"] / native if native else None
+            self.results[(name, array_size, "random")] = result
+
+            line = (f"{name:30s} | Avg: {result['average']:9.3f}ms | Min: {result['min']:9.3f}ms"
+                    f" | Max: {result['max']:9.3f}ms")
+            if result["slowdown"] is not None:
+                line += f" | vs native: {result['slowdown']:9.1f}x"
+            if result["operations"] is not None:
+                line += f" | Ops: {result['operations']:12.0f}"
+            if result.get("aux_space"):
+                line += f" | Aux: {result['aux_space']:9d}"
+            print(line)
+
+        print(f"\n{'='*90}\n")
+
+    def sweep(self, sizes=(128, 256, 512, 1024, 2048), distributions=None, runs: int = 3,
+              seed: int = 0):
+        """
+        Run every algorithm across input distributions and a size sweep,
+        then fit time and operation counts to a complexity model.
+
+        Args:
+            sizes: Array sizes (a geometric progression fits best)
+            distributions: Names from DISTRIBUTIONS (default: all)
+            runs: Number of runs per cell for averaging
+            seed: Seed for the (reproducible) input data
+        """
+        distributions = distributions or list(DISTRIBUTIONS)
+        for dist in distributions:
+            for algo_name, algo_class in COUNTING_ALGORITHMS.items():
+                for size in sizes:
+                    times, ops = [], []
+                    for run in range(runs):
+                        sorter = algo_class(make_input(dist, size, run, seed))
+                        start = time.perf_counter()
+                        sorter.sort()
+                        times.append((time.perf_counter() - start) * 1000)
+                        ops.append(sorter.get_metrics()["total_operations"])
+
+                    self.results[(algo_name, size, dist)] = \
+                        self._stats(times, "algorithm", sum(ops) / len(ops))
+
+        self.report_sweep(sizes, distributions, runs)
+
+    def parallel_sweep(self, sizes=(128, 256, 512, 1024, 2048), distributions=None,
+                       runs: int = 3, workers: int = None, timeout: float = None,
+                       pin_cpus: bool = False, seed: int = 0):
+        """
+        Run the sweep with (algorithm, size, distribution, run) cells spread
+        over a process pool, merging the results into self.results.
+
+        Args:
+            sizes: Array sizes
+            distributions: Names from DISTRIBUTIONS (default: all)
+            runs: Number of runs per cell
+            workers: Number of worker processes (default: CPU count)
+            timeout: Seconds after which a single run is cut off and
+                counted as a timeout (needs SIGALRM, i.e. Unix)
+            pin_cpus: Pin each worker to its own CPU to reduce noise
+            seed: Seed for the (reproducible) input data
+        """
+        distributions = distributions or list(DISTRIBUTIONS)
+        workers = workers or os.cpu_count() or 1
+        cells = [
+            (algo_name, size, dist, run)
+            for dist in distributions
+            for algo_name in COUNTING_ALGORITHMS
+            for size in sizes
+            for run in range(runs)
+        ]
+        # Largest cells first so the slow O(n²) runs don't trail at the end
+        cells.sort(key=lambda cell: -cell[1])
 
-            self.results[algo_name] = {
-                "average": avg_time,
-                "min": min_time,
-                "max": max_time,
-                "runs": runs
+        collected = {}
+        next_cpu = multiprocessing.Value("i", 0)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(pin_cpus, next_cpu)) as pool:
+            futures = {
+                pool.submit(run_cell, algo_name, size, dist, run, seed, timeout): (algo_name, size, dist)
+                for algo_name, size, dist, run in cells
             }
+            for future in as_completed(futures):
+                collected.setdefault(futures[future], []).append(future.result())
 
-            print(f"{algo_name:20s} | Avg: {avg_time:8.2f}ms | Min: {min_time:8.2f}ms | Max: {max_time:8.2f}ms")
+        for key, outcomes in collected.items():
+            finished = [outcome for outcome in outcomes if outcome is not None]
+            if finished:
+                result = self._stats([t for t, _ in finished], "algorithm",
+                                     sum(ops for _, ops in finished) / len(finished))
+            else:
+                result = {"average": None, "min": None, "max": None, "operations": None,
+                          "kind": "algorithm", "runs": 0, "times": []}
+            result["timeouts"] = len(outcomes) - len(finished)
+            self.results[key] = result
 
-        print(f"\n{'='*70}\n")
+        print(f"\nParallel sweep: {len(cells)} cells on {workers} workers"
+              f"{' (pinned)' if pin_cpus else ''}")
+        self.report_sweep(sizes, distributions, runs)
+
+    def scaling(self, array_size: int = 1_000_000, worker_counts=None, runs: int = 3,
+                seed: int = 0):
+        """
+        Time the parallel merge sort with increasing worker counts and
+        report speedup and parallel efficiency relative to one worker.
+
+        Args:
+            array_size: Size of array to sort
+            worker_counts: Worker counts to try (default: 1, 2, 4, ...
+                up to the CPU count)
+            runs: Number of runs per worker count
+            seed: Seed for the (reproducible) input data
+        """
+        cpus = os.cpu_count() or 1
+        worker_counts = worker_counts or sorted({1, cpus, *(2 ** k for k in range(cpus.bit_length()))})
+        datasets = [make_input("random", array_size, run, seed) for run in range(runs)]
+        algo_class = COUNTING_ALGORITHMS["Parallel Merge Sort"]
+
+        print(f"\n{'='*70}")
+        print(f"CORE SCALING: Parallel Merge Sort | Array Size: {array_size} | "
+              f"Runs: {runs} | CPUs: {cpus}")
+        print(f"{'='*70}")
+        print(f"{'Workers':>7s} | {'Avg':>12s} | {'Min':>12s} | {'Speedup':>8s} | {'Efficiency':>10s}")
+
+        baseline = None
+        for workers in worker_counts:
+            # Untimed run first: starts the pool and imports in the workers
+            warmup = algo_class(datasets[0])
+            warmup.workers = workers
+            warmup.sort()
+
+            times, ops = [], []
+            for data in datasets:
+                sorter = algo_class(data)
+                sorter.workers = workers
+                start = time.perf_counter()
+                sorter.sort()
+                times.append((time.perf_counter() - start) * 1000)
+                ops.append(sorter.get_metrics()["total_operations"])
+
+            result = self._stats(times, "parallel", sum(ops) / len(ops))
+            baseline = baseline or result["average"]
+            result["workers"] = workers
+            result["speedup"] = baseline / result["average"]
+            self.results[(f"Parallel Merge Sort x{workers}", array_size, "random")] = result
+            print(f"{workers:7d} | {result['average']:10.1f}ms | {result['min']:10.1f}ms | "
+                  f"{result['speedup']:7.2f}x | {result['speedup'] / workers:10.0%}")
+
+        if max(worker_counts) > cpus:
+            print(f"(more workers than the {cpus} available CPUs: expect no speedup there)")
+        print(f"{'='*70}\n")
+
+    def memory(self, sizes=(100, 500, 1000), algorithms=None, traced: bool = True, seed: int = 0):
+        """
+        Report time alongside peak auxiliary memory, allocated objects and
+        maximum call/generator depth per algorithm and size.
+
+        Args:
+            sizes: Array sizes
+            algorithms: Names from ALGORITHMS to run (default: all)
+            traced: Also profile the step generators (their input copy,
+                Step objects and generator frames)
+            seed: Seed for the (reproducible) input data
+        """
+        selected = [name for name in ALGORITHMS if algorithms is None or name in algorithms]
+        for size in sizes:
+            data = make_input("random", size, 0, seed)
+            print(f"\n{'='*90}")
+            print(f"MEMORY PROFILE | Array Size: {size}")
+            print(f"{'='*90}")
+            print(f"{'Algorithm':30s} | {'Time':>10s} | {'Peak aux':>12s} | {'Objects':>9s} | {'Depth':>5s}")
+
+            variants = []
+            for name in selected:
+                variants.append((name, "algorithm", lambda name=name: COUNTING_ALGORITHMS[name](data).sort))
+                if traced:
+                    variants.append((f"{name} (traced)", "traced",
+                                     lambda name=name: partial(deque, ALGORITHMS[name](data), maxlen=0)))
+
+            for label, kind, prepare in variants:
+                run = prepare()
+                start = time.perf_counter()
+                run()
+                elapsed = (time.perf_counter() - start) * 1000
+                profile = measure_memory(prepare)
+
+                result = self.results[(label, size, "random")] = self._stats([elapsed], kind)
+                result.update(profile)
+                print(f"{label:30s} | {elapsed:8.2f}ms | {profile['peak_bytes'] / 1024:9.1f}KiB | "
+                      f"{profile['peak_blocks']:9d} | {profile['max_depth']:5d}")
+
+        print(f"\n{'='*90}\n")
+
+    def profile(self, sizes=(1000,), algorithms=None, seed: int = 0,
+                flamegraph: str = None) -> PhaseProfiler:
+        """
+        Break each algorithm's run down by phase (partition, merge, pass, ...)
+        with time and operation counts per phase.
+
+        Args:
+            sizes: Array sizes
+            algorithms: Names from COUNTING_ALGORITHMS to run (default: all)
+            seed: Seed for the (reproducible) input data
+            flamegraph: Also write folded stacks to this path
+
+        Returns:
+            The PhaseProfiler holding the aggregated phases
+        """
+        profiler = PhaseProfiler()
+        selected = [name for name in COUNTING_ALGORITHMS if algorithms is None or name in algorithms]
+        for size in sizes:
+            data = make_input("random", size, 0, seed)
+            for name in selected:
+                profiler.profile(f"{name} [{size}]", COUNTING_ALGORITHMS[name](data))
+
+        print(f"\n{'='*110}")
+        print(f"PHASE PROFILE | Array Sizes: {', '.join(map(str, sizes))}")
+        print(f"{'='*110}")
+        profiler.report()
+        print(f"{'='*110}\n")
+        if flamegraph:
+            profiler.save_folded(flamegraph)
+            print(f"Folded stacks written to {flamegraph}")
+        return profiler
+
+    def report_sweep(self, sizes, distributions, runs: int):
+        """Print per-distribution complexity fits from self.results."""
+        for dist in distributions:
+            print(f"\n{'='*90}")
+            print(f"DISTRIBUTION: {dist} | Sizes: {', '.join(map(str, sizes))} | Runs: {runs}")
+            print(f"{'='*90}")
+            print(f"{'Algorithm':20s} | {'time ~ n^k':>10s} | {'ops ~ n^k':>10s} | "
+                  f"{'ops model':>9s} | {'ops/(n log n)':>13s} | {'time @ max n':>12s}")
+
+            for algo_name in COUNTING_ALGORITHMS:
+                cells = [
+                    (size, self.results[(algo_name, size, dist)])
+                    for size in sizes
+                    if (algo_name, size, dist) in self.results
+                ]
+                measured = [(size, r) for size, r in cells if r["average"] is not None]
+                timeouts = sum(r.get("timeouts", 0) for _, r in cells)
+
+                time_fit = fit_complexity([n for n, _ in measured], [r["average"] for _, r in measured])
+                ops_fit = fit_complexity([n for n, _ in measured], [r["operations"] for _, r in measured])
+                last = f"{measured[-1][1]['average']:10.2f}ms" if measured else f"{'-':>12s}"
+                line = (f"{algo_name:20s} | {self._fmt(time_fit['exponent']):>10s} | "
+                        f"{self._fmt(ops_fit['exponent']):>10s} | {ops_fit['model'] or '-':>9s} | "
+                        f"{ops_fit['coefficients'].get('n log n', 0):13.2f} | {last}")
+                if timeouts:
+                    line += f" | {timeouts} run(s) timed out"
+                print(line)
+
+        print(f"\n{'='*90}\n")
+
+    @staticmethod
+    def _fmt(value) -> str:
+        return "-" if value is None else f"{value:.2f}"
+
+    @staticmethod
+    def _time(prepare, sort, data) -> float:
+        """Time one sort in milliseconds, excluding input preparation."""
+        prepared = prepare(data)
+        start = time.perf_counter()
+        sort(prepared)
+        return (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def _drain(algo_func):
+        """Wrap a step generator as a sort that consumes every step."""
+        def run(data):
+            for _ in algo_func(data):
+                pass
+        return run
+
+    @staticmethod
+    def _stats(times, kind: str, operations=None) -> dict:
+        return {
+            "average": sum(times) / len(times),
+            "min": min(times),
+            "max": max(times),
+            "operations": operations,
+            "kind": kind,
+            "runs": len(times),
+            "times": list(times)
+        }
+
+    def save(self, path: str):
+        """Save results plus environment metadata as JSON or CSV (by extension)."""
+        rows = [
+            {"algorithm": algo, "size": size, "distribution": dist, **result}
+            for (algo, size, dist), result in self.results.items()
+        ]
+        metadata = environment_metadata()
+
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                # Metadata goes into leading comment lines
+                for key, value in metadata.items():
+                    f.write(f"# {key}: {value}\n")
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow({**row, "times": " ".join(repr(t) for t in row["times"])})
+        else:
+            with open(path, "w") as f:
+                json.dump({"metadata": metadata, "results": rows}, f, indent=2)
+        print(f"Saved {len(rows)} results to {path}")
+
+    @staticmethod
+    def load(path: str):
+        """Load saved results; returns (metadata, results keyed like self.results)."""
+        if path.endswith(".csv"):
+            metadata = {}
+            with open(path, newline="") as f:
+                lines = []
+                for line in f:
+                    if line.startswith("# "):
+                        key, _, value = line[2:].rstrip("\n").partition(": ")
+                        metadata[key] = value
+                    else:
+                        lines.append(line)
+            rows = []
+            for row in csv.DictReader(lines):
+                for field in ("average", "min", "max", "operations", "slowdown"):
+                    row[field] = float(row[field]) if row.get(field) else None
+                row["size"] = int(row["size"])
+                row["runs"] = int(row["runs"])
+                row["timeouts"] = int(row["timeouts"]) if row.get("timeouts") else 0
+                for field in ("aux_space", "peak_bytes", "peak_blocks", "max_depth"):
+                    row[field] = int(row[field]) if row.get(field) else None
+                row["times"] = [float(t) for t in row["times"].split()]
+                rows.append(row)
+        else:
+            with open(path) as f:
+                data = json.load(f)
+            metadata, rows = data["metadata"], data["results"]
+
+        results = {}
+        for row in rows:
+            key = (row.pop("algorithm"), row.pop("size"), row.pop("distribution"))
+            results[key] = row
+        return metadata, results
+
+    def compare(self, baseline: dict, threshold: float = 0.10, t_critical: float = 2.0,
+                ops_tolerance: float = 0.01) -> list:
+        """
+        Compare self.results against baseline results (as returned by load).
+
+        A cell is flagged as a slowdown when its mean time is more than
+        ``threshold`` above the baseline and Welch's t statistic over the
+        individual run times exceeds ``t_critical``. Operation counts are
+        flagged when they differ by more than ``ops_tolerance`` (relative).
+
+        Returns a list of (key, kind, baseline value, current value).
+        """
+        regressions = []
+        print(f"\n{'REGRESSION CHECK':-^90}")
+        for key in sorted(self.results.keys() & baseline.keys(), key=str):
+            current, before = self.results[key], baseline[key]
+            if current["average"] is None or before["average"] is None:
+                continue
+            label = f"{key[0]} / n={key[1]} / {key[2]}"
+
+            change = current["average"] / before["average"] - 1
+            t = _welch_t(current["times"], before["times"])
+            significant = t is None or t > t_critical
+            if change > threshold and significant:
+                regressions.append((key, "time", before["average"], current["average"]))
+                t_text = f", t = {t:.1f}" if t is not None else ""
+                print(f"✗ {label:50s} time {before['average']:.3f}ms -> "
+                      f"{current['average']:.3f}ms (+{change:.0%}{t_text})")
+
+            if current["operations"] and before["operations"]:
+                ops_change = current["operations"] / before["operations"] - 1
+                if abs(ops_change) > ops_tolerance:
+                    regressions.append((key, "operations", before["operations"], current["operations"]))
+                    print(f"✗ {label:50s} operations {before['operations']:.0f} -> "
+                          f"{current['operations']:.0f} ({ops_change:+.1%})")
+
+        compared = len(self.results.keys() & baseline.keys())
+        if not regressions:
+            print(f"✓ No regressions across {compared} matching results")
+        print(f"{'-'*90}\n")
+        return regressions
 
     def print_summary(self):
         """Print summary of benchmark results."""
@@ -68,29 +699,89 @@ class SortingBenchmark:
 
         print(f"\n{'SUMMARY':-^70}")
         
-        # Find fastest algorithm
-        fastest = min(self.results.items(), key=lambda x: x[1]["average"])
-        print(f"\n✓ Fastest Algorithm: {fastest[0]} ({fastest[1]['average']:.2f}ms average)")
+        # Compare the educational algorithms only (not references),
+        # separately for every (size, distribution) measured
+        groups = {}
+        for (name, size, dist), result in self.results.items():
+            if result.get("kind", "algorithm") == "algorithm" and result["average"] is not None:
+                groups.setdefault((size, dist), {})[name] = result
+
+        for (size, dist), algorithms in sorted(groups.items(), key=lambda g: (g[0][1], g[0][0])):
+            print(f"\nArray Size: {size} | Distribution: {dist}")
 
-        # Find slowest algorithm
-        slowest = max(self.results.items(), key=lambda x: x[1]["average"])
-        print(f"✗ Slowest Algorithm: {slowest[0]} ({slowest[1]['average']:.2f}ms average)")
+            # Find fastest algorithm
+            fastest = min(algorithms.items(), key=lambda x: x[1]["average"])
+            print(f"✓ Fastest Algorithm: {fastest[0]} ({fastest[1]['average']:.2f}ms average)")
 
-        # Performance ratio
-        ratio = slowest[1]["average"] / fastest[1]["average"]
-        print(f"\n➜ Performance Ratio: {ratio:.2f}x")
+            # Find slowest algorithm
+            slowest = max(algorithms.items(), key=lambda x: x[1]["average"])
+            print(f"✗ Slowest Algorithm: {slowest[0]} ({slowest[1]['average']:.2f}ms average)")
+
+            # Performance ratio
+            ratio = slowest[1]["average"] / fastest[1]["average"]
+            print(f"➜ Performance Ratio: {ratio:.2f}x")
+            if fastest[1].get("slowdown"):
+                print(f"➜ Fastest vs native sorted(): {fastest[1]['slowdown']:.1f}x slower")
         print(f"\n{'='*70}\n")
 
 
 def main():
     """Run benchmark with different array sizes."""
+    parser = argparse.ArgumentParser(description="Benchmark the sorting algorithms.")
+    parser.add_argument("--sweep", action="store_true",
+                        help="sweep input distributions and sizes and fit complexity")
+    parser.add_argument("--parallel", type=int, nargs="?", const=0, metavar="WORKERS",
+                        help="run the sweep on a process pool (default: one worker per CPU)")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                        help="cut off parallel sweep runs that take longer than this")
+    parser.add_argument("--pin", action="store_true",
+                        help="pin each parallel worker to its own CPU")
+    parser.add_argument("--scaling", type=int, nargs="?", const=1_000_000, metavar="SIZE",
+                        help="report parallel merge sort speedup per worker count")
+    parser.add_argument("--workers", type=int, nargs="+", metavar="N",
+                        help="worker counts for --scaling (default: 1, 2, 4, ... CPUs)")
+    parser.add_argument("--memory", action="store_true",
+                        help="report peak memory, allocated objects and call depth per algorithm")
+    parser.add_argument("--profile", action="store_true",
+                        help="break each algorithm down by phase (time and operations)")
+    parser.add_argument("--flamegraph", metavar="PATH",
+                        help="with --profile, write folded stacks for flame graph tools")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000], metavar="N",
+                        help="array sizes for the default benchmark")
+    parser.add_argument("--algorithms", nargs="+", metavar="NAME",
+                        help="only run these algorithms (names as in ALGORITHMS)")
+    parser.add_argument("--save", metavar="PATH",
+                        help="save results with environment metadata (.json or .csv)")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare results against a saved baseline; exit 1 on regressions")
+    args = parser.parse_args()
+
     benchmark = SortingBenchmark()
-    
-    # Test with different sizes
-    for size in [100, 500, 1000]:
-        benchmark.benchmark(array_size=size, runs=3)
-    
-    benchmark.print_summary()
+
+    if args.profile:
+        benchmark.profile(sizes=args.sizes, algorithms=args.algorithms, flamegraph=args.flamegraph)
+    elif args.memory:
+        benchmark.memory(sizes=args.sizes, algorithms=args.algorithms)
+    elif args.scaling is not None:
+        benchmark.scaling(array_size=args.scaling, worker_counts=args.workers)
+    elif args.parallel is not None:
+        benchmark.parallel_sweep(workers=args.parallel or None, timeout=args.timeout,
+                                 pin_cpus=args.pin)
+    elif args.sweep:
+        benchmark.sweep()
+    else:
+        # Test with different sizes
+        for size in args.sizes:
+            benchmark.benchmark(array_size=size, runs=3, traced=True, algorithms=args.algorithms)
+        
+        benchmark.print_summary()
+
+    if args.save:
+        benchmark.save(args.save)
+    if args.compare:
+        _, baseline = SortingBenchmark.load(args.compare)
+        if benchmark.compare(baseline):
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+# ============================================================================
+# Pixel-Column Aggregation
+# Min/max/mean per screen column for arrays wider than the canvas
+# ============================================================================
+
+from typing import List
+
+
+class ColumnBins:
+    """
+    Incrementally maintained per-column statistics of a large array.
+
+    The array is split into ``columns`` contiguous bins (one per pixel
+    column). Each bin tracks its minimum, maximum and sum, so drawing costs
+    O(columns) instead of O(n). ``update`` keeps the bins current after a
+    single element changes; a bin is only rescanned when its extreme value
+    is overwritten by a less extreme one.
+
+    The bins keep a reference to the live array: mutate the array first,
+    then call ``update`` with the index and its previous value.
+    """
+
+    def __init__(self, values: List[int], columns: int):
+        self.values = values
+        self.n = len(values)
+        self.columns = max(1, min(columns, self.n))
+        # Column c holds indices i with i * columns // n == c
+        self.starts = [-(-c * self.n // self.columns) for c in range(self.columns + 1)]
+        self.max = []
+        self.min = []
+        self.sum = []
+        for c in range(self.columns):
+            chunk = values[self.starts[c]:self.starts[c + 1]]
+            self.max.append(max(chunk))
+            self.min.append(min(chunk))
+            self.sum.append(sum(chunk))
+
+    def column_of(self, index: int) -> int:
+        """Column that holds array element ``index``."""
+        return index * self.columns // self.n
+
+    def mean(self, column: int) -> float:
+        return self.sum[column] / (self.starts[column + 1] - self.starts[column])
+
+    def update(self, index: int, old: int) -> int:
+        """Account for values[index] having changed from ``old``; return its column."""
+        c = index * self.columns // self.n
+        new = self.values[index]
+        if new == old:
+            return c
+        self.sum[c] += new - old
+
+        if new >= self.max[c]:
+            self.max[c] = new
+        elif old == self.max[c]:
+            self.max[c] = max(self.values[self.starts[c]:self.starts[c + 1]])
+
+        if new <= self.min[c]:
+            self.min[c] = new
+        elif old == self.min[c]:
+            self.min[c] = min(self.values[self.starts[c]:self.starts[c + 1]])
+        return c
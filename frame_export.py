@@ -0,0 +1,363 @@
+# ============================================================================
+# Headless Frame Export
+# Render step streams to image buffers and write animated GIFs / PNG frames
+# ============================================================================
+
+import argparse
+import math
+import os
+import struct
+import zlib
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from algorithms import ALGORITHMS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+
+# Palette (index -> RGB): frames are arrays of palette indices
+PALETTE = (
+    (0xFF, 0xFF, 0xFF),  # background
+    (0x4A, 0x90, 0xE2),  # bar
+    (0x2C, 0x5F, 0x9E),  # column minimum (large-array mode)
+    (0xFF, 0x57, 0x33),  # compare
+    (0x28, 0xA7, 0x45),  # swap
+    (0xFF, 0xC3, 0x00),  # overwrite / block write
+    (0x00, 0x00, 0x00),
+    (0x00, 0x00, 0x00),
+)
+BACKGROUND, BAR, COLUMN_MIN, COMPARE, SWAP, WRITE = range(6)
+STEP_COLORS = {"compare": COMPARE, "swap": SWAP, "overwrite": WRITE, "block": WRITE}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("frame export needs numpy (pip install numpy)")
+
+
+class FrameRenderer:
+    """
+    Draw array states as bar charts into NumPy buffers of palette indices.
+
+    The layout follows the visualizer canvas: bars with a 2 px gap when they
+    are wider than 4 px, and, for arrays wider than the image, one pixel
+    column per group of elements showing its maximum with its minimum
+    overlaid in a darker tone.
+    """
+
+    def __init__(self, n: int, max_value: int, width: int = 640, height: int = 360):
+        _require_numpy()
+        self.n = max(1, n)
+        self.width = width
+        self.height = height
+        self.baseline = height - 5
+        self.scale = (height - 30) / max(1, max_value)
+        self.rows = np.arange(height)[:, None]
+        x = np.arange(width)
+        if self.n <= width:
+            bar_width = width / self.n
+            self.element = (x * self.n // width).clip(0, self.n - 1)
+            gap = 2 if bar_width > 4 else 0
+            self.visible = x - self.element * bar_width < bar_width - gap
+            self.starts = None
+        else:
+            # Column c holds indices i with i * width // n == c (as ColumnBins)
+            self.element = None
+            self.starts = -(-np.arange(width) * self.n // width)
+
+    def render(self, values, highlight=(), color: int = COMPARE) -> "np.ndarray":
+        """
+        Render one frame (height x width uint8 palette indices).
+
+        ``highlight`` holds element indices (or a range) drawn in ``color``.
+        """
+        values = np.asarray(values)
+        if not values.size:
+            return np.full((self.height, self.width), BACKGROUND, dtype=np.uint8)
+        rows, baseline = self.rows, self.baseline
+        marked = np.zeros(self.n, dtype=bool)
+        if isinstance(highlight, range):
+            marked[max(0, highlight.start):max(0, highlight.stop)] = True
+        elif len(highlight):
+            marked[[i for i in highlight if 0 <= i < self.n]] = True
+
+        if self.starts is None:
+            tops = baseline - values[self.element] * self.scale
+            bars = (rows >= tops) & (rows < baseline) & self.visible
+            columns = marked[self.element]
+            frame = np.where(bars, np.where(columns, color, BAR), BACKGROUND).astype(np.uint8)
+        else:
+            maxima = np.maximum.reduceat(values, self.starts)
+            minima = np.minimum.reduceat(values, self.starts)
+            columns = np.logical_or.reduceat(marked, self.starts)
+            in_range = rows < baseline
+            frame = np.where((rows >= baseline - maxima * self.scale) & in_range,
+                             np.where(columns, color, BAR), BACKGROUND).astype(np.uint8)
+            frame[(rows >= baseline - minima * self.scale) & in_range & ~columns] = COLUMN_MIN
+        return frame
+
+    @staticmethod
+    def to_rgb(frame: "np.ndarray") -> "np.ndarray":
+        """Expand a palette frame to a height x width x 3 RGB buffer."""
+        return np.array(PALETTE, dtype=np.uint8)[frame]
+
+
+class _StepCounter:
+    """Trace sink that only counts steps."""
+
+    def __init__(self):
+        self.count = 0
+
+    def append(self, type, i, j, value, template, arg=None):
+        self.count += 1
+
+
+class _StateSink:
+    """Trace sink that applies each step to an array and keeps its highlight."""
+
+    def __init__(self, arr: List[int]):
+        self.arr = arr[:]
+        self.highlight = ()
+        self.color = COMPARE
+
+    def append(self, type, i, j, value, template, arg=None):
+        arr = self.arr
+        if type == "compare":
+            self.highlight = (i, j)
+        elif type == "swap":
+            arr[i], arr[j] = arr[j], arr[i]
+            self.highlight = (i, j)
+        elif type == "overwrite":
+            arr[i] = value
+            self.highlight = (i,)
+        elif type == "block":
+            arr[i:j + 1] = value
+            self.highlight = range(i, j + 1)
+        else:  # "complete" / "done"
+            self.highlight = ()
+        self.color = STEP_COLORS.get(type, BAR)
+
+
+def count_steps(func: Callable, arr: List[int]) -> int:
+    """Number of steps an algorithm emits for ``arr``."""
+    counter = _StepCounter()
+    for _ in func(arr, trace=counter):
+        pass
+    return counter.count
+
+
+def render_frames(func: Callable, arr: List[int], max_frames: int = 300,
+                  width: int = 640, height: int = 360,
+                  steps: Optional[int] = None) -> Iterator["np.ndarray"]:
+    """
+    Render an algorithm's run as at most ``max_frames`` frames.
+
+    The steps are counted in a first pass, then every k-th step is drawn in
+    a second pass so the frame count stays within ``max_frames``; the steps
+    in between are applied but not rendered (pass ``steps`` if the count
+    is already known). The first frame is the input and the last one the
+    sorted result. Nothing is recorded, so memory stays O(n) however long
+    the run is.
+    """
+    renderer = FrameRenderer(len(arr), max(arr, default=1), width, height)
+    if steps is None:
+        steps = count_steps(func, arr)
+    stride = max(1, math.ceil(steps / max(1, max_frames - 2)))
+
+    sink = _StateSink(arr)
+    yield renderer.render(sink.arr)
+    applied = 0
+    for _ in func(arr, trace=sink):
+        applied += 1
+        if applied % stride == 0:
+            yield renderer.render(sink.arr, sink.highlight, sink.color)
+    yield renderer.render(sink.arr)
+
+
+# GIF LZW: 3-bit pixels (8-color palette), codes of up to 12 bits
+_GIF_MIN_CODE_SIZE = 3
+_GIF_CLEAR = 1 << _GIF_MIN_CODE_SIZE
+_GIF_END = _GIF_CLEAR + 1
+
+
+def _gif_lzw(pixels: "np.ndarray") -> bytes:
+    """LZW-compress palette pixels into GIF image data sub-blocks."""
+    data = pixels.astype(np.uint8).tobytes()
+    codes, widths = [_GIF_CLEAR], [_GIF_MIN_CODE_SIZE + 1]
+    width, limit = _GIF_MIN_CODE_SIZE + 1, 1 << (_GIF_MIN_CODE_SIZE + 1)
+    table = {}
+    next_code = _GIF_END + 1
+    prefix = data[0]
+    for pixel in data[1:]:
+        key = prefix << 8 | pixel
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        codes.append(prefix)
+        widths.append(width)
+        if next_code < 4096:
+            table[key] = next_code
+            if next_code == limit:
+                width, limit = width + 1, limit << 1
+            next_code += 1
+        else:
+            # Table full: start over
+            codes.append(_GIF_CLEAR)
+            widths.append(width)
+            table.clear()
+            width, limit = _GIF_MIN_CODE_SIZE + 1, 1 << (_GIF_MIN_CODE_SIZE + 1)
+            next_code = _GIF_END + 1
+        prefix = pixel
+    codes += [prefix, _GIF_END]
+    widths += [width, width]
+
+    # Pack the variable-width codes LSB first
+    codes = np.array(codes, dtype=np.int64)
+    widths = np.array(widths, dtype=np.int64)
+    offsets = np.cumsum(widths) - widths
+    bits = np.zeros(int(offsets[-1] + widths[-1]), dtype=np.uint8)
+    for bit in range(12):
+        on = (widths > bit) & ((codes >> bit) & 1 == 1)
+        bits[offsets[on] + bit] = 1
+    packed = np.packbits(bits, bitorder="little").tobytes()
+    blocks = [bytes((len(packed[k:k + 255]),)) + packed[k:k + 255] for k in range(0, len(packed), 255)]
+    return bytes((_GIF_MIN_CODE_SIZE,)) + b"".join(blocks) + b"\x00"
+
+
+def write_gif(frames: Iterable["np.ndarray"], path: str, delay_cs: int = 5,
+              end_hold_cs: int = 100) -> int:
+    """
+    Write palette frames as a looping animated GIF; return the frame count.
+
+    Each frame after the first only stores the rectangle that changed, and
+    an unchanged frame extends the previous frame's delay.
+    """
+    _require_numpy()
+    count = 0
+    previous = pending = None
+    pending_delay = 0
+
+    with open(path, "wb") as f:
+        for frame in frames:
+            count += 1
+            if previous is None:
+                height, width = frame.shape
+                f.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF2, 0, 0))
+                f.write(bytes(channel for color in PALETTE for channel in color))
+                f.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever
+                box = (0, 0, width, height)
+            else:
+                changed = frame != previous
+                rows = np.flatnonzero(changed.any(axis=1))
+                if not rows.size:
+                    pending_delay += delay_cs
+                    continue
+                cols = np.flatnonzero(changed.any(axis=0))
+                box = (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+            if pending is not None:
+                f.write(_gif_control(pending_delay) + pending)
+            left, top, right, bottom = box
+            pending = (b"\x2C" + struct.pack("<HHHHB", left, top, right - left, bottom - top, 0)
+                       + _gif_lzw(frame[top:bottom, left:right]))
+            pending_delay = delay_cs
+            previous = frame
+        if pending is not None:
+            f.write(_gif_control(pending_delay + end_hold_cs) + pending)
+        f.write(b"\x3B")
+    return count
+
+
+def _gif_control(delay_cs: int) -> bytes:
+    # Graphic control extension: keep the previous frame (disposal 1), delay
+    return b"\x21\xF9\x04\x04" + struct.pack("<H", min(delay_cs, 0xFFFF)) + b"\x00\x00"
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(frame: "np.ndarray") -> bytes:
+    """Encode a palette frame as an 8-bit indexed PNG."""
+    height, width = frame.shape
+    rows = np.zeros((height, width + 1), dtype=np.uint8)  # filter byte 0 per row
+    rows[:, 1:] = frame
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+            + _png_chunk(b"PLTE", bytes(channel for color in PALETTE for channel in color))
+            + _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6))
+            + _png_chunk(b"IEND", b""))
+
+
+def write_png_frames(frames: Iterable["np.ndarray"], directory: str,
+                     prefix: str = "frame") -> List[str]:
+    """Write frames as numbered PNG files; return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for number, frame in enumerate(frames):
+        path = os.path.join(directory, f"{prefix}_{number:05d}.png")
+        with open(path, "wb") as f:
+            f.write(encode_png(frame))
+        paths.append(path)
+    return paths
+
+
+def export_animation(func: Callable, arr: List[int], path: str, duration: float = 10.0,
+                     fps: int = 20, width: int = 640, height: int = 360) -> int:
+    """
+    Render a run to ``path`` and return the number of frames.
+
+    A ``.gif`` path gets an animated GIF lasting about ``duration`` seconds
+    at up to ``fps`` frames per second (GIF delays are whole centiseconds,
+    so fps is capped at 50); any other path is a directory for a PNG
+    sequence of at most duration * fps frames.
+    """
+    fps = max(1, min(fps, 50))
+    max_frames = max(2, int(duration * fps))
+    steps = count_steps(func, arr)
+    frames = render_frames(func, arr, max_frames, width, height, steps)
+    if path.lower().endswith(".gif"):
+        frame_count = min(max_frames, steps + 2)
+        delay_cs = max(2, round(duration * 100 / frame_count))
+        return write_gif(frames, path, delay_cs)
+    return len(write_png_frames(frames, path))
+
+
+def main():
+    """Batch-export animations for seeded inputs."""
+    # Imported here: benchmark pulls in the whole benchmarking toolchain
+    from benchmark import DISTRIBUTIONS, make_input
+
+    parser = argparse.ArgumentParser(description="Export sorting animations without a display.")
+    parser.add_argument("--algorithms", nargs="+", default=["Merge Sort"], metavar="NAME",
+                        help="algorithms to render (names as in ALGORITHMS)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100], metavar="N")
+    parser.add_argument("--distributions", nargs="+", default=["random"], choices=list(DISTRIBUTIONS))
+    parser.add_argument("--inputs", type=int, default=1, metavar="COUNT",
+                        help="seeded inputs per algorithm, size and distribution")
+    parser.add_argument("--duration", type=float, default=10.0, metavar="SECONDS")
+    parser.add_argument("--fps", type=int, default=20)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=360)
+    parser.add_argument("--format", choices=["gif", "png"], default="gif")
+    parser.add_argument("--out", default="animations", metavar="DIR")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for name in args.algorithms:
+        for size in args.sizes:
+            for dist in args.distributions:
+                for run in range(args.inputs):
+                    data = make_input(dist, size, run)
+                    stem = f"{name}_{dist}_{size}_{run}".lower().replace(" ", "_")
+                    path = os.path.join(args.out, stem + (".gif" if args.format == "gif" else ""))
+                    frames = export_animation(ALGORITHMS[name], data, path, args.duration,
+                                              args.fps, args.width, args.height)
+                    print(f"{path}: {frames} frames")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# ============================================================================
+# Parallel Merge Sort
+# Chunk sorting and k-way merging across worker processes over shared memory
+# ============================================================================
+
+import atexit
+import multiprocessing
+import os
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Generator, List, Optional, Tuple
+
+# Below this size the phases run in-process: pool round trips would cost
+# more than the sort itself
+PARALLEL_THRESHOLD = 50_000
+
+_ITEMSIZE = array("q").itemsize
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Return a process pool with ``workers`` processes, reused across sorts.
+
+    Workers come from a fork server where available: forking the caller
+    directly is unsafe once it runs threads (the GUI and its step producer).
+    """
+    pool = _pools.get(workers)
+    if pool is None:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    return pool
+
+
+@atexit.register
+def shutdown_pools() -> None:
+    for pool in _pools.values():
+        pool.shutdown(cancel_futures=True)
+    _pools.clear()
+
+
+def merge_runs(runs: List[list]) -> Tuple[list, int]:
+    """Merge sorted lists pairwise (balanced); return (merged, comparisons)."""
+    runs = [run for run in runs if run] or [[]]
+    comparisons = 0
+    while len(runs) > 1:
+        merged = []
+        for r in range(0, len(runs) - 1, 2):
+            left, right = runs[r], runs[r + 1]
+            out = []
+            i = j = 0
+            while i < len(left) and j < len(right):
+                if right[j] < left[i]:
+                    out.append(right[j])
+                    j += 1
+                else:
+                    out.append(left[i])
+                    i += 1
+            comparisons += i + j
+            out.extend(left[i:])
+            out.extend(right[j:])
+            merged.append(out)
+        if len(runs) % 2:
+            merged.append(runs[-1])
+        runs = merged
+    return runs[0], comparisons
+
+
+def _sort_range(buf: memoryview, lo: int, hi: int) -> Tuple[int, int]:
+    """Sort buf[lo:hi] in place; return (comparisons, writes)."""
+    # Imported here: algorithms imports this module
+    from algorithms import BottomUpMergeSort
+
+    sorter = BottomUpMergeSort(buf[lo:hi].tolist())
+    buf[lo:hi] = array("q", sorter.sort())
+    return sorter.comparisons, sorter.writes
+
+
+def _merge_range(src: memoryview, dst: memoryview, slices, offset: int) -> Tuple[int, int]:
+    """Merge the sorted src slices into dst[offset:]; return (comparisons, writes)."""
+    merged, comparisons = merge_runs([src[lo:hi].tolist() for lo, hi in slices])
+    dst[offset:offset + len(merged)] = array("q", merged)
+    return comparisons, len(merged)
+
+
+def _sort_chunk_task(name: str, lo: int, hi: int) -> Tuple[int, int]:
+    shm = SharedMemory(name=name)
+    buf = shm.buf.cast("q")
+    try:
+        return _sort_range(buf, lo, hi)
+    finally:
+        buf.release()
+        shm.close()
+
+
+def _merge_task(src_name: str, dst_name: str, slices, offset: int) -> Tuple[int, int]:
+    src_shm, dst_shm = SharedMemory(name=src_name), SharedMemory(name=dst_name)
+    src, dst = src_shm.buf.cast("q"), dst_shm.buf.cast("q")
+    try:
+        return _merge_range(src, dst, slices, offset)
+    finally:
+        src.release()
+        dst.release()
+        src_shm.close()
+        dst_shm.close()
+
+
+def parallel_merge_phases(values: List[int], workers: Optional[int] = None,
+                          threshold: int = PARALLEL_THRESHOLD) -> Generator[tuple, None, dict]:
+    """
+    Sort integer ``values`` with a parallel merge sort, phase by phase.
+
+    The input is split into one chunk per worker and every chunk is merge
+    sorted in the process pool. Splitter values sampled from the sorted
+    chunks then cut the output into one part per worker; each part is a
+    k-way merge of the matching slice of every chunk, written straight to
+    its final offset, so all merges also run in parallel. Workers read and
+    write shared memory buffers of int64 instead of pickling lists.
+
+    Yields ("chunk", lo, hi, view) when a chunk is sorted and ("merge", lo,
+    hi, view) when an output range is final; view[lo:hi] holds the result
+    and is only valid until the generator is resumed. Returns a dict with
+    the sorted list and operation counts.
+    """
+    n = len(values)
+    workers = max(1, workers or default_workers())
+    chunks = max(1, min(workers, n))
+    bounds = [c * n // chunks for c in range(chunks + 1)]
+    in_process = n < max(threshold, 2) or workers == 1
+    stats = {"comparisons": 0, "writes": 0, "chunks": chunks,
+             "workers": 1 if in_process else workers, "aux_space": 0}
+
+    blocks = []
+    if in_process:
+        src, dst = memoryview(array("q", values)), memoryview(array("q", bytes(n * _ITEMSIZE)))
+    else:
+        for _ in range(2):
+            blocks.append(SharedMemory(create=True, size=n * _ITEMSIZE))
+        src, dst = blocks[0].buf.cast("q"), blocks[1].buf.cast("q")
+        src[:] = array("q", values)
+    try:
+        # Phase 1: sort the chunks
+        tasks = [(bounds[c], bounds[c + 1]) for c in range(chunks) if bounds[c] < bounds[c + 1]]
+        if in_process:
+            outcomes = []
+            for lo, hi in tasks:
+                outcomes.append(_sort_range(src, lo, hi))
+                yield "chunk", lo, hi, src
+        else:
+            pool = get_pool(workers)
+            futures = {pool.submit(_sort_chunk_task, blocks[0].name, lo, hi): (lo, hi)
+                       for lo, hi in tasks}
+            outcomes = []
+            for future in as_completed(futures):
+                outcomes.append(future.result())
+                lo, hi = futures[future]
+                yield "chunk", lo, hi, src
+        for comparisons, writes in outcomes:
+            stats["comparisons"] += comparisons
+            stats["writes"] += writes
+
+        if len(tasks) <= 1:
+            stats["result"] = src.tolist()
+            stats["aux_space"] = n
+            return stats
+
+        # Phase 2: parallel k-way merge between splitters
+        parts = chunks
+        samples = sorted(src[lo + (hi - lo) * s // parts] for lo, hi in tasks for s in range(parts))
+        splitters = [samples[len(samples) * p // parts] for p in range(1, parts)]
+        cuts = [[lo] + [bisect_left(src, s, lo, hi) for s in splitters] + [hi] for lo, hi in tasks]
+        merges, offset = [], 0
+        for p in range(parts):
+            slices = [(cut[p], cut[p + 1]) for cut in cuts if cut[p] < cut[p + 1]]
+            size = sum(hi - lo for lo, hi in slices)
+            if size:
+                merges.append((slices, offset, size))
+            offset += size
+
+        if in_process:
+            outcomes = []
+            for slices, offset, size in merges:
+                outcomes.append(_merge_range(src, dst, slices, offset))
+                yield "merge", offset, offset + size, dst
+        else:
+            futures = {pool.submit(_merge_task, blocks[0].name, blocks[1].name, slices, offset):
+                       (offset, offset + size) for slices, offset, size in merges}
+            outcomes = []
+            for future in as_completed(futures):
+                outcomes.append(future.result())
+                lo, hi = futures[future]
+                yield "merge", lo, hi, dst
+        for comparisons, writes in outcomes:
+            stats["comparisons"] += comparisons
+            stats["writes"] += writes
+
+        stats["result"] = dst.tolist()
+        stats["aux_space"] = 2 * n
+        return stats
+    finally:
+        src.release()
+        dst.release()
+        for block in blocks:
+            block.close()
+            block.unlink()
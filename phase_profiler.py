@@ -0,0 +1,106 @@
+# ============================================================================
+# Phase Profiler
+# Per-phase time and operation counts for the counting algorithm variants
+# ============================================================================
+
+import time
+from typing import Dict, List, Tuple
+
+from algorithms import SortingAlgorithm
+
+
+class PhaseProfiler:
+    """
+    Collector for the phase hooks of the counting variants.
+
+    Instrumented algorithms call ``enter(name)`` and ``exit(name, ...)``
+    around their phases (partition, merge, pass, ...) when their
+    ``profiler`` attribute is set; with the default ``None`` the hooks are
+    a single skipped branch. Phases nest: statistics are aggregated per
+    stack of phase names, with the algorithm name as the root, so the
+    result maps directly onto a flame graph.
+
+    Times are inclusive (``total``) and exclusive of nested phases
+    (``self``); operation counts are the ones the algorithm attributes to
+    the phase, nested phases included.
+    """
+
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        # stack -> [calls, total ns, nested ns, comparisons, swaps, writes]
+        self.stats: Dict[Tuple[str, ...], List[int]] = {}
+        self._open = []  # [stack, start ns, nested ns] per entered phase
+
+    def enter(self, name: str) -> None:
+        parent = self._open[-1][0] if self._open else ()
+        self._open.append([parent + (name,), self.clock(), 0])
+
+    def exit(self, name: str, comparisons: int = 0, swaps: int = 0, writes: int = 0) -> None:
+        stack, start, nested = self._open.pop()
+        if stack[-1] != name:
+            raise ValueError(f"exit({name!r}) does not match enter({stack[-1]!r})")
+        elapsed = self.clock() - start
+        if self._open:
+            self._open[-1][2] += elapsed
+
+        entry = self.stats.get(stack)
+        if entry is None:
+            entry = self.stats[stack] = [0, 0, 0, 0, 0, 0]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] += nested
+        entry[3] += comparisons
+        entry[4] += swaps
+        entry[5] += writes
+
+    def profile(self, name: str, sorter: SortingAlgorithm) -> List[int]:
+        """Run ``sorter`` with this profiler attached, as root phase ``name``."""
+        sorter.profiler = self
+        try:
+            self.enter(name)
+            result = sorter.sort()
+            self.exit(name, sorter.comparisons, sorter.swaps, sorter.writes)
+        finally:
+            sorter.profiler = None
+        return result
+
+    def phases(self) -> List[dict]:
+        """Aggregated phases, parents before children."""
+        return [
+            {
+                "stack": stack,
+                "calls": calls,
+                "total_ms": total / 1e6,
+                "self_ms": (total - nested) / 1e6,
+                "comparisons": comparisons,
+                "swaps": swaps,
+                "writes": writes,
+            }
+            for stack, (calls, total, nested, comparisons, swaps, writes) in sorted(self.stats.items())
+        ]
+
+    def report(self) -> None:
+        """Print the phase tree with inclusive/exclusive time and counts."""
+        print(f"{'Phase':36s} | {'Calls':>8s} | {'Total':>10s} | {'Self':>10s} | "
+              f"{'Cmp':>10s} | {'Swaps':>9s} | {'Writes':>9s}")
+        for phase in self.phases():
+            label = "  " * (len(phase["stack"]) - 1) + phase["stack"][-1]
+            print(f"{label:36s} | {phase['calls']:8d} | {phase['total_ms']:8.2f}ms | "
+                  f"{phase['self_ms']:8.2f}ms | {phase['comparisons']:10d} | "
+                  f"{phase['swaps']:9d} | {phase['writes']:9d}")
+
+    def folded(self) -> str:
+        """
+        Folded stacks ("root;phase;sub <microseconds>" per line) of the
+        exclusive time, as read by flamegraph.pl, inferno and speedscope.
+        """
+        lines = []
+        for stack, (_, total, nested, *_) in sorted(self.stats.items()):
+            micros = (total - nested) // 1000
+            if micros > 0:
+                lines.append(f"{';'.join(stack)} {micros}")
+        return "\n".join(lines) + "\n"
+
+    def save_folded(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.folded())
@@ -0,0 +1,167 @@
+# ============================================================================
+# Algorithm Race
+# Run several algorithms on the same input in lockstep, one lane each
+# ============================================================================
+
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from column_bins import ColumnBins
+
+
+class RaceLane:
+    """
+    One algorithm's run in a race, applied step by step to its own array.
+
+    The lane is the generator's trace sink: each step updates ``values``,
+    the counters, the highlight and ``changed`` (indices whose values moved
+    since the view last called ``take_changes``) without recording anything,
+    so a lane costs O(n) memory however long the run is. Set ``bins`` to a
+    ColumnBins over ``values`` to keep it current as well.
+    """
+
+    def __init__(self, name: str, func: Callable, arr: List[int]):
+        self.name = name
+        self.values = arr[:]
+        self.bins: Optional[ColumnBins] = None
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.steps = 0
+        self.highlight = ()
+        self.step_type = None
+        self.changed = set()
+        self.budget = 0.0         # Steps owed to this lane, see Race.frame
+        self.finished = False
+        self.place = None         # 1-based finishing place, ties share a place
+        self._steps = func(arr, trace=self)
+
+    def append(self, type, i, j, value, template, arg=None):
+        values, bins = self.values, self.bins
+        if type == "compare":
+            self.comparisons += 1
+            self.highlight = (i, j)
+        elif type == "swap":
+            self.swaps += 1
+            old_i, old_j = values[i], values[j]
+            values[i], values[j] = old_j, old_i
+            if bins is not None:
+                bins.update(i, old_i)
+                bins.update(j, old_j)
+            self.changed.add(i)
+            self.changed.add(j)
+            self.highlight = (i, j)
+        elif type == "overwrite":
+            self.writes += 1
+            old = values[i]
+            values[i] = value
+            if bins is not None:
+                bins.update(i, old)
+            self.changed.add(i)
+            self.highlight = (i,)
+        elif type == "block":
+            self.comparisons += arg
+            self.writes += j - i + 1
+            old = values[i:j + 1]
+            values[i:j + 1] = value
+            if bins is not None:
+                for k, old_value in enumerate(old, i):
+                    bins.update(k, old_value)
+            self.changed.update(range(i, j + 1))
+            self.highlight = range(i, j + 1)
+        else:  # "complete" / "done"
+            self.highlight = ()
+        self.step_type = type
+
+    def advance(self, steps: int) -> int:
+        """Apply up to ``steps`` steps; return how many were applied."""
+        applied = 0
+        step_iter = self._steps
+        while applied < steps and not self.finished:
+            try:
+                next(step_iter)
+            except StopIteration:
+                self._finish()
+                break
+            applied += 1
+            if self.step_type == "done":
+                self._finish()
+        self.steps += applied
+        return applied
+
+    def take_changes(self) -> set:
+        """Return and reset the indices changed since the last call."""
+        changed, self.changed = self.changed, set()
+        return changed
+
+    def _finish(self) -> None:
+        self.finished = True
+        self.highlight = ()
+        self._steps = None
+
+
+class Race:
+    """
+    Several RaceLanes on the same input, advanced by one shared scheduler.
+
+    Every frame each lane is owed the same number of steps (its ``budget``),
+    applied round-robin in chunks of ``CHUNK`` steps so the lanes stay
+    within one chunk of each other even when the frame deadline cuts the
+    frame short. Unfinished lanes therefore always have equal step counts at
+    the end of a frame, and lanes are placed by the number of steps they
+    needed, which is the order they finish on screen.
+    """
+
+    CHUNK = 256
+
+    def __init__(self, entries: Sequence[Tuple[str, Callable]], arr: List[int]):
+        self.lanes = [RaceLane(name, func, arr) for name, func in entries]
+        self.finish_order: List[RaceLane] = []
+
+    @property
+    def finished(self) -> bool:
+        return all(lane.finished for lane in self.lanes)
+
+    def frame(self, steps: float, deadline: Optional[float] = None) -> List[RaceLane]:
+        """
+        Give every unfinished lane ``steps`` more steps and apply them.
+
+        Stops early once ``time.perf_counter()`` passes ``deadline``,
+        dropping the unapplied budget of all lanes alike so none falls
+        behind. Returns the lanes that finished during this frame.
+        """
+        active = [lane for lane in self.lanes if not lane.finished]
+        for lane in active:
+            lane.budget += steps
+        finished = []
+        while active:
+            for lane in active:
+                chunk = min(self.CHUNK, int(lane.budget))
+                lane.budget -= lane.advance(chunk)
+            done = [lane for lane in active if lane.finished]
+            if done:
+                self._place(done)
+                finished.extend(done)
+                active = [lane for lane in active if not lane.finished]
+            if not active or active[0].budget < 1:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                for lane in active:
+                    lane.budget = 0.0
+                break
+        return finished
+
+    def run(self) -> List[RaceLane]:
+        """Run every lane to completion; return the lanes in finishing order."""
+        while not self.finished:
+            self.frame(1 << 20)
+        return self.finish_order
+
+    def _place(self, done: List[RaceLane]) -> None:
+        for lane in sorted(done, key=lambda lane: lane.steps):
+            previous = self.finish_order[-1] if self.finish_order else None
+            if previous is not None and previous.steps == lane.steps:
+                lane.place = previous.place
+            else:
+                lane.place = len(self.finish_order) + 1
+            self.finish_order.append(lane)
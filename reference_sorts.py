@@ -0,0 +1,131 @@
+# ============================================================================
+# Reference Sorts
+# Native and NumPy baselines for the benchmark
+# ============================================================================
+
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+
+# name -> (prepare, sort): prepare converts the input list outside the timed
+# region, sort returns the sorted data
+ReferenceSort = Tuple[Callable, Callable]
+
+
+def _list_sort(arr: List[int]) -> List[int]:
+    arr.sort()
+    return arr
+
+
+def _numpy_sort(arr, kind: str):
+    return np.sort(arr, kind=kind)
+
+
+def odd_even_sort(a):
+    """
+    Odd-even transposition sort - vectorized bubble sort.
+    Each pass compares all even (then odd) neighbour pairs at once.
+    """
+    a = a.copy()
+    n = len(a)
+    for _ in range(n):
+        changed = False
+        for start in (0, 1):
+            right = a[start + 1::2]
+            m = len(right)
+            left = a[start::2][:m]
+            if np.any(left > right):
+                lo, hi = np.minimum(left, right), np.maximum(left, right)
+                a[start:start + 2 * m:2], a[start + 1::2] = lo, hi
+                changed = True
+        if not changed:
+            break
+    return a
+
+
+def selection_sort_np(a):
+    """Selection sort with a vectorized minimum search."""
+    a = a.copy()
+    for i in range(len(a) - 1):
+        min_idx = i + int(np.argmin(a[i:]))
+        if min_idx != i:
+            a[i], a[min_idx] = a[min_idx], a[i]
+    return a
+
+
+def insertion_sort_np(a):
+    """Binary insertion sort with a vectorized block shift."""
+    a = a.copy()
+    for i in range(1, len(a)):
+        key = a[i]
+        pos = int(np.searchsorted(a[:i], key, side="right"))
+        if pos < i:
+            a[pos + 1:i + 1] = a[pos:i].copy()
+            a[pos] = key
+    return a
+
+
+def merge_sort_np(a):
+    """Bottom-up merge sort; each merge places both runs with searchsorted."""
+    src = a.copy()
+    dst = np.empty_like(src)
+    n = len(src)
+    width = 1
+    while width < n:
+        for l in range(0, n, 2 * width):
+            m = min(l + width, n)
+            r = min(l + 2 * width, n)
+            left, right = src[l:m], src[m:r]
+            # Stable merge: ties keep left-run elements first
+            dst[l + np.arange(len(left)) + np.searchsorted(right, left, side="left")] = left
+            dst[l + np.arange(len(right)) + np.searchsorted(left, right, side="right")] = right
+        src, dst = dst, src
+        width *= 2
+    return src
+
+
+def quick_sort_np(a):
+    """Quick sort with vectorized three-way partitioning (explicit stack)."""
+    a = a.copy()
+    stack = [(0, len(a))]
+    while stack:
+        l, r = stack.pop()
+        if r - l <= 1:
+            continue
+        seg = a[l:r]
+        pivot = np.median(seg[[0, (r - l) // 2, -1]])
+        less, equal, greater = seg[seg < pivot], seg[seg == pivot], seg[seg > pivot]
+        lt, eq = len(less), len(equal)
+        a[l:l + lt] = less
+        a[l + lt:l + lt + eq] = equal
+        a[l + lt + eq:r] = greater
+        stack.append((l, l + lt))
+        stack.append((l + lt + eq, r))
+    return a
+
+
+# Production-grade sorts
+REFERENCE_SORTS: Dict[str, ReferenceSort] = {
+    "sorted()": (list, sorted),
+    "list.sort": (list, _list_sort),
+}
+
+# NumPy versions of the educational algorithm families
+VECTORIZED_SORTS: Dict[str, ReferenceSort] = {}
+
+if np is not None:
+    for _kind in ("quicksort", "mergesort", "heapsort"):
+        REFERENCE_SORTS[f"numpy.sort ({_kind})"] = (np.array, partial(_numpy_sort, kind=_kind))
+
+    VECTORIZED_SORTS.update({
+        "Bubble Sort (NumPy)": (np.array, odd_even_sort),
+        "Selection Sort (NumPy)": (np.array, selection_sort_np),
+        "Insertion Sort (NumPy)": (np.array, insertion_sort_np),
+        "Merge Sort (NumPy)": (np.array, merge_sort_np),
+        "Quick Sort (NumPy)": (np.array, quick_sort_np),
+    })
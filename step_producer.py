@@ -0,0 +1,103 @@
+# ============================================================================
+# Background Step Producer
+# Runs an algorithm in a worker thread and hands steps over in batches
+# ============================================================================
+
+import queue
+import threading
+from typing import Callable, List
+
+from step_trace import StepTrace
+
+
+class StepProducer:
+    """
+    Run an algorithm generator in a worker thread.
+
+    The worker records steps into a StepTrace and pushes them into a bounded
+    queue in batches of ``batch_size`` steps. When ``max_batches`` batches
+    are waiting the worker blocks until the consumer catches up
+    (backpressure). ``pause``/``resume`` hold the worker at the next batch
+    boundary and ``cancel`` makes it exit there, dropping the generator.
+
+    The consumer calls ``drain`` (typically once per GUI frame) and feeds the
+    batches into a SeekableTrace; ``done`` is set once the end-of-stream
+    marker has been drained.
+    """
+
+    _END = object()
+
+    def __init__(self, func: Callable, arr: List[int],
+                 batch_size: int = 4096, max_batches: int = 32):
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_batches)
+        self.done = False
+        self.error = None
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._thread = threading.Thread(
+            target=self._run, args=(func, arr[:]), name="step-producer", daemon=True
+        )
+
+    def start(self) -> "StepProducer":
+        self._thread.start()
+        return self
+
+    def pause(self) -> None:
+        """Hold the worker at its next batch boundary."""
+        self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def cancel(self) -> None:
+        """Stop the worker at its next batch boundary."""
+        self._cancelled.set()
+        self._running.set()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def join(self, timeout: float = None) -> None:
+        self._thread.join(timeout)
+
+    def drain(self, max_batches: int = None) -> List[StepTrace]:
+        """Return the batches that are ready, without blocking."""
+        batches = []
+        while not self.done and (max_batches is None or len(batches) < max_batches):
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is self._END:
+                self.done = True
+            else:
+                batches.append(item)
+        return batches
+
+    def _run(self, func: Callable, arr: List[int]) -> None:
+        trace = StepTrace()
+        batch_size = self.batch_size
+        try:
+            for _ in func(arr, trace=trace):
+                if len(trace.ops) >= batch_size and not self._put(trace.drain()):
+                    return
+            if len(trace.ops) and not self._put(trace.drain()):
+                return
+        except Exception as e:  # Surface algorithm errors to the consumer
+            self.error = e
+        self._put(self._END)
+
+    def _put(self, item) -> bool:
+        """Queue an item, waiting while paused or full; False if cancelled."""
+        while not self._cancelled.is_set():
+            if not self._running.wait(0.1):
+                continue
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
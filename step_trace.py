@@ -0,0 +1,487 @@
+# ============================================================================
+# Compact Step Traces
+# Columnar, array-backed recording of algorithm steps
+# ============================================================================
+
+from array import array
+from bisect import bisect_right
+from collections import deque
+from functools import wraps
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from algorithms import Step, make_step
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+
+# Step types in opcode order (opcode = index in this tuple)
+OPCODES = ("compare", "swap", "overwrite", "complete", "done", "block")
+OPCODE_OF = {name: code for code, name in enumerate(OPCODES)}
+
+# Sentinel stored in the integer columns for a field that is None
+NONE = -(2 ** 63)
+
+
+class StepTrace:
+    """
+    Array-backed recording of an algorithm's step stream.
+
+    Instead of one Step namedtuple plus a formatted description per
+    operation, each step is stored as one entry in parallel typed columns
+    (opcode, i, j, value, arg, template id). Descriptions are rendered only
+    when a step is read back, so recording millions of steps costs a few
+    dozen bytes per step.
+
+    Pass an instance as the ``trace`` argument of any algorithm in
+    ``ALGORITHMS`` (or use ``StepTrace.record``) to fill it.
+
+    A "block" step (see ``coalesce_writes``) writes values to arr[i..j];
+    its values live in the ``blocks`` column and its ``values`` entry holds
+    their offset there.
+    """
+
+    def __init__(self):
+        self.ops = array("b")
+        self.i = array("q")
+        self.j = array("q")
+        self.values = array("q")
+        self.args = array("q")
+        self.template_ids = array("H")
+        self.blocks = array("q")
+        self.templates: List[str] = []
+        self._template_index = {}
+
+    @classmethod
+    def record(cls, func: Callable, arr: List[int]) -> "StepTrace":
+        """Run an algorithm to completion and return its recorded trace."""
+        trace = cls()
+        for _ in func(arr, trace=trace):
+            pass
+        return trace
+
+    def append(self, type: str, i, j, value, template: str, arg=None) -> None:
+        """Record one step (same signature as algorithms.make_step)."""
+        tid = self._template_index.get(template)
+        if tid is None:
+            tid = self._template_index[template] = len(self.templates)
+            self.templates.append(template)
+        self.ops.append(OPCODE_OF[type])
+        self.i.append(NONE if i is None else i)
+        self.j.append(NONE if j is None else j)
+        if type == "block":
+            self.values.append(len(self.blocks))
+            self.blocks.extend(value)
+        else:
+            self.values.append(NONE if value is None else value)
+        self.args.append(NONE if arg is None else arg)
+        self.template_ids.append(tid)
+
+    def extend(self, other: "StepTrace") -> None:
+        """Append all steps of another trace."""
+        remap = array("H", (self._intern(template) for template in other.templates))
+        start, shift = len(self.ops), len(self.blocks)
+        self.ops.extend(other.ops)
+        self.i.extend(other.i)
+        self.j.extend(other.j)
+        self.values.extend(other.values)
+        if other.blocks:
+            self.blocks.extend(other.blocks)
+            if shift:
+                values = self.values
+                for index, op in enumerate(other.ops, start):
+                    if op == BLOCK:
+                        values[index] += shift
+        self.args.extend(other.args)
+        self.template_ids.extend(remap[tid] for tid in other.template_ids)
+
+    def drain(self) -> "StepTrace":
+        """Move the recorded steps into a new trace and clear this one."""
+        chunk = StepTrace()
+        chunk.ops, self.ops = self.ops, array("b")
+        chunk.i, self.i = self.i, array("q")
+        chunk.j, self.j = self.j, array("q")
+        chunk.values, self.values = self.values, array("q")
+        chunk.args, self.args = self.args, array("q")
+        chunk.template_ids, self.template_ids = self.template_ids, array("H")
+        chunk.blocks, self.blocks = self.blocks, array("q")
+        chunk.templates = list(self.templates)
+        chunk._template_index = dict(self._template_index)
+        return chunk
+
+    def _intern(self, template: str) -> int:
+        tid = self._template_index.get(template)
+        if tid is None:
+            tid = self._template_index[template] = len(self.templates)
+            self.templates.append(template)
+        return tid
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def __getitem__(self, index: int) -> Step:
+        """Return a Step view of one recorded step."""
+        if index < 0:
+            index += len(self.ops)
+        i = self.i[index]
+        j = self.j[index]
+        return Step(
+            OPCODES[self.ops[index]],
+            None if i == NONE else i,
+            None if j == NONE else j,
+            self._value(index),
+            self.description(index),
+        )
+
+    def __iter__(self) -> Iterator[Step]:
+        for index in range(len(self.ops)):
+            yield self[index]
+
+    def description(self, index: int) -> str:
+        """Render the human-readable description of one step."""
+        i, j = self.i[index], self.j[index]
+        arg = self.args[index]
+        return self.templates[self.template_ids[index]].format(
+            i=None if i == NONE else i,
+            j=None if j == NONE else j,
+            value=self._value(index),
+            arg=None if arg == NONE else arg,
+        )
+
+    def block_values(self, index: int) -> array:
+        """Values written by block step ``index`` to arr[i..j]."""
+        offset = self.values[index]
+        return self.blocks[offset:offset + self.j[index] - self.i[index] + 1]
+
+    def _value(self, index: int):
+        if self.ops[index] == BLOCK:
+            return tuple(self.block_values(index))
+        value = self.values[index]
+        return None if value == NONE else value
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the step columns."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.ops, self.i, self.j, self.values, self.args, self.template_ids,
+                           self.blocks)
+        )
+
+    def count(self, type: str) -> int:
+        """Number of recorded steps of the given type."""
+        return self.ops.count(OPCODE_OF[type])
+
+    def to_numpy(self) -> Optional[dict]:
+        """Return zero-copy NumPy views of the columns, or None without NumPy."""
+        if np is None:
+            return None
+        return {
+            "ops": np.frombuffer(self.ops, dtype=np.int8),
+            "i": np.frombuffer(self.i, dtype=np.int64),
+            "j": np.frombuffer(self.j, dtype=np.int64),
+            "values": np.frombuffer(self.values, dtype=np.int64),
+            "args": np.frombuffer(self.args, dtype=np.int64),
+            "blocks": np.frombuffer(self.blocks, dtype=np.int64),
+        }
+
+
+COMPARE = OPCODE_OF["compare"]
+SWAP = OPCODE_OF["swap"]
+OVERWRITE = OPCODE_OF["overwrite"]
+BLOCK = OPCODE_OF["block"]
+
+BLOCK_TEMPLATE = "Wrote arr[{i}..{j}] in one block ({arg} comparisons)"
+
+
+class WriteCoalescer:
+    """
+    Step sink that merges runs of contiguous overwrites into block steps.
+
+    Overwrites that continue the current run at its growing end (ascending
+    like a merge, or descending like insertion-sort shifts) are buffered;
+    comparisons between two writes of a run are folded into it, since
+    merges and insertion sorts compare before every write. Any other step
+    ends the run, which is emitted as one "block" step (i..j, the values in
+    index order, arg = folded comparisons), or as the original overwrite if
+    it has a single write. Finished steps queue up in ``ready`` as
+    ``make_step`` argument tuples, in stream order.
+    """
+
+    def __init__(self):
+        self.ready = deque()
+        self._first = None     # first overwrite of the run
+        self._values = []      # run values in write order
+        self._compares = []    # comparisons since the run's last write
+        self._folded = 0
+        self._lo = self._hi = self._last = 0
+
+    def append(self, type: str, i, j, value, template: str, arg=None) -> None:
+        """Take one step (same signature as algorithms.make_step)."""
+        if self._first is not None:
+            if type == "compare":
+                self._compares.append((type, i, j, value, template, arg))
+                return
+            if type == "overwrite" and self._extends(i):
+                self._last = i
+                self._values.append(value)
+                self._folded += len(self._compares)
+                self._compares.clear()
+                return
+            self.flush()
+        if type == "overwrite":
+            self._first = (type, i, j, value, template, arg)
+            self._lo = self._hi = self._last = i
+            self._values.append(value)
+        else:
+            self.ready.append((type, i, j, value, template, arg))
+
+    def _extends(self, i: int) -> bool:
+        """Grow the run if index ``i`` continues it at its growing end."""
+        if i == self._hi + 1 and self._last == self._hi:
+            self._hi = i
+        elif i == self._lo - 1 and self._last == self._lo:
+            self._lo = i
+        else:
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Emit the pending run and any comparisons held after it."""
+        if self._first is None:
+            return
+        if len(self._values) == 1:
+            self.ready.append(self._first)
+        else:
+            values = self._values if self._last == self._hi else self._values[::-1]
+            self.ready.append(("block", self._lo, self._hi, tuple(values), BLOCK_TEMPLATE, self._folded))
+        self.ready.extend(self._compares)
+        self._first = None
+        self._values = []
+        self._compares.clear()
+        self._folded = 0
+
+
+def coalesce_writes(func: Callable) -> Callable:
+    """
+    Wrap an algorithm so runs of contiguous overwrites become block steps.
+
+    The wrapper has the algorithms' ``(arr, trace=None)`` signature and
+    yields one step per emitted step, so it works with SeekableTrace and
+    StepProducer as is. Merge and insertion sort traces shrink to roughly
+    one step per merge or insertion. Keyword arguments (``key``,
+    ``reverse``, ...) and the sorted result are passed through.
+    """
+    @wraps(func)
+    def coalesced(arr: List[int], trace=None, **options):
+        emit = trace.append if trace is not None else make_step
+        writer = WriteCoalescer()
+        ready = writer.ready
+        steps = func(arr, trace=writer, **options)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as stop:
+                result = stop.value
+                break
+            while ready:
+                yield emit(*ready.popleft())
+        writer.flush()
+        while ready:
+            yield emit(*ready.popleft())
+        return result
+
+    return coalesced
+
+
+class SeekableTrace:
+    """
+    Recorded step stream with periodic array snapshots (keyframes).
+
+    Steps are pulled from the algorithm on demand (``extend``) and stored in
+    a StepTrace. Every ``keyframe_interval`` steps a copy of the array and the
+    running operation counts is kept, so the array state at any step index
+    is rebuilt by replaying at most one interval of steps from the nearest
+    keyframe.
+
+    At most ``max_keyframes`` snapshots are kept: when the limit is exceeded
+    every other keyframe is dropped and the interval doubles, which bounds
+    snapshot memory to about ``max_keyframes * len(arr)`` values.
+
+    With ``max_steps`` the recorded steps are bounded too: once that many
+    are held, recording stops (``full``) until the next ``extend`` or
+    ``append_batch``, which first drops every held step and keyframe. The
+    caller must only ask for more once it has played the held steps. Steps
+    before ``base`` can no longer be sought; the run continues live.
+
+    With ``func=None`` nothing is pulled; steps are fed in with
+    ``append_batch`` (e.g. from a StepProducer) and ``finish`` marks the end.
+    ``from_trace`` wraps a trace that is already recorded.
+    """
+
+    def __init__(self, func: Optional[Callable], arr: List[int],
+                 keyframe_interval: int = 1024, max_keyframes: int = 256,
+                 max_steps: Optional[int] = None):
+        self.initial = arr[:]
+        self.trace = StepTrace()
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.max_keyframes = max(2, max_keyframes)
+        self.max_steps = max_steps
+        self.base = 0          # Step index of trace[0]; earlier steps were dropped
+        self.complete = False
+        self._generator = func(arr[:], trace=self.trace) if func is not None else None
+        self._state = arr[:]
+        self._counts = [0] * len(OPCODES)
+        self._keyframe_steps = [0]
+        self._keyframes = [(arr[:], tuple(self._counts))]
+        self._replayed = None  # steps of an adopted trace ingested so far
+
+    @classmethod
+    def from_trace(cls, trace: StepTrace, arr: List[int], **kwargs) -> "SeekableTrace":
+        """
+        Seekable view of a complete recorded trace of the run on ``arr``.
+
+        The trace is adopted, not copied, and must not be modified. Its steps
+        are ingested (building keyframes) by ``extend`` like freshly recorded
+        ones, so a long trace can be taken on in chunks; the recording is
+        complete once all of them have been ingested.
+        """
+        seekable = cls(None, arr, **kwargs)
+        seekable.trace = trace
+        seekable._replayed = 0
+        seekable.extend(0)
+        return seekable
+
+    def __len__(self) -> int:
+        return self.base + len(self.trace)
+
+    @property
+    def full(self) -> bool:
+        """True while ``max_steps`` steps are held."""
+        return self.max_steps is not None and len(self.trace) >= self.max_steps
+
+    def extend(self, count: int) -> int:
+        """Record up to ``count`` more steps; return the recorded length."""
+        if self._replayed is not None:
+            stop = min(len(self.trace), self._replayed + count)
+            for index in range(self._replayed, stop):
+                self._ingest(index)
+            self._replayed = stop
+            if stop == len(self.trace):
+                self._replayed = None
+                self.complete = True
+            return len(self.trace)
+        if self.complete or self._generator is None:
+            return len(self)
+        if self.full:
+            self._drop_history()
+        if self.max_steps is not None:
+            count = min(count, self.max_steps - len(self.trace))
+        ops = self.trace.ops
+        generator = self._generator
+        for _ in range(count):
+            try:
+                next(generator)
+            except StopIteration:
+                self.complete = True
+                self._generator = None
+                break
+            self._ingest(self.base + len(ops) - 1)
+        return len(self)
+
+    def append_batch(self, batch: StepTrace) -> int:
+        """Append externally produced steps; return the recorded length."""
+        if self.full:
+            self._drop_history()
+        start = len(self)
+        self.trace.extend(batch)
+        for index in range(start, len(self)):
+            self._ingest(index)
+        return len(self)
+
+    def finish(self) -> None:
+        """Mark an externally fed recording as complete."""
+        self.complete = True
+
+    def record_all(self) -> "SeekableTrace":
+        """Record the remaining steps of the algorithm."""
+        while not self.complete and (self._generator is not None or self._replayed is not None):
+            self.extend(self.keyframe_interval)
+        return self
+
+    def step(self, index: int) -> Step:
+        """Return step ``index``, recording further steps if needed."""
+        if index >= len(self):
+            self.extend(index + 1 - len(self))
+        if index < self.base:
+            raise IndexError(f"step {index} was dropped (recording keeps steps from {self.base})")
+        return self.trace[index - self.base]
+
+    def description(self, index: int) -> str:
+        """Render the description of recorded step ``index``."""
+        return self.trace.description(index - self.base)
+
+    def state_at(self, index: int) -> Tuple[List[int], dict]:
+        """
+        Return the array and operation counts after the first ``index`` steps.
+
+        Counts are keyed by step type; block steps also add the comparisons
+        and writes folded into them. Steps beyond the recorded range are
+        recorded first; the index is clamped to [base, end of the trace].
+        """
+        if index > len(self):
+            self.extend(index - len(self))
+        index = max(self.base, min(index, len(self)))
+
+        k = bisect_right(self._keyframe_steps, index) - 1
+        snapshot, counts = self._keyframes[k]
+        arr = snapshot[:]
+        counts = list(counts)
+        for s in range(self._keyframe_steps[k], index):
+            self._apply(arr, counts, s)
+        return arr, dict(zip(OPCODES, counts))
+
+    @property
+    def keyframe_count(self) -> int:
+        return len(self._keyframes)
+
+    def _apply(self, arr: List[int], counts: List[int], index: int) -> None:
+        """Apply recorded step ``index`` to ``arr`` and ``counts``."""
+        trace = self.trace
+        index -= self.base
+        op = trace.ops[index]
+        counts[op] += 1
+        if op == SWAP:
+            i, j = trace.i[index], trace.j[index]
+            arr[i], arr[j] = arr[j], arr[i]
+        elif op == OVERWRITE:
+            arr[trace.i[index]] = trace.values[index]
+        elif op == BLOCK:
+            i, j = trace.i[index], trace.j[index]
+            arr[i:j + 1] = trace.block_values(index)
+            counts[COMPARE] += trace.args[index]
+            counts[OVERWRITE] += j - i + 1
+
+    def _ingest(self, index: int) -> None:
+        """Advance the live state past step ``index``, snapshotting as due."""
+        self._apply(self._state, self._counts, index)
+        if (index + 1) % self.keyframe_interval == 0:
+            self._add_keyframe(index + 1)
+
+    def _add_keyframe(self, step: int) -> None:
+        self._keyframe_steps.append(step)
+        self._keyframes.append((self._state[:], tuple(self._counts)))
+        if len(self._keyframes) > self.max_keyframes:
+            # Thin out: keep every other snapshot and double the interval
+            self._keyframe_steps = self._keyframe_steps[::2]
+            self._keyframes = self._keyframes[::2]
+            self.keyframe_interval *= 2
+
+    def _drop_history(self) -> None:
+        """Forget the held steps; the current state becomes the only keyframe."""
+        self.base += len(self.trace)
+        self.trace.drain()
+        self._keyframe_steps = [self.base]
+        self._keyframes = [(self._state[:], tuple(self._counts))]
@@ -4,8 +4,74 @@
 # Validates all algorithms and features
 # ============================================================================
 
+import os
 import random
-from algorithms import ALGORITHMS, Step
+import struct
+import tempfile
+import time
+import zlib
+from collections import deque
+from functools import partial
+from algorithms import ALGORITHMS, COARSE_TRACES, COUNTING_ALGORITHMS, STABLE_ALGORITHMS, Step
+from benchmark import DISTRIBUTIONS, SortingBenchmark, fit_complexity, measure_memory, run_cell
+import frame_export
+import trace_export
+from column_bins import ColumnBins
+from parallel_sort import parallel_merge_phases
+from phase_profiler import PhaseProfiler
+from race import Race
+from reference_sorts import REFERENCE_SORTS, VECTORIZED_SORTS
+from step_producer import StepProducer
+from step_trace import OPCODES, SeekableTrace, StepTrace, coalesce_writes
+from trace_cache import TraceCache
+import trace_verifier
+
+
+def read_gif_frames(path: str) -> list:
+    """Decode an animated GIF written by frame_export into composed frames."""
+    with open(path, "rb") as f:
+        data = f.read()
+    width, height, flags = struct.unpack("<HHB", data[6:11])
+    pos = 13 + 3 * (2 << (flags & 7))
+    canvas = [[0] * width for _ in range(height)]
+    frames = []
+    while data[pos] != 0x3B:
+        if data[pos] == 0x21:  # extension: skip its sub-blocks
+            pos += 2
+            while data[pos]:
+                pos += data[pos] + 1
+            pos += 1
+            continue
+        left, top, w, h = struct.unpack("<HHHH", data[pos + 1:pos + 9])
+        min_size, pos = data[pos + 10], pos + 11
+        chunks = []
+        while data[pos]:
+            chunks.append(data[pos + 1:pos + 1 + data[pos]])
+            pos += data[pos] + 1
+        pos += 1
+
+        stream = int.from_bytes(b"".join(chunks), "little")
+        clear, offset, size, pixels = 1 << min_size, 0, min_size + 1, []
+        while True:
+            code = stream >> offset & (1 << size) - 1
+            offset += size
+            if code == clear:
+                table, size, previous = [[k] for k in range(clear + 2)], min_size + 1, None
+            elif code == clear + 1:
+                break
+            else:
+                entry = table[code] if code < len(table) else previous + previous[:1]
+                if previous is not None:
+                    table.append(previous + entry[:1])
+                    if len(table) == 1 << size and size < 12:
+                        size += 1
+                pixels.extend(entry)
+                previous = entry
+        assert len(pixels) == w * h, "GIF frame has the wrong pixel count"
+        for row in range(h):
+            canvas[top + row][left:left + w] = pixels[row * w:(row + 1) * w]
+        frames.append([row[:] for row in canvas])
+    return frames
 
 
 class TestSortingAlgorithms:
@@ -92,6 +158,1081 @@ class TestSortingAlgorithms:
                 print(f"    ✗ {str(e)}")
                 self.tests_failed += 1
 
+    def test_compact_trace(self):
+        """Test that recorded traces replay the exact generator steps."""
+        print(f"\n{'='*60}")
+        print("Testing Compact Step Traces")
+        print(f"{'='*60}")
+
+        arr = [random.randint(0, 100) for _ in range(40)]
+        for algo_name, algo_func in ALGORITHMS.items():
+            try:
+                expected = list(algo_func(arr[:]))
+                trace = StepTrace.record(algo_func, arr[:])
+
+                assert len(trace) == len(expected), "Trace length mismatch"
+                assert list(trace) == expected, "Trace steps differ from generator"
+                assert trace[-1].type == "done", "Trace must end with 'done'"
+
+                print(f"  ✓ {algo_name}: {len(trace)} steps in {trace.nbytes} bytes")
+                self.tests_passed += 1
+
+            except AssertionError as e:
+                print(f"  ✗ {algo_name}: {str(e)}")
+                self.tests_failed += 1
+
+    def test_counting_variants(self):
+        """Test that metrics-only variants sort and match traced counts."""
+        print(f"\n{'='*60}")
+        print("Testing Counting Variants")
+        print(f"{'='*60}")
+
+        test_cases = [
+            [],
+            [5, 5, 5, 5, 5],
+            list(range(25)),
+            list(range(25, 0, -1)),
+            [random.randint(0, 50) for _ in range(60)],
+        ]
+        for algo_name, algo_func in ALGORITHMS.items():
+            try:
+                for arr in test_cases:
+                    trace = StepTrace.record(algo_func, arr[:])
+                    result, metrics = COUNTING_ALGORITHMS[algo_name](arr).run()
+
+                    assert result == sorted(arr), "Counting variant did not sort"
+                    if algo_name in COARSE_TRACES:
+                        continue
+                    assert metrics["comparisons"] == trace.count("compare"), "Comparison count mismatch"
+                    assert metrics["swaps"] == trace.count("swap"), "Swap count mismatch"
+                    assert metrics["writes"] == trace.count("overwrite"), "Write count mismatch"
+
+                print(f"  ✓ {algo_name}: counts match traced version")
+                self.tests_passed += 1
+
+            except AssertionError as e:
+                print(f"  ✗ {algo_name}: {str(e)}")
+                self.tests_failed += 1
+
+    def test_counting_sort_range(self):
+        """Test that counting sort never sizes its counts by a huge value range."""
+        print(f"\n{'='*60}")
+        print("Testing Counting Sort Value Ranges")
+        print(f"{'='*60}")
+
+        func, variant = ALGORITHMS["Counting Sort"], COUNTING_ALGORITHMS["Counting Sort"]
+        try:
+            for arr in ([0, 10**9, 5], [random.randint(-2**62, 2**62) for _ in range(300)],
+                        [random.randint(0, 5 * 10**6) for _ in range(1000)]):
+                trace = StepTrace.record(func, arr)
+                result, metrics = variant(arr).run()
+                assert result == sorted(arr), f"Range {max(arr) - min(arr)} not sorted"
+                assert metrics["aux_space"] <= 4 * len(arr), f"{metrics['aux_space']} aux slots for n={len(arr)}"
+                assert metrics["writes"] == trace.count("overwrite"), "Write count mismatch"
+                replayed, _ = SeekableTrace.from_trace(trace, arr).state_at(len(trace))
+                assert replayed == sorted(arr), "Trace replay not sorted"
+            print("  ✓ Wide ranges fall back to base-n radix passes, counts match")
+
+            arr = [-10**30, 0, 10**30, 7, -7]  # Beyond int64: untraced only
+            steps = list(func(arr))
+            assert variant(arr).run()[0] == sorted(arr), "Values beyond int64 not sorted"
+            assert sum(step.type == "overwrite" for step in steps) == variant(arr).run()[1]["writes"], \
+                "Write count mismatch beyond int64"
+            small = [random.randint(5, 380) for _ in range(50)]
+            assert StepTrace.record(func, small).templates[0].startswith("Placed"), "Narrow range left counting sort"
+            print("  ✓ Values beyond int64 sorted; narrow ranges still use a count array")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_bottom_up_merge_sort(self):
+        """Test ping-pong merging, skipped ordered runs and replay."""
+        print(f"\n{'='*60}")
+        print("Testing Bottom-Up Merge Sort")
+        print(f"{'='*60}")
+
+        func = ALGORITHMS["Bottom-Up Merge Sort"]
+        try:
+            trace = StepTrace.record(func, list(range(37)))
+            assert trace.count("overwrite") == 0, "Sorted input was rewritten"
+            assert trace.count("compare") == 36, "Ordered runs were not skipped"
+            print("  ✓ Already ordered runs are skipped without writes")
+
+            for n in (1, 2, 7, 31, 64, 100):
+                arr = [random.randint(0, 20) for _ in range(n)]
+                recording = SeekableTrace(func, arr).record_all()
+                replayed, _ = recording.state_at(len(recording))
+                assert replayed == sorted(arr), f"Replay of n={n} not sorted"
+            print("  ✓ Replaying overwrite steps reproduces the sorted array")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_introsort(self):
+        """Test introsort on adversarial inputs and its heap sort fallback."""
+        print(f"\n{'='*60}")
+        print("Testing Introsort")
+        print(f"{'='*60}")
+
+        n = 3000
+        inputs = {
+            "sorted": list(range(n)),
+            "reversed": list(range(n, 0, -1)),
+            "all equal": [5] * n,
+            "organ pipe": list(range(n // 2)) + list(range(n - n // 2, 0, -1)),
+        }
+        try:
+            for name, arr in inputs.items():
+                trace = StepTrace.record(ALGORITHMS["Introsort"], arr)
+                assert trace.count("compare") < 4 * n * n.bit_length(), \
+                    f"{name}: {trace.count('compare')} comparisons is not n log n"
+            trace = StepTrace.record(ALGORITHMS["Introsort"], [5] * n)
+            assert trace.count("compare") < 2 * n, "Duplicates are not partitioned three ways"
+            print("  ✓ Sorted, reversed, all-equal and organ-pipe input stay n log n")
+
+            # The plain quick sort is still quadratic here, but no longer recursive
+            trace = StepTrace.record(ALGORITHMS["Quick Sort"], list(range(n)))
+            assert trace.count("compare") == n * (n - 1) // 2, "Quick Sort partitions changed"
+            print("  ✓ Quick Sort handles sorted input without hitting the recursion limit")
+
+            arr = [random.randint(0, 500) for _ in range(300)]
+            trace = StepTrace.record(partial(ALGORITHMS["Introsort"], depth_limit=0), arr)
+            sorter = COUNTING_ALGORITHMS["Introsort"](arr)
+            sorter.depth_limit = 0
+            result, metrics = sorter.run()
+            assert result == sorted(arr), "Heap sort fallback did not sort"
+            assert metrics["comparisons"] == trace.count("compare"), "Fallback comparison count mismatch"
+            assert metrics["swaps"] == trace.count("swap"), "Fallback swap count mismatch"
+            recording = SeekableTrace(partial(ALGORITHMS["Introsort"], depth_limit=0), arr).record_all()
+            assert recording.state_at(len(recording))[0] == sorted(arr), "Fallback replay not sorted"
+            print("  ✓ Heap sort fallback sorts and matches its counting variant")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_heap_shell_natural(self):
+        """Test heap, Shell and natural merge sort on inputs that exercise merging."""
+        print(f"\n{'='*60}")
+        print("Testing Heap, Shell and Natural Merge Sort")
+        print(f"{'='*60}")
+
+        n = 2000
+        inputs = {
+            "random": [random.randint(0, n) for _ in range(n)],
+            "few unique": [random.randint(0, 3) for _ in range(n)],
+            "shuffled blocks": sum((list(range(b * 100, b * 100 + 100))
+                                    for b in random.sample(range(20), 20)), []),
+            "two sorted halves": sorted(random.sample(range(10 * n), n // 2))
+                                 + sorted(random.sample(range(10 * n), n // 2)),
+        }
+        try:
+            for algo_name in ("Heap Sort", "Shell Sort", "Natural Merge Sort"):
+                func = ALGORITHMS[algo_name]
+                for name, arr in inputs.items():
+                    trace = StepTrace.record(func, arr)
+                    result, metrics = COUNTING_ALGORITHMS[algo_name](arr).run()
+                    assert result == sorted(arr), f"{algo_name}/{name}: not sorted"
+                    assert metrics["comparisons"] == trace.count("compare"), \
+                        f"{algo_name}/{name}: comparison count mismatch"
+                    assert metrics["writes"] == trace.count("overwrite"), \
+                        f"{algo_name}/{name}: write count mismatch"
+                    recording = SeekableTrace(func, arr).record_all()
+                    assert recording.state_at(len(recording))[0] == sorted(arr), \
+                        f"{algo_name}/{name}: replay not sorted"
+            print("  ✓ Counts and replay match on merge-heavy inputs")
+
+            arr = [random.randint(0, n) for _ in range(n)]
+            _, metrics = COUNTING_ALGORITHMS["Heap Sort"](arr).run()
+            assert metrics["comparisons"] < 1.2 * n * n.bit_length(), "Sift is not bottom-up"
+            print(f"  ✓ Bottom-up heap sort: {metrics['comparisons']} comparisons for n={n}")
+
+            _, metrics = COUNTING_ALGORITHMS["Natural Merge Sort"](list(range(n))).run()
+            assert metrics["comparisons"] == n - 1 and metrics["writes"] == 0, "Sorted input not one run"
+            _, metrics = COUNTING_ALGORITHMS["Natural Merge Sort"](list(range(n, 0, -1))).run()
+            assert metrics["swaps"] == n // 2 and metrics["writes"] == 0, "Descending run not reversed"
+            _, metrics = COUNTING_ALGORITHMS["Natural Merge Sort"](inputs["two sorted halves"]).run()
+            assert metrics["comparisons"] < 2.5 * n, "Presorted runs were not merged linearly"
+            _, metrics = COUNTING_ALGORITHMS["Natural Merge Sort"](inputs["shuffled blocks"]).run()
+            assert metrics["comparisons"] < 1.5 * n, "Block moves did not gallop"
+            print("  ✓ Natural merge sort is linear on presorted runs and gallops over blocks")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_linear_sorts(self):
+        """Test counting, radix and bucket sort beyond the generic cases."""
+        print(f"\n{'='*60}")
+        print("Testing Linear-Time Sorts")
+        print(f"{'='*60}")
+
+        arr = [random.randint(-500, 5000) for _ in range(500)]
+        try:
+            for radix in (2, 10, 256):
+                func = partial(ALGORITHMS["Radix Sort"], radix=radix)
+                recording = SeekableTrace(func, arr).record_all()
+                assert recording.state_at(len(recording))[0] == sorted(arr), \
+                    f"Radix {radix}: replay not sorted"
+                sorter = COUNTING_ALGORITHMS["Radix Sort"](arr)
+                sorter.radix = radix
+                result, metrics = sorter.run()
+                assert result == sorted(arr), f"Radix {radix}: not sorted"
+                assert metrics["writes"] == recording.trace.count("overwrite"), \
+                    f"Radix {radix}: write count mismatch"
+                assert metrics["comparisons"] == 0, f"Radix {radix}: compared elements"
+            print("  ✓ Radix sort handles negative values with radix 2, 10 and 256")
+
+            for algo_name in ("Counting Sort", "Bucket Sort"):
+                recording = SeekableTrace(ALGORITHMS[algo_name], arr).record_all()
+                assert recording.state_at(len(recording))[0] == sorted(arr), \
+                    f"{algo_name}: replay not sorted"
+            print("  ✓ Counting and bucket sort replay to the sorted array")
+
+            _, metrics = COUNTING_ALGORITHMS["Counting Sort"](arr).run()
+            assert metrics["aux_space"] == (max(arr) - min(arr) + 1) + len(arr), "Counting aux wrong"
+            _, metrics = COUNTING_ALGORITHMS["Radix Sort"](arr).run()
+            assert metrics["aux_space"] == len(arr) + 256, "Radix aux wrong"
+            _, metrics = COUNTING_ALGORITHMS["Bucket Sort"](arr).run()
+            assert metrics["aux_space"] == 2 * len(arr), "Bucket aux wrong"
+            _, metrics = COUNTING_ALGORITHMS["Insertion Sort"](arr).run()
+            assert metrics["aux_space"] == 0, "In-place sort reports aux memory"
+            print("  ✓ Auxiliary memory is accounted (n + k, n + radix, 2n, 0 in place)")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_parallel_merge_sort(self):
+        """Test the process-pool merge sort and its coarse trace."""
+        print(f"\n{'='*60}")
+        print("Testing Parallel Merge Sort")
+        print(f"{'='*60}")
+
+        arr = [random.randint(-1000, 1000) for _ in range(3000)]
+        try:
+            for workers in (1, 2, 3):
+                phases = parallel_merge_phases(arr, workers, threshold=0)
+                merged = []
+                while True:
+                    try:
+                        phase, lo, hi, _ = next(phases)
+                    except StopIteration as stop:
+                        stats = stop.value
+                        break
+                    if phase == "merge":
+                        merged.extend(range(lo, hi))
+                assert stats["result"] == sorted(arr), f"{workers} workers: not sorted"
+                assert stats["workers"] == workers, f"{workers} workers: ran in-process"
+                if workers > 1:
+                    assert sorted(merged) == list(range(len(arr))), \
+                        f"{workers} workers: merge ranges do not tile the output"
+            print("  ✓ Shared-memory pool sorts with 1-3 workers; merges tile the output")
+
+            func = partial(ALGORITHMS["Parallel Merge Sort"], workers=4)
+            recording = SeekableTrace(func, arr).record_all()
+            assert recording.state_at(len(recording))[0] == sorted(arr), "Coarse trace replay not sorted"
+            assert recording.trace.count("overwrite") == 2 * len(arr), "Expected one write per element and phase"
+            print("  ✓ Coarse trace (chunk sorted, merged) replays to the sorted array")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_seekable_trace(self):
+        """Test that keyframe seeking reproduces the replayed array state."""
+        print(f"\n{'='*60}")
+        print("Testing Seekable Traces")
+        print(f"{'='*60}")
+
+        arr = [random.randint(0, 100) for _ in range(50)]
+        for algo_name, algo_func in ALGORITHMS.items():
+            try:
+                recording = SeekableTrace(algo_func, arr, keyframe_interval=16, max_keyframes=8)
+                recording.record_all()
+                assert recording.keyframe_count <= 8, "Keyframe budget exceeded"
+
+                # Replay every step by hand and compare against seeks
+                state = arr[:]
+                for index, step in enumerate(recording.trace):
+                    if index % 7 == 0:
+                        assert recording.state_at(index)[0] == state, f"Wrong state at step {index}"
+                    if step.type == "swap":
+                        state[step.i], state[step.j] = state[step.j], state[step.i]
+                    elif step.type == "overwrite":
+                        state[step.i] = step.value
+
+                final, counts = recording.state_at(len(recording))
+                assert final == sorted(arr), "Final state is not sorted"
+                assert counts["compare"] == recording.trace.count("compare"), "Count mismatch"
+
+                print(f"  ✓ {algo_name}: {len(recording)} steps, {recording.keyframe_count} keyframes")
+                self.tests_passed += 1
+
+            except AssertionError as e:
+                print(f"  ✗ {algo_name}: {str(e)}")
+                self.tests_failed += 1
+
+        # Bounded recording: steps are dropped once played, playback goes on live
+        arr = [random.randint(0, 100) for _ in range(120)]
+        try:
+            full = SeekableTrace(ALGORITHMS["Merge Sort"], arr).record_all()
+            for fed_batches in (False, True):
+                func = None if fed_batches else ALGORITHMS["Merge Sort"]
+                bounded = SeekableTrace(func, arr, keyframe_interval=16, max_steps=300)
+                position = held = 0
+                while position < len(full):
+                    if position >= len(bounded):
+                        if fed_batches:
+                            chunk = StepTrace()
+                            for k in range(position, min(position + 100, len(full))):
+                                step = full.step(k)
+                                chunk.append(step.type, step.i, step.j, step.value, step.description)
+                            bounded.append_batch(chunk)
+                        else:
+                            bounded.extend(64)
+                    held = max(held, len(bounded.trace))
+                    assert bounded.step(position) == full.step(position), f"Step {position} differs"
+                    position += 1
+                    if position % 37 == 0:
+                        assert bounded.state_at(position) == full.state_at(position), f"Wrong state at {position}"
+                assert held <= 300 + 100, f"Held {held} steps"
+                assert bounded.base > 0, "Nothing was dropped"
+                assert bounded.state_at(0) == full.state_at(bounded.base), "Dropped steps not clamped to base"
+                try:
+                    bounded.step(0)
+                    raise AssertionError("Dropped step still readable")
+                except IndexError:
+                    pass
+            print(f"  ✓ Bounded recording: {len(full)} steps played, at most 300 held")
+            self.tests_passed += 1
+        except AssertionError as e:
+            print(f"  ✗ Bounded recording: {str(e)}")
+            self.tests_failed += 1
+
+    def test_coalesced_writes(self):
+        """Test block steps: same states and counts as the per-element trace."""
+        print(f"\n{'='*60}")
+        print("Testing Coalesced Block Writes")
+        print(f"{'='*60}")
+
+        arr = [random.randint(0, 100) for _ in range(300)]
+
+        def counts(state):
+            values, ops = state
+            return values, ops["compare"], ops["swap"], ops["overwrite"]
+
+        try:
+            for algo_name in ("Insertion Sort", "Merge Sort", "Natural Merge Sort", "Heap Sort"):
+                func = ALGORITHMS[algo_name]
+                raw = SeekableTrace(func, arr).record_all()
+                coalesced = SeekableTrace(coalesce_writes(func), arr).record_all()
+                trace = coalesced.trace
+
+                # Every coalesced step stands for a run of raw steps
+                position = 0
+                for index in range(len(trace)):
+                    if OPCODES[trace.ops[index]] == "block":
+                        assert len(trace[index].value) == trace.j[index] - trace.i[index] + 1, \
+                            f"{algo_name}: block length mismatch"
+                        position += trace.args[index] + trace.j[index] - trace.i[index] + 1
+                    else:
+                        position += 1
+                    if index % 25 == 0 or index == len(trace) - 1:
+                        assert counts(coalesced.state_at(index + 1)) == counts(raw.state_at(position)), \
+                            f"{algo_name}: state diverges at step {index}"
+                assert position == len(raw.trace), f"{algo_name}: raw steps not accounted for"
+                print(f"  ✓ {algo_name}: {len(raw.trace)} -> {len(trace)} steps")
+
+            for algo_name in ("Insertion Sort", "Merge Sort"):
+                raw_steps = len(StepTrace.record(ALGORITHMS[algo_name], arr))
+                steps = len(StepTrace.record(coalesce_writes(ALGORITHMS[algo_name]), arr))
+                assert steps * 5 < raw_steps, f"{algo_name}: only {raw_steps} -> {steps} steps"
+
+            # Plain Step stream and batched producer path
+            steps = list(coalesce_writes(ALGORITHMS["Merge Sort"])(arr))
+            assert any(step.type == "block" for step in steps), "No block Steps without a trace"
+            producer = StepProducer(coalesce_writes(ALGORITHMS["Merge Sort"]), arr, batch_size=64).start()
+            recording = SeekableTrace(None, arr)
+            deadline = time.time() + 10
+            while not producer.done and time.time() < deadline:
+                for batch in producer.drain():
+                    recording.append_batch(batch)
+            assert len(recording) == len(steps), "Batched recording lost steps"
+            assert recording.state_at(len(recording))[0] == sorted(arr), "Batched blocks misplaced"
+            print("  ✓ Step stream and batched producer recording")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_frame_export(self):
+        """Test headless frame rendering and GIF/PNG export."""
+        print(f"\n{'='*60}")
+        print("Testing Headless Frame Export")
+        print(f"{'='*60}")
+
+        if frame_export.np is None:
+            print("  - NumPy not installed, skipped")
+            return
+
+        arr = [random.randint(1, 100) for _ in range(120)]
+        try:
+            merge = ALGORITHMS["Merge Sort"]
+            frames = list(frame_export.render_frames(merge, arr, max_frames=40, width=160, height=90))
+            renderer = frame_export.FrameRenderer(len(arr), max(arr), 160, 90)
+            assert 2 < len(frames) <= 40, f"{len(frames)} frames for a budget of 40"
+            assert (frames[0] == renderer.render(arr)).all(), "First frame is not the input"
+            assert (frames[-1] == renderer.render(sorted(arr))).all(), "Last frame is not the sorted array"
+            assert frame_export.FrameRenderer.to_rgb(frames[0]).shape == (90, 160, 3), "RGB shape"
+            print(f"  ✓ {len(frames)} frames, first/last match input/sorted")
+
+            large = [random.randint(0, 10**6) for _ in range(5000)]
+            columns = frame_export.FrameRenderer(len(large), max(large), 160, 90).render(large)
+            assert (columns == frame_export.COLUMN_MIN).any(), "Large-array mode lacks column minima"
+            print("  ✓ Large-array column mode")
+
+            with tempfile.TemporaryDirectory() as tmp:
+                gif = os.path.join(tmp, "merge.gif")
+                count = frame_export.export_animation(merge, arr, gif, duration=2, fps=20,
+                                                      width=160, height=90)
+                assert count == len(frames), "GIF frame count differs from the rendered frames"
+                # Unchanged frames are merged, so the GIF holds a subsequence
+                rendered = iter(frame.tolist() for frame in frames)
+                for frame in read_gif_frames(gif):
+                    assert any(frame == expected for expected in rendered), "GIF frame differs"
+                assert frame == frames[-1].tolist(), "GIF does not end on the sorted array"
+                print(f"  ✓ GIF decodes back to the rendered frames ({os.path.getsize(gif)} bytes)")
+
+                paths = frame_export.write_png_frames(frames[-1:], os.path.join(tmp, "png"))
+                with open(paths[0], "rb") as f:
+                    png = f.read()
+                assert png.startswith(b"\x89PNG"), "Not a PNG"
+                start = png.index(b"IDAT")
+                length = struct.unpack(">I", png[start - 4:start])[0]
+                rows = zlib.decompress(png[start + 4:start + 4 + length])
+                assert rows == b"".join(b"\x00" + bytes(row) for row in frames[-1].tolist()), \
+                    "PNG pixels differ"
+                print("  ✓ PNG frames decode to the rendered pixels")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_trace_export(self):
+        """Test the binary trace format: exact round trip, size and validation."""
+        print(f"\n{'='*60}")
+        print("Testing Binary Trace Export")
+        print(f"{'='*60}")
+
+        if trace_export.np is None:
+            print("  - NumPy not installed, skipped")
+            return
+
+        arr = [random.randint(0, 1000) for _ in range(300)]
+        columns = ("ops", "i", "j", "values", "args", "template_ids", "blocks")
+        try:
+            for algo_name, algo_func in ALGORITHMS.items():
+                for func in (algo_func, coalesce_writes(algo_func)):
+                    trace = StepTrace.record(func, arr)
+                    for compress in (True, False):
+                        meta, initial, decoded = trace_export.decode_trace(
+                            trace_export.encode_trace(trace, arr, algo_name, compress))
+                        assert meta["algorithm"] == algo_name and initial == arr, f"{algo_name}: header differs"
+                        for column in columns:
+                            assert getattr(decoded, column) == getattr(trace, column), \
+                                f"{algo_name}: {column} column differs"
+                        assert decoded.templates == trace.templates, f"{algo_name}: templates differ"
+            print(f"  ✓ {len(ALGORITHMS)} algorithms round-trip exactly (plain and block writes)")
+
+            trace = StepTrace.record(ALGORITHMS["Quick Sort"], arr)
+            raw = len(trace_export.encode_trace(trace, arr, compress=False))
+            packed = len(trace_export.encode_trace(trace, arr))
+            assert raw < 8 * len(trace) and packed < raw, f"{raw} / {packed} bytes for {len(trace)} steps"
+            print(f"  ✓ Quick Sort: {raw / len(trace):.1f} bytes/step, {packed / len(trace):.1f} compressed "
+                  f"(vs {trace.nbytes / len(trace):.0f} in memory)")
+
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "merge" + trace_export.EXTENSION)
+                recorded = trace_export.export_trace(ALGORITHMS["Merge Sort"], arr, path, "Merge Sort")
+                _, _, loaded = trace_export.read_trace(path)
+                assert list(loaded) == list(recorded), "Trace file differs from the recording"
+            for bad in (b"GIF89a", trace_export.MAGIC + b"\x09\x00"):
+                try:
+                    trace_export.decode_trace(bad)
+                    raise AssertionError(f"Accepted invalid header {bad!r}")
+                except ValueError:
+                    pass
+            wide = [trace_export.VALUE_LIMIT, 1, -trace_export.VALUE_LIMIT]
+            try:
+                trace_export.encode_trace(StepTrace.record(ALGORITHMS["Merge Sort"], wide), wide)
+                raise AssertionError("Accepted values the web player cannot decode exactly")
+            except ValueError:
+                pass
+            print("  ✓ Trace files, header and value range validation")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_trace_verifier(self):
+        """Test trace replay verification and the budgeted differential run."""
+        print(f"\n{'='*60}")
+        print("Testing Trace Replay Verifier")
+        print(f"{'='*60}")
+
+        edge_cases = [
+            [],
+            [7],
+            [3, 3, 3, 3],
+            list(range(40)),
+            list(range(40, 0, -1)),
+            [random.randint(-500, 500) for _ in range(400)],
+        ]
+        try:
+            for algo_name in ALGORITHMS:
+                for arr in edge_cases:
+                    for block_writes in (False, True):
+                        problems = trace_verifier.verify(algo_name, arr, block_writes)
+                        assert not problems, f"{algo_name} on n={len(arr)}: {problems}"
+            print(f"  ✓ {len(ALGORITHMS)} algorithms replay to sorted() with matching 'done' counts")
+
+            arr = [random.randint(0, 10000) for _ in range(5000)]
+            for algo_name in ("Merge Sort", "Introsort", "Heap Sort"):
+                for func in (ALGORITHMS[algo_name], coalesce_writes(ALGORITHMS[algo_name])):
+                    trace = StepTrace.record(func, arr)
+                    assert trace_verifier.replay(trace, arr) == trace_verifier._replay_steps(trace, arr), \
+                        f"{algo_name}: vectorized replay differs"
+            print("  ✓ Vectorized replay matches step-by-step replay")
+
+            arr = edge_cases[-1]
+            trace = StepTrace.record(ALGORITHMS["Merge Sort"], arr)
+            last_write = max(k for k in range(len(trace)) if OPCODES[trace.ops[k]] == "overwrite")
+            trace.values[last_write] += 10000
+            assert any("not sorted" in p for p in trace_verifier.verify_trace(trace, arr)), "Bad write missed"
+            trace = StepTrace.record(ALGORITHMS["Quick Sort"], arr)
+            trace.ops[[OPCODES[op] for op in trace.ops].index("compare")] = OPCODES.index("complete")
+            assert any("Comparisons" in p for p in trace_verifier.verify_trace(trace, arr)), "Count drift missed"
+            trace = StepTrace.record(ALGORITHMS["Heap Sort"], arr)
+            trace.j[[OPCODES[op] for op in trace.ops].index("swap")] = len(arr)
+            assert any("indexes" in p for p in trace_verifier.verify_trace(trace, arr)), "Bad index missed"
+            print("  ✓ Corrupted writes, counts and indices are reported")
+
+            start = time.perf_counter()
+            rows = trace_verifier.differential_test(max_size=10_000, budget=4.0, seed=random.randrange(1000))
+            failed = [row for row in rows if row["problems"]]
+            assert not failed, f"Differential failures: {failed[:3]}"
+            assert {row["algorithm"] for row in rows} == set(ALGORITHMS), "Algorithms left out"
+            assert max(row["size"] for row in rows) == 10_000, "Largest size never reached"
+            print(f"  ✓ Differential run: {len(rows)} runs in {time.perf_counter() - start:.1f}s")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_trace_cache(self):
+        """Test the LRU trace cache, disk spill and replay of cached traces."""
+        print(f"\n{'='*60}")
+        print("Testing Trace Cache")
+        print(f"{'='*60}")
+
+        arrays = [[random.randint(0, 100) for _ in range(60)] for _ in range(3)]
+        try:
+            cache = TraceCache()
+            first = cache.record("Quick Sort", arrays[0])
+            assert cache.record("Quick Sort", list(arrays[0])) is first, "Equal input not served from cache"
+            assert cache.record("Heap Sort", arrays[0]) is not first, "Algorithms share a cache entry"
+            assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2, f"Stats {cache.stats}"
+            floats = [random.uniform(0, 1) for _ in range(40)]
+            records = [{"id": k, "score": random.randint(0, 9)} for k in range(40)]
+            assert TraceCache.key("Merge Sort", floats) == TraceCache.key("Merge Sort", list(floats)), \
+                "Float key not stable"
+            assert TraceCache.key("Merge Sort", records) != TraceCache.key("Merge Sort", records[::-1]), \
+                "Record inputs share a key"
+            traced = cache.record("Merge Sort", floats)
+            assert cache.record("Merge Sort", list(floats)) is traced, "Float input not served from cache"
+            print("  ✓ Hits keyed by algorithm and input contents (ints, floats, records)")
+
+            # One byte short of all three traces: adding the third must evict one
+            traces = [StepTrace.record(ALGORITHMS["Quick Sort"], arr) for arr in arrays]
+            cache = TraceCache(max_bytes=sum(trace.nbytes for trace in traces) - 1)
+            for arr, trace in zip(arrays[:2], traces):
+                cache.put(TraceCache.key("Quick Sort", arr), trace)
+            cache.get(TraceCache.key("Quick Sort", arrays[0]))  # arrays[1] is now least recent
+            cache.record("Quick Sort", arrays[2])
+            assert TraceCache.key("Quick Sort", arrays[1]) not in cache, "LRU entry not evicted"
+            assert TraceCache.key("Quick Sort", arrays[0]) in cache, "Recently used entry evicted"
+            assert cache.nbytes <= cache.max_bytes, "Over memory budget"
+            print(f"  ✓ LRU eviction within {cache.max_bytes} bytes")
+
+            with tempfile.TemporaryDirectory() as tmp:
+                # Room for exactly one of the traces
+                largest = max(StepTrace.record(ALGORITHMS["Quick Sort"], arr).nbytes for arr in arrays)
+                cache = TraceCache(max_bytes=largest, spill_dir=tmp)
+                for arr in arrays:
+                    cache.record("Quick Sort", arr)
+                assert cache.stats["spills"] == 2 and len(os.listdir(tmp)) == 2, "Evicted traces not spilled"
+                reloaded = cache.record("Quick Sort", arrays[0])
+                expected = StepTrace.record(ALGORITHMS["Quick Sort"], arrays[0])
+                assert cache.stats["disk_hits"] == 1, "Spilled trace recomputed"
+                assert list(reloaded) == list(expected), "Spilled trace changed"
+                cache.clear()
+                assert not os.listdir(tmp) and not len(cache), "Spill files left after clear"
+            print("  ✓ Spill to disk and reload")
+
+            recording = SeekableTrace(ALGORITHMS["Merge Sort"], arrays[0]).record_all()
+            replay = SeekableTrace.from_trace(recording.trace, arrays[0], keyframe_interval=16)
+            assert not replay.complete, "Adopted trace ingested eagerly"
+            replay.extend(len(recording) // 2)
+            assert replay.state_at(len(recording) - 3) == recording.state_at(len(recording) - 3), \
+                "Replay state differs before ingestion finished"
+            replay.record_all()
+            assert replay.complete and replay.keyframe_count > 2, "Adopted trace not fully ingested"
+            for index in range(0, len(recording), 37):
+                assert replay.state_at(index) == recording.state_at(index), f"Replay differs at {index}"
+            print("  ✓ Cached traces replay through SeekableTrace.from_trace")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_race(self):
+        """Test race lanes: lockstep scheduling, per-lane counts and finishing places."""
+        print(f"\n{'='*60}")
+        print("Testing Algorithm Race")
+        print(f"{'='*60}")
+
+        arr = [random.randint(0, 500) for _ in range(400)]
+        names = ["Insertion Sort", "Merge Sort", "Quick Sort", "Heap Sort", "Radix Sort"]
+        try:
+            race = Race([(name, ALGORITHMS[name]) for name in names], arr)
+            for lane in race.lanes:
+                lane.bins = ColumnBins(lane.values, 64)
+            race.frame(300, deadline=0.0)  # Deadline already passed: one chunk round
+            assert {lane.steps for lane in race.lanes} == {Race.CHUNK}, "Lanes not in lockstep"
+            assert all(lane.budget == 0 for lane in race.lanes), "Backlog kept after deadline"
+            while not race.finished:
+                race.frame(777)
+                steps = {lane.steps for lane in race.lanes if not lane.finished}
+                assert len(steps) <= 1, f"Unfinished lanes drifted apart: {steps}"
+            print(f"  ✓ {len(names)} lanes advanced in lockstep")
+
+            for lane in race.lanes:
+                trace = StepTrace.record(ALGORITHMS[lane.name], arr)
+                final, ops = SeekableTrace(ALGORITHMS[lane.name], arr).record_all().state_at(len(trace))
+                assert lane.values == final == sorted(arr), f"{lane.name}: lane not sorted"
+                assert lane.steps == len(trace), f"{lane.name}: {lane.steps} steps, trace has {len(trace)}"
+                assert (lane.comparisons, lane.swaps, lane.writes) == \
+                    (ops["compare"], ops["swap"], ops["overwrite"]), f"{lane.name}: counts differ"
+                b = lane.bins
+                assert all(b.max[c] == max(lane.values[b.starts[c]:b.starts[c + 1]])
+                           for c in range(b.columns)), f"{lane.name}: column bins stale"
+            order = [lane.steps for lane in race.finish_order]
+            assert order == sorted(order) and len(order) == len(names), "Finish order not by steps"
+            assert race.finish_order[0].place == 1, "Winner not placed first"
+            print("  ✓ Per-lane counts match traces, placed by steps: " +
+                  ", ".join(lane.name for lane in race.finish_order))
+
+            blocks = Race([("Merge Sort", coalesce_writes(ALGORITHMS["Merge Sort"])),
+                           ("Merge Sort", ALGORITHMS["Merge Sort"]),
+                           ("Merge Sort", ALGORITHMS["Merge Sort"])], arr).run()
+            assert blocks[0].steps < blocks[1].steps, "Block writes did not win"
+            assert blocks[1].place == blocks[2].place == 2, "Tied lanes not sharing a place"
+            assert blocks[0].writes == blocks[1].writes, "Block lane miscounted writes"
+            print("  ✓ Block-write lanes and tied places")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_key_functions(self):
+        """Test key=/reverse= on records, keys computed once and per-algorithm stability."""
+        print(f"\n{'='*60}")
+        print("Testing Key Functions and Records")
+        print(f"{'='*60}")
+
+        def drain(steps):
+            while True:
+                try:
+                    next(steps)
+                except StopIteration as stop:
+                    return stop.value
+
+        rng = random.Random(25)
+        people = [{"name": f"p{k}", "age": rng.randint(18, 30), "score": rng.random()} for k in range(150)]
+        cases = [
+            ("dict records", people, lambda p: p["age"]),
+            ("float keys", people, lambda p: p["score"]),
+            ("tuple keys", people, lambda p: (p["age"] // 4, p["name"])),
+            ("floats", [rng.uniform(-5, 5) for _ in range(120)], None),
+            ("strings", [rng.choice(["kiwi", "fig", "apple", "pear", "plum"]) for _ in range(120)], None),
+        ]
+        try:
+            for algo_name, func in ALGORITHMS.items():
+                stable = algo_name in STABLE_ALGORITHMS
+                for label, records, key in cases:
+                    sort_key = key or (lambda x: x)
+                    for reverse in (False, True):
+                        expected = sorted(records, key=key, reverse=reverse)
+                        results = [drain(func(records, key=key, reverse=reverse)),
+                                   COUNTING_ALGORITHMS[algo_name](records, key=key, reverse=reverse).run()[0]]
+                        for result in results:
+                            assert [sort_key(r) for r in result] == [sort_key(r) for r in expected], \
+                                f"{algo_name}: {label} (reverse={reverse}) not sorted"
+                            if stable:
+                                assert result == expected, f"{algo_name}: {label} (reverse={reverse}) not stable"
+            print(f"  ✓ {len(ALGORITHMS)} algorithms sort records, floats and strings (reverse too)")
+
+            # Unstable algorithms really do reorder some equal keys
+            pairs = [(rng.randrange(8), k) for k in range(300)]
+            for algo_name in ALGORITHMS:
+                if algo_name not in STABLE_ALGORITHMS:
+                    result = drain(ALGORITHMS[algo_name](pairs, key=lambda p: p[0]))
+                    assert result != sorted(pairs, key=lambda p: p[0]), f"{algo_name}: listed unstable but kept order"
+            print(f"  ✓ Stable: {len(STABLE_ALGORITHMS)}, unstable ones reorder equal keys")
+
+            calls = []
+            counted = lambda p: calls.append(1) or p["age"]
+            for algo_name, func in ALGORITHMS.items():
+                calls.clear()
+                drain(func(people, key=counted))
+                assert len(calls) == len(people), f"{algo_name}: key called {len(calls)} times"
+            print("  ✓ Key computed once per record")
+
+            # Traces refer to indices; an int key gives the plain trace
+            arr = [rng.randint(0, 99) for _ in range(200)]
+            for algo_name, func in ALGORITHMS.items():
+                plain = StepTrace.record(func, arr)
+                keyed = StepTrace.record(partial(func, key=lambda x: x), arr)
+                assert (keyed.ops, keyed.i, keyed.j, keyed.values) == (plain.ops, plain.i, plain.j, plain.values), \
+                    f"{algo_name}: identity key changed the trace"
+                if algo_name not in COARSE_TRACES:
+                    trace = StepTrace.record(partial(func, key=lambda p: p["age"]), people)
+                    _, metrics = COUNTING_ALGORITHMS[algo_name](people, key=lambda p: p["age"]).run()
+                    assert (trace.count("compare"), trace.count("swap"), trace.count("overwrite")) == \
+                        (metrics["comparisons"], metrics["swaps"], metrics["writes"]), f"{algo_name}: keyed counts differ"
+            assert drain(coalesce_writes(ALGORITHMS["Merge Sort"])(people, key=counted, reverse=True)) == \
+                sorted(people, key=counted, reverse=True), "Block writes lost the records"
+            print("  ✓ Index-based traces unchanged, keyed counts match counting variants")
+
+            # Epoch keys are sorted as they are, beyond-int64 keys are ranked; every traced run records
+            events = [{"ts": 1_700_000_000_000 + rng.randrange(10 ** 9)} for _ in range(200)]
+            huge = [rng.randint(-10 ** 30, 10 ** 30) for _ in range(200)]
+            stamp = lambda e: e["ts"]
+            for algo_name, func in ALGORITHMS.items():
+                for records, key in ((events, stamp), (huge, None)):
+                    sort_key = key or (lambda x: x)
+                    for reverse in (False, True):
+                        expected = sorted(records, key=key, reverse=reverse)
+                        result = drain(func(records, StepTrace(), key=key, reverse=reverse))
+                        counted, metrics = COUNTING_ALGORITHMS[algo_name](records, key=key, reverse=reverse).run()
+                        for sorted_records in (result, counted):
+                            if algo_name in STABLE_ALGORITHMS:
+                                assert sorted_records == expected, f"{algo_name}: wide keys not sorted stably"
+                            else:
+                                assert [sort_key(r) for r in sorted_records] == [sort_key(r) for r in expected], \
+                                    f"{algo_name}: wide keys not sorted"
+                        if algo_name == "Counting Sort":
+                            assert metrics["aux_space"] <= 2 * len(records), f"Counting sort used {metrics['aux_space']} slots"
+            print("  ✓ Epoch-millisecond and beyond-int64 keys traced and sorted")
+            self.tests_passed += 1
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_column_bins(self):
+        """Test that incrementally updated column bins match a full rescan."""
+        print(f"\n{'='*60}")
+        print("Testing Pixel-Column Aggregation")
+        print(f"{'='*60}")
+
+        try:
+            values = [random.randint(1, 400) for _ in range(5000)]
+            bins = ColumnBins(values, 300)
+            for _ in range(20000):
+                i = random.randrange(len(values))
+                if random.random() < 0.5:
+                    j = random.randrange(len(values))
+                    old_i, old_j = values[i], values[j]
+                    values[i], values[j] = old_j, old_i
+                    bins.update(i, old_i)
+                    bins.update(j, old_j)
+                else:
+                    old = values[i]
+                    values[i] = random.randint(1, 400)
+                    bins.update(i, old)
+
+            for c in range(bins.columns):
+                chunk = values[bins.starts[c]:bins.starts[c + 1]]
+                assert bins.max[c] == max(chunk), f"Column {c} max is stale"
+                assert bins.min[c] == min(chunk), f"Column {c} min is stale"
+                assert bins.sum[c] == sum(chunk), f"Column {c} sum is stale"
+
+            print(f"  ✓ {bins.columns} columns consistent after 20000 updates")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_step_producer(self):
+        """Test the background producer's output, backpressure and cancellation."""
+        print(f"\n{'='*60}")
+        print("Testing Background Step Producer")
+        print(f"{'='*60}")
+
+        arr = [random.randint(0, 100) for _ in range(60)]
+        try:
+            for algo_name, algo_func in ALGORITHMS.items():
+                producer = StepProducer(algo_func, arr, batch_size=64).start()
+                recording = SeekableTrace(None, arr)
+                while not producer.done:
+                    for batch in producer.drain():
+                        recording.append_batch(batch)
+                    time.sleep(0.001)
+                recording.finish()
+                assert list(recording.trace) == list(algo_func(arr[:])), f"{algo_name}: steps differ"
+                assert recording.state_at(len(recording))[0] == sorted(arr), f"{algo_name}: not sorted"
+            print("  ✓ Batched steps match the generator for every algorithm")
+
+            # A consumer that never drains must stall the producer at the queue bound
+            producer = StepProducer(ALGORITHMS["Bubble Sort"], list(range(300, 0, -1)),
+                                    batch_size=16, max_batches=4).start()
+            time.sleep(0.2)
+            assert producer.queue.qsize() == 4, "Queue grew past its bound"
+            producer.cancel()
+            producer.join(2)
+            assert not producer.alive, "Cancelled producer is still running"
+            print("  ✓ Backpressure holds the worker; cancel stops it")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_reference_sorts(self):
+        """Test that benchmark reference and vectorized sorts are correct."""
+        print(f"\n{'='*60}")
+        print("Testing Reference Sorts")
+        print(f"{'='*60}")
+
+        test_cases = [[], [7], [5, 5, 5, 5, 5], list(range(20, 0, -1)),
+                      [random.randint(0, 30) for _ in range(101)]]
+        for name, (prepare, sort) in {**REFERENCE_SORTS, **VECTORIZED_SORTS}.items():
+            try:
+                for arr in test_cases:
+                    assert list(sort(prepare(arr))) == sorted(arr), f"Wrong result for {arr}"
+                print(f"  ✓ {name}")
+                self.tests_passed += 1
+            except AssertionError as e:
+                print(f"  ✗ {name}: {str(e)}")
+                self.tests_failed += 1
+
+    def test_complexity_fitting(self):
+        """Test input distributions and complexity model fitting."""
+        print(f"\n{'='*60}")
+        print("Testing Distributions and Complexity Fitting")
+        print(f"{'='*60}")
+
+        try:
+            for name, generate in DISTRIBUTIONS.items():
+                for n in (1, 2, 37, 100):
+                    assert len(generate(n)) == n, f"{name}: wrong length for n={n}"
+            print(f"  ✓ {len(DISTRIBUTIONS)} distributions produce n elements")
+
+            sizes = [64, 128, 256, 512, 1024]
+            quadratic = fit_complexity(sizes, [3 * n * n for n in sizes])
+            assert abs(quadratic["exponent"] - 2) < 1e-9, "Wrong exponent for n²"
+            assert quadratic["model"] == "n²", "n² data not recognized"
+            assert abs(quadratic["coefficients"]["n²"] - 3) < 1e-9, "Wrong n² coefficient"
+
+            nlogn = fit_complexity(sizes, [n * (n.bit_length() - 1) for n in sizes])
+            assert nlogn["model"] == "n log n", "n log n data not recognized"
+
+            repeated = fit_complexity([100, 100, 100], [1.0, 1.1, 0.9])
+            assert repeated["exponent"] is None, "Fitted an exponent from a single size"
+            print("  ✓ Fitted models match synthetic n² and n log n data; one size gives no fit")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_parallel_runner(self):
+        """Test the process-pool sweep and per-cell timeouts."""
+        print(f"\n{'='*60}")
+        print("Testing Parallel Benchmark Runner")
+        print(f"{'='*60}")
+
+        try:
+            assert run_cell("Bubble Sort", 3000, "reversed", 0, timeout=0.01) is None, \
+                "Runaway cell was not cut off"
+            elapsed, ops = run_cell("Quick Sort", 100, "random", 0, timeout=5)
+            assert elapsed > 0 and ops > 0, "Cell returned no measurements"
+            print("  ✓ Cells report time/ops and time out when too slow")
+
+            bench = SortingBenchmark()
+            bench.parallel_sweep(sizes=(32, 64), distributions=["random"], runs=2, workers=2)
+            for algo_name in ALGORITHMS:
+                for size in (32, 64):
+                    result = bench.results[(algo_name, size, "random")]
+                    assert result["runs"] == 2, f"{algo_name}/{size}: runs not merged"
+            print("  ✓ Parallel results merged per (algorithm, size, distribution)")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_memory_profile(self):
+        """Test tracemalloc/profile-based memory and depth measurement."""
+        print(f"\n{'='*60}")
+        print("Testing Memory Instrumentation")
+        print(f"{'='*60}")
+
+        n = 1024
+        data = [random.randint(0, n) for _ in range(n)]
+        try:
+            merge = measure_memory(lambda: COUNTING_ALGORITHMS["Merge Sort"](data).sort)
+            insertion = measure_memory(lambda: COUNTING_ALGORITHMS["Insertion Sort"](data).sort)
+            assert merge["peak_bytes"] >= 8 * n, "Merge sort aux copy not measured"
+            assert insertion["peak_bytes"] < 8 * n, "In-place sort reported a full copy"
+            # sort() plus one msort frame per level, sizes 1024 down to 1
+            assert merge["max_depth"] == 2 + n.bit_length() - 1, \
+                f"Recursion depth {merge['max_depth']} != log2 n + 2"
+            assert insertion["max_depth"] == 1, "Iterative sort reported nesting"
+            print(f"  ✓ Merge Sort: {merge['peak_bytes']} bytes, depth {merge['max_depth']}; "
+                  f"Insertion Sort: {insertion['peak_bytes']} bytes, depth 1")
+
+            traced = measure_memory(lambda: partial(deque, ALGORITHMS["Merge Sort"](data), maxlen=0))
+            iterative = measure_memory(lambda: partial(deque, ALGORITHMS["Quick Sort"](data), maxlen=0))
+            assert traced["max_depth"] > n.bit_length(), "Generator chain depth not measured"
+            # Generator frame, then make_step and the Step constructor
+            assert iterative["max_depth"] == 3, "Iterative generator reported nesting"
+            assert iterative["peak_bytes"] >= 8 * n, "Generator input copy not measured"
+            print(f"  ✓ Generator chains: merge_sort depth {traced['max_depth']}, quick_sort depth 3")
+
+            bench = SortingBenchmark()
+            bench.memory(sizes=(64,), algorithms=["Counting Sort"])
+            result = bench.results[("Counting Sort (traced)", 64, "random")]
+            assert result["peak_blocks"] > 0 and result["average"] > 0, "Profile not stored with time"
+            print("  ✓ Benchmark stores memory profile alongside time")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_phase_profiler(self):
+        """Test phase hooks: unchanged results, per-phase counts, folded output."""
+        print(f"\n{'='*60}")
+        print("Testing Phase Profiler")
+        print(f"{'='*60}")
+
+        data = [random.randint(0, 500) for _ in range(2000)]
+        try:
+            for name, algo_class in COUNTING_ALGORITHMS.items():
+                sample = data[:200] if name in ("Bubble Sort", "Selection Sort", "Insertion Sort") else data
+                expected = algo_class(sample).run()
+                profiler = PhaseProfiler()
+                sorter = algo_class(sample)
+                result = profiler.profile(name, sorter)
+                assert (result, sorter.get_metrics()) == expected, f"{name}: profiling changed the run"
+                assert sorter.profiler is None, f"{name}: profiler left attached"
+
+                # Top-level phases account for every counted operation
+                phases = [stats for stack, stats in profiler.stats.items() if len(stack) == 2]
+                if phases:
+                    assert sum(p[3] for p in phases) == sorter.comparisons, f"{name}: phase comparisons"
+                    assert sum(p[4] for p in phases) == sorter.swaps, f"{name}: phase swaps"
+                    assert sum(p[5] for p in phases) == sorter.writes, f"{name}: phase writes"
+            print("  ✓ Profiled runs match plain runs; phase counts sum to the totals")
+
+            profiler = PhaseProfiler()
+            profiler.profile("Quick Sort", COUNTING_ALGORITHMS["Quick Sort"](data))
+            profiler.profile("Natural Merge Sort", COUNTING_ALGORITHMS["Natural Merge Sort"](sorted(data) * 2))
+            stacks = {phase["stack"] for phase in profiler.phases()}
+            assert ("Natural Merge Sort", "merge", "gallop") in stacks, "Nested phase not recorded"
+            for phase in profiler.phases():
+                assert phase["self_ms"] <= phase["total_ms"], "Self time exceeds total"
+            for line in profiler.folded().splitlines():
+                stack, micros = line.rsplit(" ", 1)
+                assert stack.split(";")[0] in ("Quick Sort", "Natural Merge Sort") and int(micros) > 0, \
+                    f"Bad folded line {line!r}"
+            print(f"  ✓ Nested phases and folded stacks ({len(stacks)} stacks)")
+
+            profiler.enter("merge")
+            try:
+                profiler.exit("partition")
+                raise AssertionError("Mismatched exit accepted")
+            except ValueError:
+                pass
+            print("  ✓ Mismatched exit rejected")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
+    def test_result_persistence(self):
+        """Test saving/loading results and regression detection."""
+        print(f"\n{'='*60}")
+        print("Testing Benchmark Persistence and Regression Check")
+        print(f"{'='*60}")
+
+        try:
+            bench = SortingBenchmark()
+            bench.benchmark(array_size=50, runs=3, references=False)
+            with tempfile.TemporaryDirectory() as tmp:
+                for name in ("results.json", "results.csv"):
+                    path = os.path.join(tmp, name)
+                    bench.save(path)
+                    metadata, loaded = SortingBenchmark.load(path)
+                    assert "python" in metadata, f"{name}: metadata missing"
+                    assert loaded.keys() == bench.results.keys(), f"{name}: keys differ"
+                    for key, result in bench.results.items():
+                        assert loaded[key]["times"] == result["times"], f"{name}: times differ"
+                        assert loaded[key]["operations"] == result["operations"], \
+                            f"{name}: operations differ"
+            print("  ✓ JSON and CSV round-trip results and metadata")
+
+            baseline = {key: dict(result) for key, result in bench.results.items()}
+            assert not bench.compare(baseline), "Identical results flagged"
+
+            rerun = SortingBenchmark()
+            rerun.benchmark(array_size=50, runs=3, references=False)
+            for key, result in rerun.results.items():
+                assert result["operations"] == baseline[key]["operations"], \
+                    f"{key[0]}: seeded inputs gave different operation counts"
+
+            key = ("Quick Sort", 50, "random")
+            slow = {k: dict(v) for k, v in baseline.items()}
+            slow[key]["times"] = [t / 2 for t in slow[key]["times"]]
+            slow[key]["average"] /= 2
+            slow[key]["operations"] *= 0.5
+            kinds = {kind for k, kind, _, _ in bench.compare(slow) if k == key}
+            assert kinds == {"time", "operations"}, f"Injected regression not flagged: {kinds}"
+            print("  ✓ Slowdowns and operation-count changes are flagged")
+            self.tests_passed += 1
+
+        except AssertionError as e:
+            print(f"  ✗ {str(e)}")
+            self.tests_failed += 1
+
     def run_all_tests(self):
         """Run complete test suite."""
         print("\n" + "="*60)
@@ -105,6 +1246,78 @@ class TestSortingAlgorithms:
         # Test generator structure
         self.test_generator_structure()
 
+        # Test bottom-up merge sort specifics
+        self.test_bottom_up_merge_sort()
+
+        # Test introsort robustness
+        self.test_introsort()
+
+        # Test heap, Shell and natural merge sort on larger inputs
+        self.test_heap_shell_natural()
+
+        # Test counting, radix and bucket sort
+        self.test_linear_sorts()
+
+        # Test the multi-process merge sort
+        self.test_parallel_merge_sort()
+
+        # Test compact trace recording
+        self.test_compact_trace()
+
+        # Test metrics-only variants
+        self.test_counting_variants()
+
+        # Test counting sort on wide value ranges
+        self.test_counting_sort_range()
+
+        # Test keyframe seeking
+        self.test_seekable_trace()
+
+        # Test coalesced block writes
+        self.test_coalesced_writes()
+
+        # Test trace replay verification
+        self.test_trace_verifier()
+
+        # Test binary trace export
+        self.test_trace_export()
+
+        # Test the trace cache
+        self.test_trace_cache()
+
+        # Test side-by-side race lanes
+        self.test_race()
+
+        # Test key functions, records and stability
+        self.test_key_functions()
+
+        # Test large-array column bins
+        self.test_column_bins()
+
+        # Test headless GIF/PNG export
+        self.test_frame_export()
+
+        # Test background step producer
+        self.test_step_producer()
+
+        # Test benchmark reference sorts
+        self.test_reference_sorts()
+
+        # Test benchmark distributions and fitting
+        self.test_complexity_fitting()
+
+        # Test process-pool benchmark runner
+        self.test_parallel_runner()
+
+        # Test memory instrumentation
+        self.test_memory_profile()
+
+        # Test per-phase profiling hooks
+        self.test_phase_profiler()
+
+        # Test saved results and baseline comparison
+        self.test_result_persistence()
+
         # Print summary
         self.print_summary()
 
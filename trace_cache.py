@@ -0,0 +1,138 @@
+# ============================================================================
+# Trace Cache
+# LRU cache of recorded step traces keyed by algorithm and input
+# ============================================================================
+
+import hashlib
+import os
+import pickle
+from array import array
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from algorithms import ALGORITHMS
+from step_trace import StepTrace
+
+CacheKey = Tuple[str, int, str]
+
+
+class TraceCache:
+    """
+    Recorded StepTraces keyed by (algorithm name, input length, input hash).
+
+    Traces are kept in memory up to ``max_bytes`` (by ``StepTrace.nbytes``);
+    beyond that the least recently used ones are evicted. With a
+    ``spill_dir`` evicted traces are pickled there instead of dropped (up to
+    ``max_spill_bytes`` if given, again least recently used first) and
+    loaded back into memory on their next use.
+
+    The cache owns the traces it holds: callers must not modify a trace
+    after ``put`` or one returned by ``get``.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2 ** 20, spill_dir: Optional[str] = None,
+                 max_spill_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.nbytes = 0
+        self.spill_bytes = 0
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "spills": 0}
+        self._memory: "OrderedDict[CacheKey, StepTrace]" = OrderedDict()
+        self._disk: "OrderedDict[CacheKey, Tuple[str, int]]" = OrderedDict()
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @staticmethod
+    def key(algorithm: str, arr: List[int]) -> CacheKey:
+        """Cache key for running ``algorithm`` on ``arr``."""
+        try:
+            data = array("q", arr).tobytes()
+        except (OverflowError, TypeError):  # Beyond int64, floats, records
+            data = repr(arr).encode()
+        return algorithm, len(arr), hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._memory) + len(self._disk)
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._memory or key in self._disk
+
+    def get(self, key: CacheKey) -> Optional[StepTrace]:
+        """Return the cached trace for ``key`` (marking it recently used), or None."""
+        trace = self._memory.get(key)
+        if trace is not None:
+            self._memory.move_to_end(key)
+            self.stats["hits"] += 1
+            return trace
+        spilled = self._disk.pop(key, None)
+        if spilled is None:
+            self.stats["misses"] += 1
+            return None
+
+        path, size = spilled
+        self.spill_bytes -= size
+        with open(path, "rb") as f:
+            trace = pickle.load(f)
+        os.remove(path)
+        self.stats["disk_hits"] += 1
+        self.put(key, trace)
+        return trace
+
+    def put(self, key: CacheKey, trace: StepTrace) -> None:
+        """Cache ``trace`` under ``key``, evicting or spilling to stay in budget."""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        spilled = self._disk.pop(key, None)
+        if spilled is not None:
+            os.remove(spilled[0])
+            self.spill_bytes -= spilled[1]
+        self._memory[key] = trace
+        self.nbytes += trace.nbytes
+        while self.nbytes > self.max_bytes and self._memory:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.stats["evictions"] += 1
+            self._spill(evicted_key, evicted)
+
+    def record(self, algorithm: str, arr: List[int], func: Optional[Callable] = None) -> StepTrace:
+        """
+        Return the trace of ``algorithm`` on ``arr``, recording it on a miss.
+
+        ``func`` overrides the generator (default ``ALGORITHMS[algorithm]``);
+        give wrapped generators their own name, e.g. "Merge Sort (block writes)".
+        """
+        key = self.key(algorithm, arr)
+        trace = self.get(key)
+        if trace is None:
+            trace = StepTrace.record(func or ALGORITHMS[algorithm], arr)
+            self.put(key, trace)
+        return trace
+
+    def clear(self) -> None:
+        """Drop all cached traces, including spill files."""
+        for path, _ in self._disk.values():
+            if os.path.exists(path):
+                os.remove(path)
+        self._memory.clear()
+        self._disk.clear()
+        self.nbytes = self.spill_bytes = 0
+
+    def _spill(self, key: CacheKey, trace: StepTrace) -> None:
+        if self.spill_dir is None:
+            return
+        size = trace.nbytes
+        if self.max_spill_bytes is not None and size > self.max_spill_bytes:
+            return
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        path = os.path.join(self.spill_dir, f"{name}.trace")
+        with open(path, "wb") as f:
+            pickle.dump(trace, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._disk[key] = (path, size)
+        self.spill_bytes += size
+        self.stats["spills"] += 1
+        while self.max_spill_bytes is not None and self.spill_bytes > self.max_spill_bytes:
+            _, (old_path, old_size) = self._disk.popitem(last=False)
+            os.remove(old_path)
+            self.spill_bytes -= old_size
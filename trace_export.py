@@ -0,0 +1,285 @@
+# ============================================================================
+# Binary Trace Export
+# Compact, delta/varint encoded step traces for the web player (index.html)
+# ============================================================================
+
+import argparse
+import json
+import os
+import zlib
+from array import array
+from typing import Callable, List, Tuple
+
+from algorithms import ALGORITHMS
+from step_trace import BLOCK, NONE, StepTrace, coalesce_writes
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+
+# File layout (all integers are LEB128 varints unless noted):
+#
+#   "SVTR"  u8 version  u8 flags            flags bit 0: body is zlib-compressed
+#   body:   varint length + UTF-8 JSON metadata
+#           {"algorithm", "n", "steps", "blocks", "templates"}
+#           then one section per entry of SECTIONS, each a varint byte length
+#           followed by its bytes:
+#
+#   initial   n zigzag deltas of the input array
+#   ops       one raw byte per step (opcode as in step_trace.OPCODES)
+#   i         per step: 0 for None, else zigzag(i - previous i) + 1
+#   j         per step: 0 for None, else zigzag(j - i) + 1 (j itself if i is None)
+#   value     per step: 0 for None and for block steps,
+#             else zigzag(value - previous value) + 1
+#   arg       per step: 0 for None, else zigzag(arg) + 1
+#   template  per step: template id (index into metadata "templates")
+#   blocks    zigzag deltas of all block values; block k covers j - i + 1 of them
+#
+# Every section decodes into one typed array, and the deltas keep index
+# walks, merge output and runs of similar values at one or two bytes.
+MAGIC = b"SVTR"
+VERSION = 1
+FLAG_DEFLATE = 1
+SECTIONS = ("initial", "ops", "i", "j", "value", "arg", "template", "blocks")
+EXTENSION = ".svt"
+
+# The web player decodes varints into JavaScript numbers, exact up to 2^53.
+# Deltas double the magnitude and zigzag doubles it again, so values are
+# kept below 2^50 to keep every encoded code exact.
+VALUE_LIMIT = 2 ** 50
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("trace export needs numpy (pip install numpy)")
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(values: "np.ndarray") -> "np.ndarray":
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def _unzigzag(codes: "np.ndarray") -> "np.ndarray":
+    codes = codes.astype(np.uint64)
+    return (codes >> np.uint64(1)).view(np.int64) ^ -(codes & np.uint64(1)).view(np.int64)
+
+
+def _pack_varints(codes: "np.ndarray") -> bytes:
+    """Encode unsigned 64-bit codes as LEB128 varints, vectorized."""
+    codes = np.asarray(codes, dtype=np.uint64)
+    lengths = np.ones(len(codes), dtype=np.int64)
+    for k in range(1, 10):
+        lengths += codes >= np.uint64(1 << (7 * k))
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    for k in range(int(lengths.max(initial=0))):
+        selected = lengths > k
+        groups = (codes[selected] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = np.where(lengths[selected] > k + 1, 0x80, 0).astype(np.uint64)
+        out[starts[selected] + k] = groups | more
+    return out.tobytes()
+
+
+def _unpack_varints(data: bytes, count: int) -> "np.ndarray":
+    """Decode ``count`` LEB128 varints into unsigned 64-bit codes."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    if len(ends) != count or (count and ends[-1] != len(raw) - 1):
+        raise ValueError(f"corrupt trace section: expected {count} varints")
+    if not count:
+        return np.zeros(0, dtype=np.uint64)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = (np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)) * 7
+    groups = (raw & 0x7F).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.bitwise_or.reduceat(groups, starts)
+
+
+def _nullable(values: "np.ndarray", present: "np.ndarray", delta: bool) -> "np.ndarray":
+    """Codes for a column with gaps: 0 where absent, else zigzag + 1."""
+    codes = np.zeros(len(values), dtype=np.uint64)
+    kept = values[present]
+    if delta:
+        kept = np.diff(kept, prepend=0)
+    codes[present] = _zigzag(kept) + np.uint64(1)
+    return codes
+
+
+def _restore(codes: "np.ndarray", delta: bool) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Inverse of _nullable: (values with NONE where absent, presence mask)."""
+    present = codes != 0
+    kept = _unzigzag(codes[present] - np.uint64(1))
+    if delta:
+        kept = np.cumsum(kept)
+    values = np.full(len(codes), NONE, dtype=np.int64)
+    values[present] = kept
+    return values, present
+
+
+def encode_trace(trace: StepTrace, initial: List[int], algorithm: str = "",
+                 compress: bool = True) -> bytes:
+    """Serialize a recorded trace and the input it was recorded on."""
+    _require_numpy()
+    columns = trace.to_numpy()
+    ops, i, j = columns["ops"], columns["i"], columns["j"]
+    values, args, blocks = columns["values"], columns["args"], columns["blocks"]
+    start = np.asarray(initial, dtype=np.int64)
+    for column in (start, i, j, values, args, blocks):
+        real = column[column != NONE]
+        if real.size and np.abs(real).max() >= VALUE_LIMIT:
+            raise ValueError(f"trace values must stay below {VALUE_LIMIT} in magnitude")
+
+    has_i = i != NONE
+    has_j = j != NONE
+    j_base = np.where(has_i, i, 0)
+    sections = {
+        "initial": _pack_varints(_zigzag(np.diff(start, prepend=0))),
+        "ops": ops.astype(np.uint8).tobytes(),
+        "i": _pack_varints(_nullable(i, has_i, delta=True)),
+        "j": _pack_varints(_nullable(j - j_base, has_j, delta=False)),
+        "value": _pack_varints(_nullable(values, (values != NONE) & (ops != BLOCK), delta=True)),
+        "arg": _pack_varints(_nullable(args, args != NONE, delta=False)),
+        "template": _pack_varints(np.frombuffer(trace.template_ids, dtype=np.uint16)),
+        "blocks": _pack_varints(_zigzag(np.diff(blocks, prepend=0))),
+    }
+    meta = json.dumps({
+        "algorithm": algorithm,
+        "n": len(initial),
+        "steps": len(trace),
+        "blocks": len(trace.blocks),
+        "templates": trace.templates,
+    }).encode()
+
+    body = [_varint(len(meta)), meta]
+    for name in SECTIONS:
+        body += [_varint(len(sections[name])), sections[name]]
+    body = b"".join(body)
+    if compress:
+        body = zlib.compress(body, 6)
+    return MAGIC + bytes((VERSION, FLAG_DEFLATE if compress else 0)) + body
+
+
+def decode_trace(data: bytes) -> Tuple[dict, List[int], StepTrace]:
+    """Parse an encoded trace into (metadata, initial array, StepTrace)."""
+    _require_numpy()
+    if data[:4] != MAGIC:
+        raise ValueError("not a sorting trace file")
+    if data[4] != VERSION:
+        raise ValueError(f"unsupported trace format version {data[4]}")
+    body = data[6:]
+    if data[5] & FLAG_DEFLATE:
+        body = zlib.decompress(body)
+
+    position = 0
+
+    def read_section() -> bytes:
+        nonlocal position
+        length = shift = 0
+        while True:
+            byte = body[position]
+            position += 1
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        section = body[position:position + length]
+        position += length
+        return section
+
+    meta = json.loads(read_section())
+    raw = {name: read_section() for name in SECTIONS}
+    steps = meta["steps"]
+
+    ops = np.frombuffer(raw["ops"], dtype=np.uint8).astype(np.int8)
+    i, has_i = _restore(_unpack_varints(raw["i"], steps), delta=True)
+    j, has_j = _restore(_unpack_varints(raw["j"], steps), delta=False)
+    j[has_j & has_i] += i[has_j & has_i]
+    values, _ = _restore(_unpack_varints(raw["value"], steps), delta=True)
+    args, _ = _restore(_unpack_varints(raw["arg"], steps), delta=False)
+    blocks = np.cumsum(_unzigzag(_unpack_varints(raw["blocks"], meta["blocks"])))
+
+    # Block steps point at their values by offset into the blocks column
+    is_block = ops == BLOCK
+    sizes = np.where(is_block, j - i + 1, 0)
+    values[is_block] = (np.cumsum(sizes) - sizes)[is_block]
+
+    trace = StepTrace()
+    trace.ops = array("b", ops.tobytes())
+    for name, column in (("i", i), ("j", j), ("values", values), ("args", args), ("blocks", blocks)):
+        setattr(trace, name, array("q", column.astype(np.int64).tobytes()))
+    trace.template_ids = array("H", _unpack_varints(raw["template"], steps).astype(np.uint16).tobytes())
+    trace.templates = list(meta["templates"])
+    trace._template_index = {template: tid for tid, template in enumerate(trace.templates)}
+    initial = np.cumsum(_unzigzag(_unpack_varints(raw["initial"], meta["n"]))).tolist()
+    return meta, initial, trace
+
+
+def write_trace(path: str, trace: StepTrace, initial: List[int], algorithm: str = "",
+                compress: bool = True) -> int:
+    """Write an encoded trace to ``path``; return its size in bytes."""
+    data = encode_trace(trace, initial, algorithm, compress)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def read_trace(path: str) -> Tuple[dict, List[int], StepTrace]:
+    """Read a trace file written by ``write_trace``."""
+    with open(path, "rb") as f:
+        return decode_trace(f.read())
+
+
+def export_trace(func: Callable, arr: List[int], path: str, algorithm: str = "",
+                 compress: bool = True) -> StepTrace:
+    """Record ``func`` on ``arr``, write the trace to ``path`` and return it."""
+    trace = StepTrace.record(func, arr)
+    write_trace(path, trace, arr, algorithm, compress)
+    return trace
+
+
+def main():
+    """Export traces of seeded inputs for the web player."""
+    # Imported here: benchmark pulls in the whole benchmarking toolchain
+    from benchmark import DISTRIBUTIONS, make_input
+
+    parser = argparse.ArgumentParser(description="Export step traces for index.html.")
+    parser.add_argument("--algorithms", nargs="+", default=["Merge Sort"], metavar="NAME",
+                        help="algorithms to record (names as in ALGORITHMS)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], metavar="N")
+    parser.add_argument("--distributions", nargs="+", default=["random"], choices=list(DISTRIBUTIONS))
+    parser.add_argument("--inputs", type=int, default=1, metavar="COUNT",
+                        help="seeded inputs per algorithm, size and distribution")
+    parser.add_argument("--block-writes", action="store_true",
+                        help="coalesce contiguous writes into block steps")
+    parser.add_argument("--no-compress", action="store_true", help="skip zlib compression")
+    parser.add_argument("--out", default="traces", metavar="DIR")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for name in args.algorithms:
+        func = coalesce_writes(ALGORITHMS[name]) if args.block_writes else ALGORITHMS[name]
+        label = name + (" (block writes)" if args.block_writes else "")
+        for size in args.sizes:
+            for dist in args.distributions:
+                for run in range(args.inputs):
+                    data = make_input(dist, size, run)
+                    stem = f"{name}_{dist}_{size}_{run}".lower().replace(" ", "_")
+                    path = os.path.join(args.out, stem + EXTENSION)
+                    trace = export_trace(func, data, path, label, not args.no_compress)
+                    size_bytes = os.path.getsize(path)
+                    print(f"{path}: {len(trace)} steps, {size_bytes} bytes "
+                          f"({size_bytes / max(1, len(trace)):.2f} bytes/step)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# ============================================================================
+# Trace Verifier
+# Replay recorded traces onto their input and check the result and counts
+# ============================================================================
+
+import argparse
+import math
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from algorithms import ALGORITHMS, COARSE_TRACES, COUNTING_ALGORITHMS
+from step_trace import BLOCK, COMPARE, OPCODE_OF, OPCODES, OVERWRITE, SWAP, StepTrace, coalesce_writes
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+DONE = OPCODE_OF["done"]
+MIN_RUN = 64  # Average run length below which replay goes step by step
+
+# "Comparisons: 2406 | Writes: 2289" in the final "done" description
+DONE_COUNT = re.compile(r"\b(Comparisons|Swaps|Writes): (\d+)")
+
+
+def trace_counts(trace: StepTrace) -> Dict[str, int]:
+    """Comparisons, swaps and writes of a trace, counting what blocks fold in."""
+    if np is not None:
+        columns = trace.to_numpy()
+        block = columns["ops"] == BLOCK
+        folded = int(columns["args"][block].sum())
+        written = int((columns["j"][block] - columns["i"][block] + 1).sum())
+    else:
+        blocks = [index for index, op in enumerate(trace.ops) if op == BLOCK]
+        folded = sum(trace.args[index] for index in blocks)
+        written = sum(trace.j[index] - trace.i[index] + 1 for index in blocks)
+    return {
+        "comparisons": trace.count("compare") + folded,
+        "swaps": trace.count("swap"),
+        "writes": trace.count("overwrite") + written,
+    }
+
+
+def first_bad_step(trace: StepTrace, n: int) -> Optional[int]:
+    """
+    Index of the first step that indexes outside an array of length ``n``.
+
+    Checks i for compare/swap/overwrite/block steps, j for all but
+    overwrites, and that blocks have i <= j.
+    """
+    if np is not None:
+        columns = trace.to_numpy()
+        ops, i, j = columns["ops"], columns["i"], columns["j"]
+        array_step = (ops == COMPARE) | (ops == SWAP) | (ops == OVERWRITE) | (ops == BLOCK)
+        bad = (i < 0) | (i >= n)
+        bad |= (ops != OVERWRITE) & ((j < 0) | (j >= n))
+        bad |= (ops == BLOCK) & (j < i)
+        found = np.flatnonzero(array_step & bad)
+        return int(found[0]) if found.size else None
+    for index, op in enumerate(trace.ops):
+        if op not in (COMPARE, SWAP, OVERWRITE, BLOCK):
+            continue
+        i, j = trace.i[index], trace.j[index]
+        if not 0 <= i < n or (op != OVERWRITE and not 0 <= j < n) or (op == BLOCK and j < i):
+            return index
+    return None
+
+
+def replay(trace: StepTrace, arr: List[int]) -> List[int]:
+    """
+    Apply the swap, overwrite and block steps of ``trace`` to a copy of ``arr``.
+
+    With NumPy the trace is cut into runs of writes and runs of swaps. A
+    write run is applied at once: overwrites and block values are expanded
+    into (index, value) pairs and only the last write to each index is
+    kept. Swaps depend on the current state, so swap runs are applied one
+    by one. Traces whose runs average fewer than ``MIN_RUN`` steps (heap
+    sort alternates swaps and sift writes) are replayed step by step, which
+    is faster there.
+    """
+    if np is None:
+        return _replay_steps(trace, arr)
+
+    state = list(arr)
+    columns = trace.to_numpy()
+    ops = columns["ops"]
+    moving = np.flatnonzero((ops == SWAP) | (ops == OVERWRITE) | (ops == BLOCK))
+    if not moving.size:
+        return state
+    is_swap = ops[moving] == SWAP
+    cuts = np.flatnonzero(is_swap[1:] != is_swap[:-1]) + 1
+    if (len(cuts) + 1) * MIN_RUN > len(moving):
+        return _replay_steps(trace, arr)
+    for run in np.split(moving, cuts):
+        if ops[run[0]] == SWAP:
+            for a, b in zip(columns["i"][run].tolist(), columns["j"][run].tolist()):
+                state[a], state[b] = state[b], state[a]
+        else:
+            _apply_writes(state, columns, run)
+    return state
+
+
+def _apply_writes(state: List[int], columns: dict, run: "np.ndarray") -> None:
+    """Apply a run of overwrite/block steps with last-writer-wins semantics."""
+    i = columns["i"][run]
+    block = columns["ops"][run] == BLOCK
+    lengths = np.where(block, columns["j"][run] - i + 1, 1)
+    total = int(lengths.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    positions = np.repeat(i, lengths) + offsets
+    # Overwrites carry their value; blocks an offset into the blocks column
+    source = np.repeat(columns["values"][run], lengths) + offsets
+    in_block = np.repeat(block, lengths)
+    values = source
+    if in_block.any():
+        values = np.where(in_block, columns["blocks"][np.where(in_block, source, 0)], source)
+
+    # Keep the last write per index
+    last, first_from_end = np.unique(positions[::-1], return_index=True)
+    final = values[::-1][first_from_end]
+    if len(last) * 8 > len(state):
+        updated = np.array(state, dtype=np.int64)
+        updated[last] = final
+        state[:] = updated.tolist()
+    else:
+        for index, value in zip(last.tolist(), final.tolist()):
+            state[index] = value
+
+
+def _replay_steps(trace: StepTrace, arr: List[int]) -> List[int]:
+    state = list(arr)
+    ops, i, j, values = trace.ops, trace.i, trace.j, trace.values
+    for index, op in enumerate(ops):
+        if op == SWAP:
+            a, b = i[index], j[index]
+            state[a], state[b] = state[b], state[a]
+        elif op == OVERWRITE:
+            state[i[index]] = values[index]
+        elif op == BLOCK:
+            state[i[index]:j[index] + 1] = trace.block_values(index)
+    return state
+
+
+def verify_trace(trace: StepTrace, arr: List[int], exact_counts: bool = True) -> List[str]:
+    """
+    Check a recorded trace against the input it was recorded on.
+
+    Returns a list of problems (empty if the trace is correct):
+    - the trace ends with its only "done" step
+    - every step index used by compare/swap/overwrite/block lies in the array
+    - replaying the trace onto ``arr`` yields ``sorted(arr)``
+    - with ``exact_counts``, the comparison/swap/write counts quoted in the
+      "done" description match the steps in the trace (pass False for
+      coarse traces such as the parallel merge sort's)
+    """
+    problems = []
+    n = len(arr)
+    if not len(trace):
+        return ["empty trace"]
+    if trace.ops[-1] != DONE or trace.count("done") != 1:
+        problems.append("trace does not end with its only 'done' step")
+    unknown = set(trace.ops) - set(range(len(OPCODES)))
+    if unknown:
+        return problems + [f"unknown opcodes {sorted(unknown)}"]
+
+    bad = first_bad_step(trace, n)
+    if bad is not None:
+        return problems + [f"step {bad} ({OPCODES[trace.ops[bad]]}) indexes "
+                           f"arr[{trace.i[bad]}], arr[{trace.j[bad]}] of {n}"]
+
+    result = replay(trace, arr)
+    expected = sorted(arr)
+    if result != expected:
+        first = next(k for k, (a, b) in enumerate(zip(result, expected)) if a != b)
+        problems.append(f"replayed result is not sorted: arr[{first}] = {result[first]}, "
+                        f"expected {expected[first]}")
+
+    if exact_counts and trace.ops[-1] == DONE:
+        counts = trace_counts(trace)
+        for field, reported in DONE_COUNT.findall(trace.description(len(trace) - 1)):
+            actual = counts[field.lower()]
+            if int(reported) != actual:
+                problems.append(f"'done' reports {field}: {reported}, trace has {actual}")
+    return problems
+
+
+def verify(algorithm: str, arr: List[int], block_writes: bool = False) -> List[str]:
+    """Record ``algorithm`` on ``arr`` and verify the trace."""
+    func = ALGORITHMS[algorithm]
+    if block_writes:
+        func = coalesce_writes(func)
+    return verify_trace(StepTrace.record(func, arr), arr, exact_counts=algorithm not in COARSE_TRACES)
+
+
+def differential_test(algorithms: Optional[Sequence[str]] = None,
+                      distributions: Optional[Sequence[str]] = None,
+                      max_size: int = 100_000, budget: float = 120.0, seed: Optional[int] = None,
+                      block_writes: bool = False, max_steps: int = 20_000_000,
+                      log: Optional[Callable[[str], None]] = None) -> List[dict]:
+    """
+    Verify every algorithm on seeded inputs of growing size within ``budget`` seconds.
+
+    Each algorithm gets an equal share of the budget. Sizes grow tenfold
+    from 10 up to ``max_size`` and every distribution is run at one size
+    before any moves on to the next. A cell is skipped once its predicted
+    cost would exceed what is left of the share (or ``max_steps``
+    recorded steps). The prediction scales the last step count by the
+    growth exponent seen between the last two sizes. Every run replays the
+    trace, checks it against ``sorted()`` and the "done" counts, and
+    checks that the counting variant sorts with the same counts.
+
+    Returns one row per run: algorithm, distribution, size, steps,
+    seconds and problems.
+    """
+    # Imported here: benchmark pulls in the whole benchmarking toolchain
+    from benchmark import DISTRIBUTIONS, make_input
+
+    algorithms = list(algorithms or ALGORITHMS)
+    distributions = list(distributions or DISTRIBUTIONS)
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    sizes = [10]
+    while sizes[-1] * 10 <= max_size:
+        sizes.append(sizes[-1] * 10)
+    if sizes[-1] != max_size and max_size > 10:
+        sizes.append(max_size)
+
+    rows = []
+    share = budget / max(1, len(algorithms))
+    for algorithm in algorithms:
+        func = ALGORITHMS[algorithm]
+        if block_writes:
+            func = coalesce_writes(func)
+        exact = algorithm not in COARSE_TRACES
+        deadline = time.perf_counter() + share
+        history = {dist: [] for dist in distributions}  # (size, steps, seconds)
+        dropped = set()
+        for size in sizes:
+            for dist in distributions:
+                runs = history[dist]
+                if dist in dropped:
+                    continue
+                if runs:
+                    steps = _predict_steps(runs, size)
+                    seconds = runs[-1][2] / max(1, runs[-1][1]) * steps
+                    if steps > max_steps or time.perf_counter() + seconds > deadline:
+                        dropped.add(dist)
+                        continue
+                arr = make_input(dist, size, 0, seed)
+                start = time.perf_counter()
+                trace = StepTrace.record(func, arr)
+                problems = verify_trace(trace, arr, exact_counts=exact)
+                result, metrics = COUNTING_ALGORITHMS[algorithm](arr).run()
+                if result != sorted(arr):
+                    problems.append("counting variant did not sort")
+                elif exact and not block_writes:
+                    counts = trace_counts(trace)
+                    for field in ("comparisons", "swaps", "writes"):
+                        if metrics[field] != counts[field]:
+                            problems.append(f"counting variant {field}: {metrics[field]}, "
+                                            f"trace has {counts[field]}")
+                seconds = time.perf_counter() - start
+                runs.append((size, len(trace), seconds))
+                rows.append({"algorithm": algorithm, "distribution": dist, "size": size,
+                             "steps": len(trace), "seconds": seconds, "problems": problems})
+                if log is not None:
+                    status = "ok" if not problems else "; ".join(problems)
+                    log(f"{algorithm:22s} {dist:14s} n={size:<7d} {len(trace):>10d} steps "
+                        f"{seconds:7.2f}s  {status}")
+                del trace
+    return rows
+
+
+def _predict_steps(runs: List[tuple], size: int) -> float:
+    """Extrapolate a cell's step count to ``size`` from its last runs."""
+    last_size, last_steps, _ = runs[-1]
+    exponent = 2.0  # Assume the worst until growth has been observed
+    if len(runs) >= 2 and runs[-2][1] > 0 and last_steps > 0:
+        prev_size, prev_steps, _ = runs[-2]
+        exponent = math.log(last_steps / prev_steps) / math.log(last_size / prev_size)
+        exponent = min(2.0, max(1.0, exponent))
+    return max(1, last_steps) * (size / last_size) ** exponent
+
+
+def main():
+    """Run the randomized differential tests from the command line."""
+    from benchmark import DISTRIBUTIONS
+
+    parser = argparse.ArgumentParser(description="Verify algorithm traces by replaying them.")
+    parser.add_argument("--algorithms", nargs="+", metavar="NAME",
+                        help="algorithms to verify (names as in ALGORITHMS; default: all)")
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS))
+    parser.add_argument("--max-size", type=int, default=100_000, metavar="N")
+    parser.add_argument("--budget", type=float, default=120.0, metavar="SECONDS",
+                        help="total time budget, shared equally by the algorithms")
+    parser.add_argument("--seed", type=int, help="input seed (default: random, printed)")
+    parser.add_argument("--block-writes", action="store_true",
+                        help="verify the coalesced block-write traces instead")
+    args = parser.parse_args()
+
+    seed = random.randrange(2 ** 32) if args.seed is None else args.seed
+    print(f"Seed: {seed}")
+    rows = differential_test(args.algorithms, args.distributions, args.max_size, args.budget,
+                             seed, args.block_writes, log=print)
+    failed = [row for row in rows if row["problems"]]
+    largest = {}  # algorithm -> distribution -> largest size verified
+    for row in rows:
+        sizes = largest.setdefault(row["algorithm"], {})
+        sizes[row["distribution"]] = max(sizes.get(row["distribution"], 0), row["size"])
+    print(f"\n{len(rows)} runs, {len(failed)} failed")
+    print(f"{'Algorithm':22s} {'largest n (all inputs)':>24s} {'(any input)':>12s}")
+    for algorithm, sizes in largest.items():
+        print(f"{algorithm:22s} {min(sizes.values()):>24d} {max(sizes.values()):>12d}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
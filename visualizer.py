@@ -7,12 +7,24 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import random
 import time
-from algorithms import ALGORITHMS, Step
+from algorithms import ALGORITHMS
+from column_bins import ColumnBins
+from race import Race
+from step_producer import StepProducer
+from step_trace import OPCODES, SeekableTrace, coalesce_writes
+from trace_cache import TraceCache
 
 
 class SortingVisualizer:
     """Professional sorting algorithm visualizer with real-time statistics."""
 
+    FRAME_MS = 16          # Target frame period (~60 fps)
+    STATS_INTERVAL = 0.1   # Seconds between statistics refreshes
+    MAX_ARRAY_SIZE = 1_000_000
+    KEYFRAME_BUDGET = 8_000_000  # Array values kept across all keyframes
+    RECORDED_STEPS = 4_000_000   # Steps held for scrubbing (~35 bytes each)
+    TRACE_CACHE_BYTES = 256 * 2 ** 20  # Finished traces kept for replays
+
     def __init__(self, root):
         self.root = root
         self.root.title("Sorting Algorithm Visualizer | Professional Edition")
@@ -23,7 +35,25 @@ class SortingVisualizer:
         # State variables
         self.array = []
         self.visual_array = []
-        self.generator = None
+        self._bar_ids = []          # Canvas item per bar (retained rendering)
+        self._label_ids = []        # Canvas text item per bar, if labelled
+        self._min_ids = []          # Min-value item per pixel column
+        self._layout = None         # (n, width, height, scale max) of the bars
+        self._highlighted = set()   # Bars currently drawn highlighted
+        self._bins = None           # ColumnBins when n exceeds the canvas width
+        self.array_max = 1          # Cached max(self.array), the bar scale
+        self.recording = None  # SeekableTrace of the current run
+        self.position = 0      # Number of recorded steps applied so far
+        self._record_job = None
+        self._frame_job = None  # Pending _step frame, one at most
+        self._step_job = None   # Pending _step_forward retry
+        self.producer = None   # StepProducer feeding the recording, if any
+        # Finished recordings by (algorithm, array), so switching back replays them
+        self.trace_cache = TraceCache(self.TRACE_CACHE_BYTES)
+        self._recording_key = None
+        self._step_budget = 0.0
+        self._last_frame = 0.0
+        self._last_stats = 0.0
         self.running = False
         self.paused = False
         self.current_algorithm = "Bubble Sort"
@@ -60,7 +90,7 @@ class SortingVisualizer:
             width=18
         )
         algo_menu.pack(side="left", padx=5)
-        algo_menu.bind("<<ComboboxSelected>>", lambda e: self._reset_stats())
+        algo_menu.bind("<<ComboboxSelected>>", lambda e: self._on_algorithm_change())
 
         # Array Size
         ttk.Label(top_frame, text="Array Size:", font=("Arial", 10, "bold")).pack(side="left", padx=20)
@@ -68,7 +98,7 @@ class SortingVisualizer:
         size_spinbox = ttk.Spinbox(
             top_frame,
             from_=10,
-            to=99,
+            to=self.MAX_ARRAY_SIZE,
             textvariable=self.size_var,
             width=10,
             command=self._on_size_change
@@ -91,6 +121,33 @@ class SortingVisualizer:
         )
         speed_scale.pack(side="left", padx=5)
 
+        # Turbo: multiply the step rate (many steps per rendered frame)
+        ttk.Label(top_frame, text="Turbo:", font=("Arial", 10, "bold")).pack(side="left", padx=(10, 5))
+        self.turbo_var = tk.IntVar(value=1)
+        ttk.Combobox(
+            top_frame,
+            textvariable=self.turbo_var,
+            values=[1, 10, 100, 1000, 10000],
+            state="readonly",
+            width=6
+        ).pack(side="left", padx=5)
+
+        # Run the algorithm in a worker thread so slow algorithms can't stall the UI
+        self.background_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            top_frame,
+            text="Background",
+            variable=self.background_var
+        ).pack(side="left", padx=5)
+
+        # Merge runs of contiguous writes (merges, insertion shifts) into block steps
+        self.coalesce_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            top_frame,
+            text="Block writes",
+            variable=self.coalesce_var
+        ).pack(side="left", padx=5)
+
         # Buttons
         button_frame = ttk.Frame(top_frame)
         button_frame.pack(side="left", padx=20)
@@ -99,6 +156,7 @@ class SortingVisualizer:
         ttk.Button(button_frame, text="Start", command=self._start_sort).pack(side="left", padx=3)
         ttk.Button(button_frame, text="Pause", command=self._pause_sort).pack(side="left", padx=3)
         ttk.Button(button_frame, text="Reset", command=self._reset).pack(side="left", padx=3)
+        ttk.Button(button_frame, text="Race", command=self._open_race).pack(side="left", padx=3)
 
         # Custom Array Input
         input_frame = ttk.LabelFrame(self.root, text="Custom Array Input", padding=10)
@@ -121,6 +179,25 @@ class SortingVisualizer:
         self.canvas = tk.Canvas(canvas_frame, bg="white", height=350)
         self.canvas.pack(fill="both", expand=True)
         
+        # Timeline: scrub through the recorded steps
+        timeline_frame = ttk.Frame(self.root)
+        timeline_frame.pack(fill="x", padx=10, pady=(0, 5))
+
+        ttk.Button(timeline_frame, text="◀ Step", command=self._step_back).pack(side="left", padx=3)
+        self.timeline_var = tk.IntVar(value=0)
+        self.timeline = ttk.Scale(
+            timeline_frame,
+            from_=0,
+            to=0,
+            variable=self.timeline_var,
+            orient="horizontal",
+            command=self._on_timeline
+        )
+        self.timeline.pack(side="left", fill="x", expand=True, padx=5)
+        ttk.Button(timeline_frame, text="Step ▶", command=self._step_forward).pack(side="left", padx=3)
+        self.position_label = ttk.Label(timeline_frame, text="Step 0 / 0", font=("Arial", 9), width=36)
+        self.position_label.pack(side="left", padx=5)
+
         # Force canvas to update its size
         self.root.update_idletasks()
 
@@ -176,11 +253,16 @@ class SortingVisualizer:
         if not self.running:  # Only allow if not currently sorting
             self._generate_random_array()
 
+    def _on_algorithm_change(self):
+        """Discard the recording of the previous algorithm."""
+        self._discard_recording()
+        self._reset()
+
     def _generate_random_array(self):
         """Generate a random array based on size."""
         size = self.size_var.get()
-        self.array = [random.randint(5, 380) for _ in range(size)]
-        self.visual_array = self.array[:]
+        self._discard_recording()
+        self._set_array([random.randint(5, 380) for _ in range(size)])
         self.root.update_idletasks()  # Update canvas size
         self._draw_array()
         self._reset_stats()
@@ -189,6 +271,12 @@ class SortingVisualizer:
         except tk.TclError:
             pass
 
+    def _set_array(self, numbers):
+        """Install a new input array and cache its maximum."""
+        self.array = numbers
+        self.visual_array = self.array[:]
+        self.array_max = max(max(numbers), 1) if numbers else 1
+
     def _load_custom_array(self):
         """Load custom array from user input."""
         try:
@@ -220,16 +308,16 @@ class SortingVisualizer:
                     pass
                 return
             
-            if len(numbers) > 1000:
+            if len(numbers) > self.MAX_ARRAY_SIZE:
                 try:
-                    self.input_status.config(text="⚠️ Maximum 1000 numbers allowed", foreground="red")
+                    self.input_status.config(text=f"⚠️ Maximum {self.MAX_ARRAY_SIZE} numbers allowed", foreground="red")
                 except tk.TclError:
                     pass
                 return
             
             # Load the custom array
-            self.array = numbers
-            self.visual_array = self.array[:]
+            self._discard_recording()
+            self._set_array(numbers)
             self.root.update_idletasks()  # Update canvas size
             self._draw_array()
             self._reset_stats()
@@ -244,17 +332,30 @@ class SortingVisualizer:
             except tk.TclError:
                 pass
 
-    def _draw_array(self, highlight=None, highlight_color="orange"):
-        """Draw the array on canvas."""
+    def _draw_array(self, highlight=None, highlight_color="orange", full=True, changed=()):
+        """
+        Draw the array on canvas.
+
+        Bars and labels are created once and then updated in place. With
+        ``full=False`` only the highlighted bars, the bars listed in
+        ``changed`` and the bars highlighted by the previous call are
+        touched, so a single step costs O(1) canvas operations. The layout
+        is rebuilt when the array length, canvas size or value scale
+        changes.
+        """
         try:
             if not self.root.winfo_exists():
                 return
         except tk.TclError:
             return
-            
-        self.canvas.delete("all")
         
         if not self.visual_array:
+            self.canvas.delete("all")
+            self._bar_ids = []
+            self._label_ids = []
+            self._min_ids = []
+            self._bins = None
+            self._layout = None
             return
 
         # Get current canvas size (avoid update_idletasks during animation)
@@ -271,83 +372,318 @@ class SortingVisualizer:
             canvas_height = 350
 
         n = len(self.visual_array)
+        highlight_set = set(highlight) if highlight else set()
+
+        layout = self._layout
+        if layout is None or layout[:3] != (n, canvas_width, canvas_height) or \
+                layout[3] != self.array_max:
+            self._build_bars(canvas_width, canvas_height)
+            dirty = range(n)
+        elif full:
+            if self._bins is not None:
+                self._bins = ColumnBins(self.visual_array, self._bins.columns)
+            dirty = range(n)
+        else:
+            dirty = highlight_set | self._highlighted
+            dirty.update(changed)
+
+        if self._bins is None:
+            for i in dirty:
+                self._update_bar(i, highlight_color if i in highlight_set else "#4A90E2")
+        else:
+            # Large-array mode: redraw the pixel columns holding dirty elements
+            column_of = self._bins.column_of
+            highlight_columns = {column_of(i) for i in highlight_set}
+            columns = range(self._bins.columns) if full else {column_of(i) for i in dirty}
+            for c in columns:
+                self._update_column(c, highlight_color if c in highlight_columns else "#4A90E2")
+        self._highlighted = highlight_set
+
+    def _build_bars(self, canvas_width: int, canvas_height: int):
+        """
+        Create one rectangle (and optional label) per element.
+
+        Arrays wider than the canvas are drawn in large-array mode instead:
+        elements are binned into pixel columns (see ColumnBins) and each
+        column gets a max bar plus a darker min bar.
+        """
+        self.canvas.delete("all")
+        n = len(self.visual_array)
+        self._layout = (n, canvas_width, canvas_height, self.array_max)
+        self._highlighted = set()
+        self._label_ids = []
+        self._min_ids = []
+
+        if n > canvas_width:
+            self._bins = ColumnBins(self.visual_array, int(canvas_width))
+            self._bar_ids = [
+                self.canvas.create_rectangle(0, 0, 0, 0, fill="#4A90E2", outline="")
+                for _ in range(self._bins.columns)
+            ]
+            self._min_ids = [
+                self.canvas.create_rectangle(0, 0, 0, 0, fill="#2C5F9E", outline="")
+                for _ in range(self._bins.columns)
+            ]
+            return
+
+        self._bins = None
         bar_width = canvas_width / n
-        max_val = max(self.visual_array) if self.visual_array else 1
+        self._bar_ids = [
+            self.canvas.create_rectangle(0, 0, 0, 0, fill="#4A90E2", outline="")
+            for _ in range(n)
+        ]
 
-        highlight_set = set(highlight) if highlight else set()
+        # Add number labels on bars - always show if there's space
+        if bar_width > 12 and n <= 60:  # Show numbers on up to 60 bars
+            # Adjust font size based on bar width
+            font_size = int(max(7, min(bar_width/2.5, 11)))
+            self._label_ids = [
+                self.canvas.create_text(0, 0, text="", font=("Arial", font_size, "bold"))
+                for _ in range(n)
+            ]
+
+    def _update_bar(self, i: int, color: str):
+        """Move and recolor bar ``i`` to match visual_array[i]."""
+        n, canvas_width, canvas_height, max_val = self._layout
+        val = self.visual_array[i]
+        bar_width = canvas_width / n
+        gap = 2 if bar_width > 4 else 0
+        x0 = i * bar_width
+        x1 = x0 + max(bar_width - gap, 1)
+        
+        # Scale bar height with padding
+        bar_height = (val / max_val) * (canvas_height - 30)
+        y0 = canvas_height - bar_height - 5
+        y1 = canvas_height - 5
 
-        for i, val in enumerate(self.visual_array):
-            x0 = i * bar_width
-            x1 = x0 + bar_width - 2
+        self.canvas.coords(self._bar_ids[i], x0, y0, x1, y1)
+        self.canvas.itemconfig(self._bar_ids[i], fill=color)
+
+        if self._label_ids:
+            text_x = (x0 + x1) / 2
+            
+            # Position text based on bar height
+            if bar_height > 25:
+                text_y = y0 - 8  # Above bar
+                text_color = "black"
+            else:
+                text_y = y1 - 8  # Inside bar
+                text_color = "white"
             
-            # Scale bar height with padding
-            bar_height = (val / max_val) * (canvas_height - 30)
-            y0 = canvas_height - bar_height - 5
-            y1 = canvas_height - 5
+            self.canvas.coords(self._label_ids[i], text_x, text_y)
+            self.canvas.itemconfig(self._label_ids[i], text=str(val), fill=text_color)
+
+    def _update_column(self, c: int, color: str):
+        """Redraw pixel column ``c`` from its min/max bins."""
+        _, canvas_width, canvas_height, max_val = self._layout
+        column_width = canvas_width / self._bins.columns
+        x0 = c * column_width
+        x1 = x0 + column_width
+        y1 = canvas_height - 5
+        scale = (canvas_height - 30) / max_val
+
+        self.canvas.coords(self._bar_ids[c], x0, y1 - self._bins.max[c] * scale, x1, y1)
+        self.canvas.itemconfig(self._bar_ids[c], fill=color)
+        self.canvas.coords(self._min_ids[c], x0, y1 - self._bins.min[c] * scale, x1, y1)
 
-            if i in highlight_set:
-                color = highlight_color
+    def _ensure_recording(self):
+        """Create the recording for the current array and algorithm."""
+        if self.recording is None:
+            # Bound snapshot memory for large arrays
+            max_keyframes = max(4, min(256, self.KEYFRAME_BUDGET // max(1, len(self.array))))
+            name = self.algo_var.get()
+            func = ALGORITHMS[name]
+            if self.coalesce_var.get():
+                func = coalesce_writes(func)
+                name += " (block writes)"
+            self._recording_key = TraceCache.key(name, self.array)
+            cached = self.trace_cache.get(self._recording_key)
+            if cached is not None:
+                # Keyframes are rebuilt in chunks by _record_ahead
+                self.recording = SeekableTrace.from_trace(cached, self.array, max_keyframes=max_keyframes)
+            elif self.background_var.get():
+                # Steps arrive from a worker thread; see _pull_steps
+                self.recording = SeekableTrace(None, self.array, max_keyframes=max_keyframes,
+                                               max_steps=self.RECORDED_STEPS)
+                self.producer = StepProducer(func, self.array).start()
             else:
-                color = "#4A90E2"
+                self.recording = SeekableTrace(func, self.array, max_keyframes=max_keyframes,
+                                               max_steps=self.RECORDED_STEPS)
+            self.position = 0
+            self._record_ahead()
 
-            self.canvas.create_rectangle(x0, y0, x1, y1, fill=color, outline="")
-            
-            # Add number labels on bars - always show if there's space
-            if bar_width > 12 and n <= 60:  # Show numbers on up to 60 bars
-                text_x = (x0 + x1) / 2
-                
-                # Position text based on bar height
-                if bar_height > 25:
-                    text_y = y0 - 8  # Above bar
-                    text_color = "black"
-                else:
-                    text_y = y1 - 8  # Inside bar
-                    text_color = "white"
-                
-                # Adjust font size based on bar width
-                font_size = int(max(7, min(bar_width/2.5, 11)))
-                
-                self.canvas.create_text(
-                    text_x, text_y,
-                    text=str(val),
-                    font=("Arial", font_size, "bold"),
-                    fill=text_color
-                )
-
-        # Only update canvas, not entire GUI (reduces flickering)
-        self.canvas.update()
+    def _discard_recording(self):
+        """Stop and drop the current recording, caching it if it is complete."""
+        if self.recording is not None and self.recording.complete and self.producer is None \
+                and self.recording.base == 0:
+            self.trace_cache.put(self._recording_key, self.recording.trace)
+        self._stop_frames()
+        self.recording = None
+        self.position = 0
+        if self.producer is not None:
+            self.producer.cancel()
+            self.producer = None
+        if self._record_job is not None:
+            self.root.after_cancel(self._record_job)
+            self._record_job = None
+        self._update_timeline()
+
+    def _record_ahead(self):
+        """Record the trace in small chunks while the UI stays idle-responsive."""
+        self._record_job = None
+        if self.recording is None or self.recording.full:
+            return  # Past RECORDED_STEPS, playback records on demand (_apply_next)
+        if self.producer is not None:
+            self._pull_steps()
+        else:
+            self.recording.extend(20000)
+        self._update_timeline()
+        if not self.recording.complete:
+            self._record_job = self.root.after(10, self._record_ahead)
+
+    def _pull_steps(self, max_batches: int = 4):
+        """Move finished batches from the background producer into the recording."""
+        producer = self.producer
+        recording = self.recording
+        for _ in range(max_batches):
+            if recording.full and self.position < len(recording):
+                break  # Appending would drop steps that haven't been played
+            batches = producer.drain(1)
+            if not batches:
+                break
+            recording.append_batch(batches[0])
+        if producer.done:
+            self.recording.finish()
+            self.producer = None
+            if producer.error is not None:
+                self.running = False
+                try:
+                    self.status_label.config(text="Error")
+                    self.info_label.config(text=f"Algorithm failed: {producer.error}")
+                except tk.TclError:
+                    pass
+
+    def _update_timeline(self):
+        """Sync the timeline slider and position label with the recording."""
+        total = len(self.recording) if self.recording is not None else 0
+        suffix = "" if self.recording is None or self.recording.complete else "+"
+        if self.recording is not None and self.recording.base:
+            # Long runs keep only the last RECORDED_STEPS steps for scrubbing
+            suffix += f" (from {self.recording.base})"
+        try:
+            self.timeline.configure(to=max(total, 1))
+            self.timeline_var.set(self.position)
+            self.position_label.config(text=f"Step {self.position} / {total}{suffix}")
+        except tk.TclError:
+            pass
 
     def _start_sort(self):
         """Start the sorting animation."""
         if self.running:
             return
+        self._stop_frames()  # A frame left over from before a pause/reset
 
+        self._ensure_recording()
+        if self.recording.complete and self.position >= len(self.recording):
+            if self.recording.base:
+                # The start of a long run was dropped: record it again
+                self._discard_recording()
+                self._ensure_recording()
+            self._seek(0)  # Replay a finished run from the beginning
         self.running = True
         self.paused = False
-        self.generator = ALGORITHMS[self.algo_var.get()](self.array[:])
-        self.start_time = time.time()
-        self._reset_stats()
+        if self.producer is not None:
+            self.producer.resume()
+        self.start_time = time.time() - self.elapsed_time
+        self._last_frame = time.perf_counter()
+        self._step_budget = 1.0  # Show the first step immediately
         self._step()
 
+    def _stop_frames(self):
+        """Stop playback and cancel the pending frame or step retry, if any."""
+        self.running = False
+        if self._frame_job is not None:
+            self.root.after_cancel(self._frame_job)
+            self._frame_job = None
+        if self._step_job is not None:
+            self.root.after_cancel(self._step_job)
+            self._step_job = None
+
     def _pause_sort(self):
         """Pause the sorting animation."""
-        self.running = False
+        self._stop_frames()
         self.paused = True
+        if self.producer is not None:
+            self.producer.pause()
         self.status_label.config(text="Paused")
 
     def _reset(self):
         """Reset to initial state - stops sorting and restores original array."""
-        self.running = False
+        self._stop_frames()
         self.paused = False
-        self.generator = None
+        if self.recording is not None and self.recording.base:
+            self._discard_recording()  # Its first steps are gone
+        self.position = 0
+        self.start_time = None
         self.visual_array = self.array[:]  # Reset to original unsorted array
         self._draw_array()
         self._reset_stats()
+        self._update_timeline()
         try:
             self.status_label.config(text="Reset")
         except tk.TclError:
             pass
 
+    def _seek(self, index: int):
+        """Jump to the array state after ``index`` recorded steps."""
+        if self.recording is None:
+            return
+        self.visual_array, counts = self.recording.state_at(index)
+        self.position = max(self.recording.base, min(index, len(self.recording)))
+        self.comparisons = counts["compare"]
+        self.swaps = counts["swap"]
+        self.writes = counts["overwrite"]
+        self.total_steps = self.position
+        if self.position > self.recording.base:
+            self._show_description(self.position - 1)
+        else:
+            try:
+                self.info_label.config(text="")
+            except tk.TclError:
+                pass
+        self._draw_array()
+        self._update_stats_display()
+        self._update_timeline()
+
+    def _on_timeline(self, value):
+        """Scrub to the step selected on the timeline slider."""
+        index = int(float(value))
+        if self.recording is None or index == self.position:
+            return
+        self._pause_sort()
+        self._seek(index)
+
+    def _step_back(self):
+        """Pause and move one step back."""
+        if self.recording is None or self.position <= self.recording.base:
+            return
+        self._pause_sort()
+        self._seek(self.position - 1)
+
+    def _step_forward(self):
+        """Pause and apply exactly one more step."""
+        self._ensure_recording()
+        self._pause_sort()  # Also cancels a pending retry
+        if self.producer is not None:
+            self.producer.resume()  # Keep producing so single steps are available
+        if not self._advance() and self.recording is not None and \
+                self.position >= len(self.recording) and not self.recording.complete:
+            # The worker hasn't delivered the next step yet - try again shortly
+            self._step_job = self.root.after(20, self._step_forward)
+            return
+        self._update_stats_display()
+        self._update_timeline()
+
     def _reset_stats(self):
         """Reset statistics."""
         self.comparisons = 0
@@ -375,8 +711,9 @@ class SortingVisualizer:
             self.running = False
 
     def _step(self):
-        """Execute one step of the sorting algorithm."""
-        if not self.running or not self.generator:
+        """Render one animation frame, applying as many steps as the speed demands."""
+        self._frame_job = None
+        if not self.running or self.recording is None:
             return
         
         # Check if window still exists
@@ -388,81 +725,167 @@ class SortingVisualizer:
             self.running = False
             return
 
-        try:
-            step: Step = next(self.generator)
-            self.total_steps += 1
-
-            # Update stats based on step type
-            if step.type == "compare":
-                self.comparisons += 1
-                # Check bounds
-                if step.i is not None and step.j is not None and \
-                   0 <= step.i < len(self.visual_array) and 0 <= step.j < len(self.visual_array):
-                    highlight = [step.i, step.j]
-                else:
-                    highlight = []
-                color = "#FF5733"
-            elif step.type == "swap":
-                self.swaps += 1
-                # Check bounds before swapping
-                if step.i is not None and step.j is not None and \
-                   0 <= step.i < len(self.visual_array) and 0 <= step.j < len(self.visual_array):
-                    self.visual_array[step.i], self.visual_array[step.j] = \
-                        self.visual_array[step.j], self.visual_array[step.i]
-                    highlight = [step.i, step.j]
-                else:
-                    highlight = []
-                color = "#28A745"
-            elif step.type == "overwrite":
-                self.writes += 1
-                # Check bounds before overwriting
-                if step.i is not None and 0 <= step.i < len(self.visual_array) and step.value is not None:
-                    self.visual_array[step.i] = step.value
-                    highlight = [step.i]
-                else:
-                    highlight = []
-                color = "#FFC300"
-            elif step.type == "complete":
-                highlight = None
-                color = "#4A90E2"
-            elif step.type == "done":
-                self.running = False
-                try:
-                    self.status_label.config(text="Completed!")
-                    self.info_label.config(text=step.description)
-                except tk.TclError:
-                    pass
-                self._draw_array()
-                self._update_stats_display()
+        # Accumulate a step budget from elapsed wall time and the speed setting
+        now = time.perf_counter()
+        self._step_budget += (now - self._last_frame) * self._steps_per_second()
+        self._last_frame = now
+        steps = int(self._step_budget)
+        self._step_budget -= steps
+
+        # Apply the steps without drawing, coalescing touched bars
+        deadline = now + self.FRAME_MS / 1000 * 0.75
+        changed = set()
+        highlight, color = None, "#4A90E2"
+        applied = 0
+        while applied < steps:
+            result = self._apply_next()
+            if result is None:
                 return
+            if not result:
+                break  # Waiting for the background producer
+            highlight, color, moved = result
+            if moved:
+                changed.update(highlight)
+            applied += 1
+            if applied % 256 == 0 and time.perf_counter() > deadline:
+                self._step_budget = 0  # Can't keep up: drop the backlog
+                break
 
-            # Draw array with highlights
-            self._draw_array(highlight, color)
-            
-            # Update info label only if description changed
-            if step.description:
-                try:
-                    self.info_label.config(text=step.description)
-                except tk.TclError:
-                    self.running = False
-                    return
-            
-            # Update stats less frequently for smoother animation
-            if self.total_steps % 5 == 0:  # Update every 5 steps
-                self._update_stats_display()
+        if applied:
+            self._draw_array(highlight, color, full=False, changed=changed)
+            self._show_description(self.position - 1)
 
-            # Schedule next step
-            delay = max(1, self.speed_var.get())
-            self.root.after(delay, self._step)
+        # Update stats on a wall-clock interval rather than per step
+        if now - self._last_stats >= self.STATS_INTERVAL:
+            self._last_stats = now
+            self._update_stats_display()
+            self._update_timeline()
 
-        except StopIteration:
+        self._frame_job = self.root.after(self.FRAME_MS, self._step)
+
+    def _steps_per_second(self) -> float:
+        """Step rate from the per-step delay and the turbo multiplier."""
+        delay = max(1, self.speed_var.get())
+        return 1000 / delay * max(1, self.turbo_var.get())
+
+    def _advance(self) -> bool:
+        """Apply the next recorded step and redraw; False once finished."""
+        result = self._apply_next()
+        if not result:
+            return False
+        highlight, color, _ = result
+        self._draw_array(highlight, color, full=False)
+        self._show_description(self.position - 1)
+        return True
+
+    def _apply_next(self):
+        """
+        Apply the next recorded step to the visual array and statistics.
+
+        Returns (highlight, color, moved) for drawing, where ``moved`` tells
+        whether bar values changed; an empty tuple if the background producer
+        has not delivered the next step yet; or None once the run has
+        finished (in which case the final state has been drawn).
+        """
+        recording = self.recording
+        if self.position >= len(recording) and not recording.complete:
+            if self.producer is not None:
+                self._pull_steps()
+            else:
+                recording.extend(1024)
+        if self.position >= len(recording):
+            if not recording.complete:
+                return ()
+            self._finish()
+            return None
+
+        # Read after recording more: a full recording drops its steps first
+        trace = recording.trace
+        index = self.position - recording.base
+        step_type = OPCODES[trace.ops[index]]
+        i, j = trace.i[index], trace.j[index]
+        n = len(self.visual_array)
+        self.position += 1
+        self.total_steps = self.position
+
+        # Update stats based on step type
+        if step_type == "compare":
+            self.comparisons += 1
+            # Check bounds
+            highlight = [i, j] if 0 <= i < n and 0 <= j < n else []
+            color = "#FF5733"
+        elif step_type == "swap":
+            self.swaps += 1
+            # Check bounds before swapping
+            if 0 <= i < n and 0 <= j < n:
+                old_i, old_j = self.visual_array[i], self.visual_array[j]
+                self.visual_array[i], self.visual_array[j] = old_j, old_i
+                if self._bins is not None:
+                    self._bins.update(i, old_i)
+                    self._bins.update(j, old_j)
+                highlight = [i, j]
+            else:
+                highlight = []
+            color = "#28A745"
+        elif step_type == "overwrite":
+            self.writes += 1
+            # Check bounds before overwriting
+            if 0 <= i < n:
+                old = self.visual_array[i]
+                self.visual_array[i] = trace.values[index]
+                if self._bins is not None:
+                    self._bins.update(i, old)
+                highlight = [i]
+            else:
+                highlight = []
+            color = "#FFC300"
+        elif step_type == "block":
+            # Contiguous writes with the comparisons between them, as one slice
+            self.comparisons += trace.args[index]
+            self.writes += j - i + 1
+            if 0 <= i and j < n:
+                old = self.visual_array[i:j + 1]
+                self.visual_array[i:j + 1] = trace.block_values(index)
+                if self._bins is not None:
+                    for k, old_value in enumerate(old, i):
+                        self._bins.update(k, old_value)
+                highlight = range(i, j + 1)
+            else:
+                highlight = []
+            color = "#FFC300"
+        elif step_type == "complete":
+            highlight = None
+            color = "#4A90E2"
+        else:  # "done"
+            self._finish()
+            return None
+        return highlight, color, step_type in ("swap", "overwrite", "block")
+
+    def _finish(self):
+        """Stop playback and show the final state of the run."""
+        self.running = False
+        try:
+            self.status_label.config(text="Completed!")
+        except tk.TclError:
+            pass
+        if self.position > self.recording.base:
+            self._show_description(self.position - 1)
+        self._draw_array()
+        self._update_stats_display()
+        self._update_timeline()
+
+    def _open_race(self):
+        """Open a race window on the current array."""
+        if self.running:
+            self._pause_sort()
+        RaceWindow(self)
+
+    def _show_description(self, index: int):
+        """Show the description of recorded step ``index`` in the info label."""
+        try:
+            self.info_label.config(text=self.recording.description(index))
+        except tk.TclError:
             self.running = False
-            try:
-                self.status_label.config(text="Completed!")
-            except tk.TclError:
-                pass
-            self._draw_array()
-            self._update_stats_display()
 
     def _on_window_resize(self, event):
         """Handle window resize events."""
@@ -474,6 +897,238 @@ class SortingVisualizer:
             self._resize_job = self.root.after(100, self._draw_array)
 
 
+class RaceWindow:
+    """
+    Race several algorithms on the visualizer's current array.
+
+    Each selected algorithm gets a lane (see race.Race) drawn in its own
+    horizontal pane of one canvas. A single frame loop gives every lane the
+    same step budget per frame, taken from the main window's speed and
+    turbo settings, and redraws only the bars or pixel columns each lane
+    touched. Pane headers show live statistics and finishing places.
+    """
+
+    FRAME_MS = SortingVisualizer.FRAME_MS
+    STATS_INTERVAL = SortingVisualizer.STATS_INTERVAL
+    HEADER = 18  # Pane header height in pixels
+    DEFAULT_LANES = ("Insertion Sort", "Merge Sort", "Quick Sort", "Heap Sort", "Shell Sort")
+    COLORS = {"compare": "#FF5733", "swap": "#28A745", "overwrite": "#FFC300", "block": "#FFC300"}
+
+    def __init__(self, visualizer: SortingVisualizer):
+        self.visualizer = visualizer
+        self.root = visualizer.root
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Algorithm Race")
+        self.window.geometry("1200x800")
+        self.window.protocol("WM_DELETE_WINDOW", self._close)
+
+        self.race = None
+        self.running = False
+        self._job = None
+        self._panes = []       # Per lane: dict of canvas items and layout
+        self._layout = None    # (lanes, width, height) the panes were built for
+        self._step_budget = 0.0
+        self._last_frame = 0.0
+        self._last_stats = 0.0
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Algorithm checkboxes, controls and the shared canvas."""
+        select_frame = ttk.LabelFrame(self.window, text="Lanes", padding=5)
+        select_frame.pack(fill="x", padx=10, pady=5)
+        self.lane_vars = {}
+        for index, name in enumerate(ALGORITHMS):
+            var = tk.BooleanVar(value=name in self.DEFAULT_LANES)
+            ttk.Checkbutton(select_frame, text=name, variable=var).grid(
+                row=index // 7, column=index % 7, sticky="w", padx=5
+            )
+            self.lane_vars[name] = var
+
+        control_frame = ttk.Frame(self.window)
+        control_frame.pack(fill="x", padx=10)
+        ttk.Button(control_frame, text="Start", command=self._start).pack(side="left", padx=3)
+        ttk.Button(control_frame, text="Pause", command=self._pause).pack(side="left", padx=3)
+        ttk.Button(control_frame, text="Close", command=self._close).pack(side="left", padx=3)
+        self.status_label = ttk.Label(control_frame, text="Select two or more algorithms",
+                                      font=("Arial", 9), foreground="gray")
+        self.status_label.pack(side="left", padx=10)
+
+        self.canvas = tk.Canvas(self.window, bg="white")
+        self.canvas.pack(fill="both", expand=True, padx=10, pady=5)
+
+    def _start(self):
+        """Start a new race, or resume a paused one."""
+        if self.running:
+            return
+        if self.race is None or self.race.finished:
+            names = [name for name, var in self.lane_vars.items() if var.get()]
+            if len(names) < 2:
+                messagebox.showwarning("Race", "Select at least two algorithms to race.")
+                return
+            coalesce = self.visualizer.coalesce_var.get()
+            entries = [(name, coalesce_writes(ALGORITHMS[name]) if coalesce else ALGORITHMS[name])
+                       for name in names]
+            self.race = Race(entries, self.visualizer.array)
+            self._layout = None
+            self._draw(full=True)
+        self.running = True
+        self._last_frame = time.perf_counter()
+        self._step_budget = 1.0
+        self._frame()
+
+    def _pause(self):
+        self.running = False
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _close(self):
+        self._pause()
+        self.race = None
+        try:
+            self.window.destroy()
+        except tk.TclError:
+            pass
+
+    def _frame(self):
+        """Advance every lane by this frame's step budget and redraw."""
+        self._job = None
+        if not self.running or self.race is None:
+            return
+        try:
+            if not self.window.winfo_exists():
+                self.running = False
+                return
+        except tk.TclError:
+            self.running = False
+            return
+
+        now = time.perf_counter()
+        self._step_budget += (now - self._last_frame) * self.visualizer._steps_per_second()
+        self._last_frame = now
+        steps = int(self._step_budget)
+        self._step_budget -= steps
+
+        finished = self.race.frame(steps, deadline=now + self.FRAME_MS / 1000 * 0.75)
+        self._draw()
+        if finished or now - self._last_stats >= self.STATS_INTERVAL:
+            self._last_stats = now
+            self._update_headers()
+
+        if self.race.finished:
+            self.running = False
+            self._show_results()
+            return
+        self._job = self.root.after(self.FRAME_MS, self._frame)
+
+    def _draw(self, full: bool = False):
+        """Redraw what each lane changed since the last frame."""
+        try:
+            width = self.canvas.winfo_width()
+            height = self.canvas.winfo_height()
+        except tk.TclError:
+            return
+        if width <= 1:
+            width = 1180
+        if height <= 1:
+            height = 640
+
+        lanes = self.race.lanes
+        if self._layout != (len(lanes), width, height):
+            self._build_panes(width, height)
+            full = True
+
+        for lane, pane in zip(lanes, self._panes):
+            changed = lane.take_changes()
+            n = len(lane.values)
+            highlight = {i for i in lane.highlight if 0 <= i < n}
+            color = self.COLORS.get(lane.step_type, "#4A90E2")
+            if lane.bins is None:
+                dirty = range(n) if full else changed | highlight | pane["highlighted"]
+                for i in dirty:
+                    self._update_bar(lane, pane, i, color if i in highlight else "#4A90E2")
+            else:
+                column_of = lane.bins.column_of
+                highlight = {column_of(i) for i in highlight}
+                if full:
+                    dirty = range(lane.bins.columns)
+                else:
+                    dirty = {column_of(i) for i in changed} | highlight | pane["highlighted"]
+                for c in dirty:
+                    self._update_column(lane, pane, c, color if c in highlight else "#4A90E2")
+            pane["highlighted"] = highlight
+        if full:
+            self._update_headers()
+
+    def _build_panes(self, width: int, height: int):
+        """Split the canvas into one pane per lane and create its items."""
+        self.canvas.delete("all")
+        lanes = self.race.lanes
+        self._layout = (len(lanes), width, height)
+        self._panes = []
+        pane_height = height / len(lanes)
+        max_value = max(self.visualizer.array, default=1) or 1
+        for index, lane in enumerate(lanes):
+            top = index * pane_height
+            if index:
+                self.canvas.create_line(0, top, width, top, fill="#CCCCCC")
+            n = len(lane.values)
+            lane.bins = ColumnBins(lane.values, int(width)) if n > width else None
+            count = lane.bins.columns if lane.bins is not None else n
+            pane = {
+                "baseline": top + pane_height - 3,
+                "scale": max(1.0, pane_height - self.HEADER - 6) / max_value,
+                "width": width / max(1, count),
+                "header": self.canvas.create_text(5, top + 3, anchor="nw", text=lane.name,
+                                                  font=("Arial", 9, "bold")),
+                "bars": [self.canvas.create_rectangle(0, 0, 0, 0, fill="#4A90E2", outline="")
+                         for _ in range(count)],
+                "mins": [self.canvas.create_rectangle(0, 0, 0, 0, fill="#2C5F9E", outline="")
+                         for _ in range(count)] if lane.bins is not None else [],
+                "highlighted": set(),
+            }
+            self._panes.append(pane)
+
+    def _update_bar(self, lane, pane: dict, i: int, color: str):
+        bar_width = pane["width"]
+        gap = 2 if bar_width > 4 else 0
+        x0 = i * bar_width
+        y1 = pane["baseline"]
+        self.canvas.coords(pane["bars"][i], x0, y1 - lane.values[i] * pane["scale"],
+                           x0 + max(bar_width - gap, 1), y1)
+        self.canvas.itemconfig(pane["bars"][i], fill=color)
+
+    def _update_column(self, lane, pane: dict, c: int, color: str):
+        x0 = c * pane["width"]
+        x1 = x0 + pane["width"]
+        y1, scale = pane["baseline"], pane["scale"]
+        self.canvas.coords(pane["bars"][c], x0, y1 - lane.bins.max[c] * scale, x1, y1)
+        self.canvas.itemconfig(pane["bars"][c], fill=color)
+        self.canvas.coords(pane["mins"][c], x0, y1 - lane.bins.min[c] * scale, x1, y1)
+
+    def _update_headers(self):
+        """Show each lane's live statistics and place in its pane header."""
+        for lane, pane in zip(self.race.lanes, self._panes):
+            text = (f"{lane.name}   Comparisons: {lane.comparisons}   Swaps: {lane.swaps}   "
+                    f"Writes: {lane.writes}   Steps: {lane.steps}")
+            if lane.place is not None:
+                text += f"   —   #{lane.place}"
+            try:
+                self.canvas.itemconfig(pane["header"], text=text,
+                                       fill="darkgreen" if lane.place == 1 else "black")
+            except tk.TclError:
+                self.running = False
+
+    def _show_results(self):
+        """Show the finishing order in the status line."""
+        order = ", ".join(f"#{lane.place} {lane.name} ({lane.steps} steps)"
+                          for lane in self.race.finish_order)
+        try:
+            self.status_label.config(text=f"Finished: {order}", foreground="darkgreen")
+        except tk.TclError:
+            pass
+
+
 def main():
     """Launch the visualizer."""
     root = tk.Tk()